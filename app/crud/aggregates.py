@@ -0,0 +1,228 @@
+# app/crud/aggregates.py
+"""
+Maintenance of the daily_aggregates table.
+
+Entry writes apply their deltas in the same transaction (one upsert per entry), so a
+day's totals are a primary-key lookup. Drift from writes that bypass the API can be
+repaired with `python -m app.crud.aggregates [--user-id N]`.
+"""
+import argparse
+import sys
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..utils.pagination import keyset_clause
+
+# Aggregate columns fed by each entry table: column -> summed entry attribute (None counts rows)
+AGGREGATE_SOURCES = {
+    models.FoodEntry: {"food_count": None, "calories_in": "calories"},
+    models.ExerciseEntry: {
+        "exercise_count": None,
+        "exercise_minutes": "duration_minutes",
+        "calories_burned": "calories_burned",
+    },
+    models.WorkEntry: {"work_count": None, "productivity_sum": "productivity_rating", "stress_sum": "stress_level"},
+    models.EventEntry: {"event_count": None, "impact_sum": "impact_rating"},
+    models.MoodEntry: {"mood_count": None, "mood_sum": "mood_rating"},
+}
+
+def _dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def entry_deltas(entry) -> Dict[str, int]:
+    """Amounts a single entry adds to its log's aggregate row."""
+    deltas = {
+        column: 1 if attribute is None else getattr(entry, attribute) or 0
+        for column, attribute in AGGREGATE_SOURCES[type(entry)].items()
+    }
+    if isinstance(entry, models.MoodEntry):
+        deltas["mood_min"] = deltas["mood_max"] = entry.mood_rating
+    return deltas
+
+def _extreme(dialect_name: str, smallest: bool, stored, incoming):
+    # LEAST/GREATEST skip NULLs on Postgres; SQLite's min()/max() return NULL instead
+    if dialect_name == "postgresql":
+        return (func.least if smallest else func.greatest)(stored, incoming)
+    return func.coalesce((func.min if smallest else func.max)(stored, incoming), stored, incoming)
+
+def increment_statement(dialect_name: str, daily_log_id: int, deltas: Dict[str, int]):
+    """Single-statement upsert adding `deltas` to the log's aggregate row."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    table = models.DailyAggregate.__table__
+    stmt = dialect.insert(table).values(daily_log_id=daily_log_id, **deltas)
+
+    updates: Dict[str, Any] = {}
+    for column in deltas:
+        if column in ("mood_min", "mood_max"):
+            updates[column] = _extreme(dialect_name, column == "mood_min", table.c[column], stmt.excluded[column])
+        else:
+            updates[column] = table.c[column] + stmt.excluded[column]
+    updates["updated_at"] = func.now()
+
+    return stmt.on_conflict_do_update(index_elements=[table.c.daily_log_id], set_=updates)
+
+def merge_deltas(entries) -> Dict[str, int]:
+    """Combined deltas of several entries, so a batch costs one upsert per log."""
+    merged: Dict[str, int] = {}
+    for entry in entries:
+        for column, amount in entry_deltas(entry).items():
+            if column not in merged:
+                merged[column] = amount
+            elif column == "mood_min":
+                merged[column] = min(merged[column], amount)
+            elif column == "mood_max":
+                merged[column] = max(merged[column], amount)
+            else:
+                merged[column] += amount
+    return merged
+
+def apply_entry(db: Session, entry) -> None:
+    """Fold a new entry into its log's aggregate. Call before the entry's commit."""
+    db.execute(increment_statement(_dialect_name(db), entry.daily_log_id, entry_deltas(entry)))
+
+def apply_entries(db: Session, daily_log_id: int, entries) -> None:
+    """Fold a batch of new entries for one log into its aggregate with a single upsert."""
+    if entries:
+        db.execute(increment_statement(_dialect_name(db), daily_log_id, merge_deltas(entries)))
+
+def remove_entry(db: Session, entry) -> None:
+    """Take a deleted entry back out of its log's aggregate. Call after the delete is flushed."""
+    if isinstance(entry, models.MoodEntry):
+        # min/max cannot be decremented
+        recompute_log(db, entry.daily_log_id)
+        return
+    table = models.DailyAggregate.__table__
+    deltas = entry_deltas(entry)
+    db.execute(
+        update(table)
+        .where(table.c.daily_log_id == entry.daily_log_id)
+        .values({column: table.c[column] - amount for column, amount in deltas.items()}, updated_at=func.now())
+    )
+
+def totals_statement():
+    """Aggregate rows computed from the raw entry tables, one per daily log."""
+    stmt = select(models.DailyLog.id.label("daily_log_id"))
+    for model, columns in AGGREGATE_SOURCES.items():
+        expressions = [
+            (func.count() if attribute is None else func.coalesce(func.sum(getattr(model, attribute)), 0)).label(column)
+            for column, attribute in columns.items()
+        ]
+        if model is models.MoodEntry:
+            expressions += [
+                func.min(model.mood_rating).label("mood_min"),
+                func.max(model.mood_rating).label("mood_max"),
+            ]
+        totals = select(model.daily_log_id, *expressions).group_by(model.daily_log_id).subquery()
+        stmt = stmt.outerjoin(totals, totals.c.daily_log_id == models.DailyLog.id).add_columns(*(
+            totals.c[expression.name] if expression.name in ("mood_min", "mood_max")
+            else func.coalesce(totals.c[expression.name], 0).label(expression.name)
+            for expression in expressions
+        ))
+    return stmt
+
+def _replace(db: Session, *criteria) -> int:
+    table = models.DailyAggregate.__table__
+    totals = totals_statement().where(*criteria)
+    logs = select(models.DailyLog.id).where(*criteria)
+    db.execute(delete(table).where(table.c.daily_log_id.in_(logs)))
+    columns = [column.name for column in totals.selected_columns]
+    return db.execute(table.insert().from_select(columns, totals)).rowcount
+
+def recompute_log(db: Session, daily_log_id: int) -> None:
+    """Rebuild one log's aggregate row from its entries."""
+    _replace(db, models.DailyLog.id == daily_log_id)
+
+def recompute_logs(db: Session, daily_log_ids) -> None:
+    """Rebuild the aggregate rows of several logs in one pass, e.g. after a bulk load."""
+    if daily_log_ids:
+        _replace(db, models.DailyLog.id.in_(list(daily_log_ids)))
+
+def rebuild_aggregates(db: Session, user_id: Optional[int] = None) -> int:
+    """Rebuild every aggregate row (or one user's) from the entry tables. Returns the row count."""
+    criteria = [models.DailyLog.user_id == user_id] if user_id is not None else []
+    return _replace(db, *criteria)
+
+def discard_log(db: Session, daily_log_id: int) -> None:
+    """Drop a log's aggregate row ahead of deleting the log itself."""
+    table = models.DailyAggregate.__table__
+    db.execute(delete(table).where(table.c.daily_log_id == daily_log_id))
+
+def summaries_query(
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Per-day summary rows for a user, newest calendar day first: the same indexed
+    (user_id, calendar_day, id) scan as the daily log listing plus a primary-key join
+    into daily_aggregates. Logs without entries read as zeros.
+    """
+    aggregate = models.DailyAggregate
+    counters = [
+        func.coalesce(getattr(aggregate, column), 0).label(column)
+        for columns in AGGREGATE_SOURCES.values() for column in columns
+    ]
+    stmt = select(
+        models.DailyLog.id,
+        models.DailyLog.log_date,
+        models.DailyLog.date,
+        models.DailyLog.calendar_day.label("calendar_day"),
+        models.DailyLog.overall_mood,
+        *counters,
+        aggregate.mood_min,
+        aggregate.mood_max,
+    ).outerjoin(aggregate, aggregate.daily_log_id == models.DailyLog.id).where(
+        models.DailyLog.user_id == user_id
+    )
+    if start_date:
+        stmt = stmt.where(models.DailyLog.calendar_day >= start_date)
+    if end_date:
+        stmt = stmt.where(models.DailyLog.calendar_day <= end_date)
+    if cursor:
+        stmt = stmt.where(keyset_clause(models.DailyLog.calendar_day, models.DailyLog.id, cursor))
+    return stmt.order_by(models.DailyLog.calendar_day.desc(), models.DailyLog.id.desc())
+
+def _mean(total: int, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+def daily_summary(row) -> Dict[str, Any]:
+    """Shape a summaries_query row for the DailySummary schema."""
+    return {
+        "daily_log_id": row.id,
+        "log_date": row.log_date,
+        "date": row.date,
+        "overall_mood": row.overall_mood,
+        "food_count": row.food_count,
+        "calories_in": row.calories_in,
+        "exercise_count": row.exercise_count,
+        "exercise_minutes": row.exercise_minutes,
+        "calories_burned": row.calories_burned,
+        "net_calories": row.calories_in - row.calories_burned,
+        "work_count": row.work_count,
+        "mean_productivity": _mean(row.productivity_sum, row.work_count),
+        "mean_stress": _mean(row.stress_sum, row.work_count),
+        "event_count": row.event_count,
+        "impact_sum": row.impact_sum,
+        "mood_count": row.mood_count,
+        "mean_mood": _mean(row.mood_sum, row.mood_count),
+        "mood_min": row.mood_min,
+        "mood_max": row.mood_max,
+    }
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild daily_aggregates from the entry tables.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's logs")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        count = rebuild_aggregates(db, args.user_id)
+        db.commit()
+    print(f"Rebuilt {count} daily aggregates", file=sys.stderr)
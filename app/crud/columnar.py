@@ -0,0 +1,107 @@
+# app/crud/columnar.py
+"""
+Columnar (Parquet / Arrow IPC) export of entry tables for analytics.
+
+pyarrow is optional; without it the columnar endpoints answer 501. Enum columns are
+dictionary-encoded against the full enum so every record batch shares one dictionary,
+which the Arrow IPC file format requires.
+"""
+import json
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import select, Date, DateTime, Enum, Integer, JSON
+from sqlalchemy.orm import Session
+
+from .. import models
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+COLUMNAR_BATCH_SIZE = 10000
+
+# Bookkeeping columns left out of the export
+_SKIPPED_COLUMNS = {"created_at", "updated_at"}
+
+def columnar_available() -> bool:
+    return pa is not None
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Enum):
+        return pa.dictionary(pa.int8(), pa.string())
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def _export_columns(model) -> List[Any]:
+    columns = [column for column in model.__table__.columns if column.name not in _SKIPPED_COLUMNS]
+    return columns + [models.DailyLog.user_id.expression, models.DailyLog.log_date.expression]
+
+def arrow_schema(model):
+    return pa.schema([
+        pa.field(column.name, _arrow_type(column.type)) for column in _export_columns(model)
+    ])
+
+def _column_array(column, values: List[Any]):
+    if isinstance(column.type, Enum):
+        # Index into the complete enum rather than the values seen in this batch
+        names = [member.value for member in column.type.enum_class]
+        positions = {member: index for index, member in enumerate(column.type.enum_class)}
+        indices = pa.array([None if value is None else positions[value] for value in values], pa.int8())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(names, pa.string()))
+    if isinstance(column.type, JSON):
+        values = [None if value is None else json.dumps(value) for value in values]
+    return pa.array(values, _arrow_type(column.type))
+
+def record_batches(db: Session, model, user_id: Optional[int] = None, batch_size: int = COLUMNAR_BATCH_SIZE):
+    """Yield RecordBatches of an entry table (one user's rows, or everyone's), read with yield_per."""
+    columns = _export_columns(model)
+    schema = arrow_schema(model)
+    stmt = select(*columns).join(models.DailyLog, model.daily_log_id == models.DailyLog.id)
+    if user_id is not None:
+        stmt = stmt.where(models.DailyLog.user_id == user_id)
+    result = db.execute(stmt.order_by(model.id), execution_options={"yield_per": batch_size})
+    for rows in result.partitions():
+        arrays = [_column_array(column, [row[index] for row in rows]) for index, column in enumerate(columns)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _ChunkSink:
+    """Write-only file object whose buffered bytes are drained as response chunks."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+def columnar_stream(batches, schema, data_format: str) -> Iterator[bytes]:
+    """Encode record batches as a Parquet file (one row group per batch) or an Arrow IPC file."""
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode="w")
+    if data_format == "parquet":
+        writer = pq.ParquetWriter(output, schema)
+    else:
+        writer = pa.ipc.new_file(output, schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,68 @@
+# app/crud/daily_logs.py
+from datetime import datetime, date, timezone as dt_timezone
+from typing import Optional, Dict, Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .. import models
+from ..utils.pagination import keyset_clause
+
+def get_local_date(moment: Optional[datetime], timezone: Optional[str]) -> date:
+    """Calendar day of `moment` (naive values are UTC) in the user's timezone."""
+    moment = moment or datetime.now(dt_timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    try:
+        zone = ZoneInfo(timezone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = ZoneInfo("UTC")
+    return moment.astimezone(zone).date()
+
+def upsert_log_statement(dialect_name: str, values: Dict[str, Any]):
+    """
+    Single-statement get-or-create for (user_id, log_date).
+
+    Fields present in `values` overwrite the stored log, absent ones are kept, and the
+    row is always returned so "open today's log" is one indexed round trip.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    table = models.DailyLog.__table__
+    stmt = dialect.insert(models.DailyLog).values(**values)
+
+    updates = {
+        column: stmt.excluded[column]
+        for column in ("overall_mood", "notes")
+        if values.get(column) is not None
+    }
+    if updates:
+        updates["updated_at"] = func.now()
+        updates["version"] = table.c.version + 1
+    else:
+        # DO NOTHING returns no row on conflict; a no-op update still hands it back
+        updates["overall_mood"] = table.c.overall_mood
+
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.log_date],
+        set_=updates,
+    ).returning(models.DailyLog)
+
+def list_logs_statement(
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    A user's logs, newest calendar day first with id as the tiebreak. Filters, order and
+    cursor all use DailyLog.calendar_day so ix_daily_logs_user_id_calendar_day serves them.
+    """
+    stmt = select(models.DailyLog).where(models.DailyLog.user_id == user_id)
+    if start_date:
+        stmt = stmt.where(models.DailyLog.calendar_day >= start_date)
+    if end_date:
+        stmt = stmt.where(models.DailyLog.calendar_day <= end_date)
+    if cursor:
+        stmt = stmt.where(keyset_clause(models.DailyLog.calendar_day, models.DailyLog.id, cursor))
+    return stmt.order_by(models.DailyLog.calendar_day.desc(), models.DailyLog.id.desc())
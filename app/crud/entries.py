@@ -0,0 +1,54 @@
+# app/crud/entries.py
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from .aggregates import apply_entries
+
+# Batch item `type` -> entry model
+BATCH_ENTRY_MODELS = {
+    "food": models.FoodEntry,
+    "exercise": models.ExerciseEntry,
+    "work": models.WorkEntry,
+    "event": models.EventEntry,
+    "events": models.EventEntry,
+    "mood": models.MoodEntry,
+}
+
+def entry_row(item, daily_log_id: int, default_timestamp: datetime) -> Dict[str, Any]:
+    """Column values for a validated batch item, ready for a Core insert."""
+    row = item.dict(exclude={"type"})
+    row["daily_log_id"] = daily_log_id
+    # Core inserts keep an explicit None; fill in what the model default would have
+    if "timestamp" in row and row["timestamp"] is None:
+        row["timestamp"] = default_timestamp
+    return row
+
+def insert_entry_batch(db: Session, daily_log_id: int, items) -> List[Tuple[str, int]]:
+    """
+    Insert a mixed batch of validated entries: one multi-row INSERT ... RETURNING per
+    entry type and one aggregate upsert for the log. Returns (type, id) in input order.
+    The caller owns the transaction.
+    """
+    now = datetime.utcnow()
+    positions: Dict[str, List[int]] = {}
+    for position, item in enumerate(items):
+        positions.setdefault(item.type, []).append(position)
+
+    created: List[Tuple[str, int]] = [None] * len(items)
+    new_entries = []
+    for entry_type, indexes in positions.items():
+        model = BATCH_ENTRY_MODELS[entry_type]
+        rows = [entry_row(items[index], daily_log_id, now) for index in indexes]
+        ids = db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        for index, entry_id in zip(indexes, ids):
+            created[index] = (entry_type, entry_id)
+        new_entries.extend(model(**row) for row in rows)
+
+    apply_entries(db, daily_log_id, new_entries)
+    return created
@@ -0,0 +1,85 @@
+# app/crud/exports.py
+"""
+Streaming export of a user's history.
+
+Rows use the import format (app.crud.imports): a `log` row per daily log, then one row
+per entry tagged with its `type` and `log_date`, so an export can be loaded back with
+POST /import/. Each table is read with yield_per, which uses a server-side cursor on
+Postgres, so memory stays flat however long the history is.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .entries import BATCH_ENTRY_MODELS
+
+EXPORT_BATCH_SIZE = 1000
+
+# Bookkeeping columns left out of entry rows
+_SKIPPED_COLUMNS = {"id", "daily_log_id", "created_at", "updated_at"}
+
+LOG_COLUMNS = ["date", "overall_mood", "notes"]
+ENTRY_COLUMNS = {
+    entry_type: [column.name for column in model.__table__.columns if column.name not in _SKIPPED_COLUMNS]
+    for entry_type, model in BATCH_ENTRY_MODELS.items()
+}
+
+# CSV header: every column any row type can carry
+CSV_COLUMNS = ["type", "id", "log_date"] + LOG_COLUMNS + list(dict.fromkeys(
+    column for columns in ENTRY_COLUMNS.values() for column in columns
+))
+
+def _sort_column(model):
+    return model.start_time if model is models.WorkEntry else model.timestamp
+
+def export_rows(db: Session, user_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield a user's logs, then their entries table by table, as flat dicts."""
+    options = {"yield_per": batch_size}
+
+    logs = select(models.DailyLog.id, models.DailyLog.log_date, *(
+        getattr(models.DailyLog, column) for column in LOG_COLUMNS
+    )).where(models.DailyLog.user_id == user_id).order_by(models.DailyLog.date, models.DailyLog.id)
+    for row in db.execute(logs, execution_options=options):
+        yield {"type": "log", **row._asdict()}
+
+    for entry_type, model in BATCH_ENTRY_MODELS.items():
+        entries = select(model.id, models.DailyLog.log_date, *(
+            getattr(model, column) for column in ENTRY_COLUMNS[entry_type]
+        )).join(
+            models.DailyLog, model.daily_log_id == models.DailyLog.id
+        ).where(
+            models.DailyLog.user_id == user_id
+        ).order_by(model.daily_log_id, _sort_column(model), model.id)
+        for row in db.execute(entries, execution_options=options):
+            yield {"type": entry_type, **row._asdict()}
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({key: _plain(value) for key, value in row.items()}) + "\n"
+
+def csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            key: json.dumps(value) if isinstance(value, dict) else _plain(value)
+            for key, value in row.items()
+        })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
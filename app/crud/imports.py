@@ -0,0 +1,225 @@
+# app/crud/imports.py
+"""
+Streaming import of historical tracker data.
+
+Each input row is one entry (`type` of food, exercise, work, event or mood, with the
+same fields as the batch endpoint) or a `log` row carrying a day's overall_mood/notes.
+Rows are assigned to the user's log for `log_date`, or for the calendar day of their
+timestamp in the user's timezone. Input is parsed lazily and loaded in chunks (COPY on
+Postgres with psycopg2, executemany elsewhere), one transaction per chunk.
+
+CLI: python -m app.crud.imports --user-id N history.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from .aggregates import recompute_logs
+from .daily_logs import get_local_date, upsert_log_statement
+from .entries import BATCH_ENTRY_MODELS, entry_row
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Row `type` -> schema validating it
+IMPORT_ROW_SCHEMAS = {
+    "food": schemas.FoodBatchItem,
+    "exercise": schemas.ExerciseBatchItem,
+    "work": schemas.WorkBatchItem,
+    "event": schemas.EventBatchItem,
+    "events": schemas.EventBatchItem,
+    "mood": schemas.MoodBatchItem,
+}
+
+def iter_records(stream: IO[bytes], data_format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (line, record, error) from a CSV or NDJSON byte stream without reading it all."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if data_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Blank cells are absent fields, not empty strings
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}, None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+def _error_message(exc: Exception) -> str:
+    errors = getattr(exc, "errors", None)
+    if callable(errors):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in errors()
+        )
+    return str(exc)
+
+def parse_record(record: Dict[str, Any], timezone: Optional[str]):
+    """Validate one input record. Returns (log_date, item); item is a DailyLogOpen for `log` rows."""
+    record = dict(record)
+    row_type = record.get("type")
+    if row_type == "log":
+        item = schemas.DailyLogOpen(**record)
+        if item.log_date is None:
+            raise ValueError("log rows need a log_date")
+        return item.log_date, item
+
+    # Unhashable JSON values (lists, objects) would make the lookup itself fail
+    if not isinstance(row_type, str) or row_type not in IMPORT_ROW_SCHEMAS:
+        raise ValueError(f"Unknown type {row_type!r}")
+    if isinstance(record.get("factors"), str):
+        # CSV carries mood factors as a JSON object in one cell
+        record["factors"] = json.loads(record["factors"])
+    log_date = record.pop("log_date", None)
+    item = IMPORT_ROW_SCHEMAS[row_type](**record)
+
+    if log_date is not None:
+        return date.fromisoformat(str(log_date)), item
+    moment = item.start_time if row_type == "work" else item.timestamp
+    if moment is None:
+        raise ValueError("Either log_date or a timestamp is required")
+    return get_local_date(moment, timezone), item
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+def copy_rows(db: Session, model, rows: List[Dict[str, Any]]) -> None:
+    """Bulk load rows with COPY when the driver supports it, otherwise executemany."""
+    connection = db.connection()
+    if connection.dialect.name != "postgresql" or connection.dialect.driver != "psycopg2":
+        db.execute(insert(model), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {model.__tablename__} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+def _log_id(db: Session, user_id: int, log_date: date, log_ids: Dict[date, int], item=None) -> int:
+    if item is None and log_date in log_ids:
+        return log_ids[log_date]
+    values = {"user_id": user_id, "log_date": log_date, "date": datetime.combine(log_date, time())}
+    if item is not None:
+        values.update(overall_mood=item.overall_mood, notes=item.notes)
+    log_ids[log_date] = db.execute(upsert_log_statement(db.get_bind().dialect.name, values)).scalar_one().id
+    return log_ids[log_date]
+
+def load_chunk(db: Session, user_id: int, parsed: List[Tuple[date, Any]], log_ids: Dict[date, int]) -> int:
+    """Write one chunk of validated rows in the caller's transaction. Returns the entry count."""
+    rows_by_type: Dict[str, List[Dict[str, Any]]] = {}
+    touched = set()
+    for log_date, item in parsed:
+        if isinstance(item, schemas.DailyLogOpen):
+            touched.add(_log_id(db, user_id, log_date, log_ids, item))
+            continue
+        daily_log_id = _log_id(db, user_id, log_date, log_ids)
+        touched.add(daily_log_id)
+        rows_by_type.setdefault(item.type, []).append(
+            entry_row(item, daily_log_id, datetime.combine(log_date, time()))
+        )
+
+    for entry_type, rows in rows_by_type.items():
+        copy_rows(db, BATCH_ENTRY_MODELS[entry_type], rows)
+    recompute_logs(db, touched)
+    return sum(len(rows) for rows in rows_by_type.values())
+
+def import_records(
+    db: Session,
+    user_id: int,
+    records: Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Load parsed records in chunks, committing each one, and yield a progress event per
+    chunk followed by a summary. A chunk that fails to load is rolled back and reported;
+    later chunks still run.
+    """
+    timezone = db.query(models.Profile.timezone).filter(models.Profile.user_id == user_id).scalar()
+    log_ids: Dict[date, int] = {}
+    totals = {"rows": 0, "inserted": 0, "failed": 0}
+    chunk_number = 0
+
+    def flush(parsed, errors, lines):
+        nonlocal chunk_number
+        chunk_number += 1
+        event = {"chunk": chunk_number, "lines": lines, "inserted": 0, "errors": errors}
+        try:
+            event["inserted"] = load_chunk(db, user_id, parsed, log_ids)
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            # Logs upserted by the failed chunk were rolled back with it
+            log_ids.clear()
+            reason = getattr(exc, "orig", None) or exc
+            event["errors"] = errors + [{"line": None, "error": f"Chunk not loaded: {reason}"}]
+            totals["failed"] += len(parsed)
+        totals["failed"] += len(errors)
+        totals["inserted"] += event["inserted"]
+        return event
+
+    parsed, errors, first_line = [], [], None
+    for line_number, record, error in records:
+        totals["rows"] += 1
+        first_line = first_line or line_number
+        if error is None:
+            try:
+                parsed.append(parse_record(record, timezone))
+            except ValueError as exc:
+                error = _error_message(exc)
+        if error is not None:
+            errors.append({"line": line_number, "error": error})
+        if len(parsed) + len(errors) >= chunk_size:
+            yield flush(parsed, errors, [first_line, line_number])
+            parsed, errors, first_line = [], [], None
+
+    if parsed or errors:
+        yield flush(parsed, errors, [first_line, line_number])
+    yield {"done": True, **totals}
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import CSV or NDJSON tracker history for a user.")
+    parser.add_argument("path", help="Input file, or - for stdin")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    data_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    with stream, SessionLocal() as db:
+        for event in import_records(db, args.user_id, iter_records(stream, data_format), args.chunk_size):
+            print(json.dumps(event), file=sys.stderr)
@@ -0,0 +1,23 @@
+# app/crud/loaders.py
+from sqlalchemy.orm import selectinload
+
+from .. import models
+
+# Collections serialised by schemas.DailyLog
+DAILY_LOG_CHILDREN = (
+    models.DailyLog.food_entries,
+    models.DailyLog.exercise_entries,
+    models.DailyLog.work_entries,
+    models.DailyLog.event_entries,
+    models.DailyLog.mood_entries,
+)
+
+def daily_log_options(with_insights: bool = False):
+    """
+    Loader options that fetch a page of logs and all of their entries in a fixed
+    number of queries (one SELECT ... IN per collection) instead of one per log.
+    """
+    options = [selectinload(relationship) for relationship in DAILY_LOG_CHILDREN]
+    if with_insights:
+        options.append(selectinload(models.DailyLog.ai_insights))
+    return options
@@ -0,0 +1,96 @@
+# app/crud/timeline.py
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, union_all, literal, cast, null, tuple_
+from sqlalchemy import String, Text, Integer, DateTime, Enum
+
+from .. import models
+from ..utils.pagination import decode_cursor
+
+# Entry types in tie-break order, with the column each one is placed on the timeline by
+TIMELINE_SOURCES = [
+    ("food", models.FoodEntry, models.FoodEntry.timestamp),
+    ("exercise", models.ExerciseEntry, models.ExerciseEntry.timestamp),
+    ("work", models.WorkEntry, models.WorkEntry.start_time),
+    ("event", models.EventEntry, models.EventEntry.timestamp),
+    ("mood", models.MoodEntry, models.MoodEntry.timestamp),
+]
+
+# Payload columns of the UNION ALL; each branch fills the ones its model has and NULLs the rest
+TIMELINE_COLUMNS = {
+    "description": Text,
+    "food_name": String,
+    "meal_type": String,
+    "calories": Integer,
+    "exercise_type": String,
+    "duration_minutes": Integer,
+    "intensity": String,
+    "calories_burned": Integer,
+    "end_time": DateTime(timezone=True),
+    "productivity_rating": Integer,
+    "stress_level": Integer,
+    "event_type": String,
+    "impact_rating": Integer,
+    "mood_rating": Integer,
+}
+
+def _payload_columns(model):
+    columns = []
+    for name, column_type in TIMELINE_COLUMNS.items():
+        attribute = getattr(model, name, None)
+        if attribute is None:
+            columns.append(cast(null(), column_type).label(name))
+        elif isinstance(attribute.type, Enum):
+            # Each enum is its own database type; compare as text across branches
+            columns.append(cast(attribute, String).label(name))
+        else:
+            columns.append(attribute.label(name))
+    return columns
+
+def timeline_statement(user_id: int, start: datetime, end: datetime, limit: int, cursor: Optional[str] = None):
+    """
+    One UNION ALL over the five entry tables for a user's [start, end) window, ordered
+    by (timestamp, entry type, id) and keyset-paginated on that key. The lower time
+    bound is pushed into every branch so each one can use its (daily_log_id, timestamp)
+    index and, on partitioned tables, prune partitions.
+    """
+    after = decode_cursor(cursor, key_count=2) if cursor else None
+
+    branches = []
+    for rank, (entry_type, model, timestamp) in enumerate(TIMELINE_SOURCES):
+        branch = select(
+            literal(entry_type).label("entry_type"),
+            literal(rank).label("type_rank"),
+            model.id.label("id"),
+            model.daily_log_id.label("daily_log_id"),
+            timestamp.label("timestamp"),
+            *_payload_columns(model),
+        ).join(
+            models.DailyLog, model.daily_log_id == models.DailyLog.id
+        ).where(
+            models.DailyLog.user_id == user_id,
+            timestamp >= start,
+            timestamp < end,
+        )
+        if after:
+            branch = branch.where(timestamp >= after[0])
+        branches.append(branch)
+
+    timeline = union_all(*branches).subquery("timeline")
+    stmt = select(timeline)
+    if after:
+        stmt = stmt.where(tuple_(timeline.c.timestamp, timeline.c.type_rank, timeline.c.id) > tuple_(*after))
+
+    return stmt.order_by(timeline.c.timestamp, timeline.c.type_rank, timeline.c.id).limit(limit + 1)
+
+def timeline_item(row) -> Dict[str, Any]:
+    """Shape a timeline row as {type, id, daily_log_id, timestamp, data} without the NULL padding."""
+    mapping = row._mapping
+    return {
+        "type": mapping["entry_type"],
+        "id": mapping["id"],
+        "daily_log_id": mapping["daily_log_id"],
+        "timestamp": mapping["timestamp"],
+        "data": {name: mapping[name] for name in TIMELINE_COLUMNS if mapping[name] is not None},
+    }
@@ -0,0 +1,69 @@
+# app/crud/versions.py
+"""
+Row versions for conditional GETs.
+
+A version is (count, max id, max updated_at, summed row version) per table a response is
+built from, read in one UNION ALL of aggregates. Inserts move the count and max id,
+deletes move the count (and the aggregate row's updated_at), updates move max updated_at
+and, for daily logs, the per-row version counter, which also catches edits made within
+the same second (SQLite timestamps have whole-second precision).
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+
+from .. import models
+
+# Entries shown inside DailyLogWithInsights
+LOG_DETAIL_MODELS = (
+    models.FoodEntry,
+    models.ExerciseEntry,
+    models.WorkEntry,
+    models.EventEntry,
+    models.MoodEntry,
+)
+
+def _table_version(model, *criteria):
+    changed_at = model.updated_at if hasattr(model, "updated_at") else model.created_at
+    return select(
+        literal(model.__tablename__).label("source"),
+        func.count().label("rows"),
+        func.max(model.id if hasattr(model, "id") else model.daily_log_id).label("max_id"),
+        func.max(changed_at).label("changed_at"),
+        (func.coalesce(func.sum(model.version), 0) if hasattr(model, "version") else literal(0)).label("revision"),
+    ).where(*criteria)
+
+def log_version_statement(log_id: int, user_id: int):
+    """
+    Version of GET /daily-logs/{id}. The first row is the log itself, filtered by owner,
+    so a zero count there means the caller may not see it.
+    """
+    parts = [_table_version(models.DailyLog, models.DailyLog.id == log_id, models.DailyLog.user_id == user_id)]
+    parts += [_table_version(model, model.daily_log_id == log_id) for model in LOG_DETAIL_MODELS]
+    parts += [
+        _table_version(models.AIInsight, models.AIInsight.daily_log_id == log_id),
+        # Touched by every entry write and delete, which keeps Last-Modified moving forward
+        _table_version(models.DailyAggregate, models.DailyAggregate.daily_log_id == log_id),
+    ]
+    return union_all(*parts)
+
+def history_version_statement(user_id: int, *criteria):
+    """Version of a user's logs matching `criteria` and of their entries."""
+    log_ids = select(models.DailyLog.id).where(models.DailyLog.user_id == user_id, *criteria)
+    parts = [_table_version(models.DailyLog, models.DailyLog.user_id == user_id, *criteria)]
+    parts += [_table_version(model, model.daily_log_id.in_(log_ids)) for model in LOG_DETAIL_MODELS]
+    return union_all(*parts)
+
+def entries_version_statement(model, log_id: int):
+    """Version of one entry list of a log."""
+    return _table_version(model, model.daily_log_id == log_id)
+
+def row_version(rows: Iterable) -> Tuple[tuple, Optional[datetime]]:
+    """Collapse version rows into (ETag input, Last-Modified)."""
+    rows = list(rows)
+    changed = [row.changed_at for row in rows if row.changed_at is not None]
+    return (
+        tuple((row.source, row.rows, row.max_id, str(row.changed_at), row.revision) for row in rows),
+        max(changed, default=None),
+    )
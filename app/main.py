@@ -2,19 +2,39 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .routers import users, daily_logs, entries, activity, insights, auth
+from .database import ASYNC_DATABASE, engine, async_engine
+from .routers import insights, imports, exports, internal, jobs
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.partitions import PARTITION_ENTRY_TABLES, ensure_entry_partitions
+from .services.ai_service import close_ai_service
+from .services.jobs import JOB_WORKERS, job_worker
 from app.seeds.seed_runner import seed_database
 
+if ASYNC_DATABASE:
+    from .routers.aio import users, daily_logs, entries, activity, auth, timeline, aggregates
+else:
+    from .routers import users, daily_logs, entries, activity, auth, timeline, aggregates
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # on startup
     if os.getenv("SEED_DB", "false").lower() == "true":
         seed_database()
     
+    if PARTITION_ENTRY_TABLES and engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            ensure_entry_partitions(connection)
+    
+    if JOB_WORKERS:
+        await job_worker.start()
+    
     yield
     
     # on shutdown
-    pass
+    await job_worker.stop()
+    await close_ai_service()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Lifestyle Tracker API",
@@ -30,15 +50,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Routers
 app.include_router(users.router)
 app.include_router(daily_logs.router)
 app.include_router(entries.router)
+app.include_router(timeline.router)
+app.include_router(aggregates.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
 app.include_router(activity.router)
 app.include_router(insights.router)
+app.include_router(jobs.router)
 app.include_router(auth.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def read_root():
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Float, Enum, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Boolean, Text, Float, Enum, JSON, Index, desc, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 import enum
 
@@ -8,6 +11,10 @@ from .database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset order of GET /users/
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -36,17 +43,50 @@ class Profile(Base):
     # Relationships
     user = relationship("User", back_populates="profile")
 
+class utc_day(FunctionElement):
+    """Calendar day of a timestamp in UTC, spelled so both databases can index it."""
+    type = Date()
+    name = "utc_day"
+    inherit_cache = True
+
+@compiles(utc_day)
+def _compile_utc_day(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+@compiles(utc_day, "postgresql")
+def _compile_utc_day_postgresql(element, compiler, **kw):
+    # date(timestamptz) depends on the session timezone and is not indexable
+    return f"CAST(timezone('UTC', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
 class DailyLog(Base):
     __tablename__ = "daily_logs"
+    __table_args__ = (
+        Index("ix_daily_logs_user_id_date", "user_id", desc("date")),
+        # One log per user-local calendar day; also the ON CONFLICT target for upserts
+        Index("ix_daily_logs_user_id_log_date", "user_id", "log_date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     date = Column(DateTime(timezone=True), default=datetime.utcnow)
+    log_date = Column(Date, nullable=True)  # User-local calendar day
     overall_mood = Column(Integer)  # 1-10 scale
     notes = Column(Text, nullable=True)
+    # Bumped by every update; updated_at alone misses edits within the same second
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    @hybrid_property
+    def calendar_day(self):
+        """log_date, or the UTC day of `date` for logs left undated."""
+        return self.log_date or (self.date.date() if self.date else None)
+
+    @calendar_day.inplace.expression
+    @classmethod
+    def _calendar_day_expression(cls):
+        return func.coalesce(cls.log_date, utc_day(cls.date))
+
     # Relationships
     user = relationship("User", back_populates="daily_logs")
     food_entries = relationship("FoodEntry", back_populates="daily_log")
@@ -56,6 +96,31 @@ class DailyLog(Base):
     mood_entries = relationship("MoodEntry", back_populates="daily_log")
     ai_insights = relationship("AIInsight", back_populates="daily_log")
 
+# Listing order (newest calendar day first); an expression index because logs the
+# log_date migration left undated fall back to their timestamp's day
+Index("ix_daily_logs_user_id_calendar_day", DailyLog.user_id, DailyLog.calendar_day, DailyLog.id)
+
+class DailyAggregate(Base):
+    """Per-log running totals, kept in step with the entry tables by app.crud.aggregates."""
+    __tablename__ = "daily_aggregates"
+
+    daily_log_id = Column(Integer, ForeignKey("daily_logs.id"), primary_key=True)
+    food_count = Column(Integer, nullable=False, default=0, server_default="0")
+    calories_in = Column(Integer, nullable=False, default=0, server_default="0")
+    exercise_count = Column(Integer, nullable=False, default=0, server_default="0")
+    exercise_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    calories_burned = Column(Integer, nullable=False, default=0, server_default="0")
+    work_count = Column(Integer, nullable=False, default=0, server_default="0")
+    productivity_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    stress_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    event_count = Column(Integer, nullable=False, default=0, server_default="0")
+    impact_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_count = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_min = Column(Integer, nullable=True)
+    mood_max = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class MealType(enum.Enum):
     breakfast = "breakfast"
     lunch = "lunch"
@@ -65,6 +130,9 @@ class MealType(enum.Enum):
 
 class FoodEntry(Base):
     __tablename__ = "food_entries"
+    __table_args__ = (
+        Index("ix_food_entries_daily_log_id_timestamp", "daily_log_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -87,6 +155,9 @@ class IntensityLevel(enum.Enum):
 
 class ExerciseEntry(Base):
     __tablename__ = "exercise_entries"
+    __table_args__ = (
+        Index("ix_exercise_entries_daily_log_id_timestamp", "daily_log_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -104,6 +175,9 @@ class ExerciseEntry(Base):
 
 class WorkEntry(Base):
     __tablename__ = "work_entries"
+    __table_args__ = (
+        Index("ix_work_entries_daily_log_id_start_time", "daily_log_id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -128,6 +202,9 @@ class EventType(enum.Enum):
 
 class EventEntry(Base):
     __tablename__ = "event_entries"
+    __table_args__ = (
+        Index("ix_event_entries_daily_log_id_timestamp", "daily_log_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -143,6 +220,9 @@ class EventEntry(Base):
 
 class MoodEntry(Base):
     __tablename__ = "mood_entries"
+    __table_args__ = (
+        Index("ix_mood_entries_daily_log_id_timestamp", "daily_log_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -164,6 +244,9 @@ class InsightType(enum.Enum):
 
 class AIInsight(Base):
     __tablename__ = "ai_insights"
+    __table_args__ = (
+        Index("ix_ai_insights_daily_log_id_created_at", "daily_log_id", desc("created_at")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"))
@@ -171,6 +254,10 @@ class AIInsight(Base):
     content = Column(Text)
     related_factors = Column(JSON, nullable=True)  # What factors contributed to this insight
     confidence_score = Column(Float, nullable=True)  # 0.0 to 1.0
+    # SHA-256 of the analysis inputs, used to reuse the insight for unchanged data
+    analysis_hash = Column(String(64), nullable=True, index=True)
+    # Aggregates over the history this insight covered, extended by the next incremental run
+    rolling_summary = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -178,6 +265,9 @@ class AIInsight(Base):
 
 class ActivityRecommendation(Base):
     __tablename__ = "activity_recommendations"
+    __table_args__ = (
+        Index("ix_activity_recommendations_user_id_created_at", "user_id", desc("created_at")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -190,4 +280,38 @@ class ActivityRecommendation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="activity_recommendations")
\ No newline at end of file
+    user = relationship("User", back_populates="activity_recommendations")
+
+class JobKind(enum.Enum):
+    mood_analysis = "mood_analysis"
+    activity_recommendation = "activity_recommendation"
+
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class Job(Base):
+    """Queued AI generation; workers claim queued rows oldest first."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+        Index("ix_jobs_user_id_created_at", "user_id", desc("created_at")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(Enum(JobKind), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.queued)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    insight_id = Column(Integer, ForeignKey("ai_insights.id", ondelete="SET NULL"), nullable=True)
+    recommendation_id = Column(Integer, ForeignKey("activity_recommendations.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    insight = relationship("AIInsight")
+    recommendation = relationship("ActivityRecommendation")
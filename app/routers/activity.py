@@ -1,50 +1,61 @@
 # app/routers/activity.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import models, schemas
 from ..database import get_db
-from ..utils.auth import get_current_user
-from ..services.ai_service import AIService
+from ..utils.auth import get_current_user, Principal
+from ..services.jobs import submit_job
+from ..utils.pagination import keyset_clause, paginate
+from ..utils.response_cache import CachedRoute, cache_response
 
-router = APIRouter(prefix="/activities", tags=["activities"])
+router = APIRouter(prefix="/activities", tags=["activities"], route_class=CachedRoute)
 
 @router.get("/recommendations", response_model=List[schemas.ActivityRecommendation])
+@cache_response
 def get_activity_recommendations(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get activity recommendations for the current user."""
-    recommendations = db.query(models.ActivityRecommendation).filter(
+    """Get activity recommendations for the current user, newest first."""
+    query = db.query(models.ActivityRecommendation).filter(
         models.ActivityRecommendation.user_id == current_user.id
-    ).order_by(models.ActivityRecommendation.created_at.desc()).all()
+    )
+    if cursor:
+        query = query.filter(keyset_clause(
+            models.ActivityRecommendation.created_at, models.ActivityRecommendation.id, cursor
+        ))
     
-    return recommendations
+    recommendations = query.order_by(
+        models.ActivityRecommendation.created_at.desc(), models.ActivityRecommendation.id.desc()
+    ).limit(limit + 1).all()
+    
+    return paginate(recommendations, limit, "created_at", response)
 
-@router.post("/recommendations", response_model=schemas.ActivityRecommendation)
+@router.post("/recommendations", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
 def generate_recommendation(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Generate a new activity recommendation for the current user."""
-    ai_service = AIService()
-    recommendation = ai_service.generate_activity_recommendation(current_user.id, db)
-    
-    if not recommendation:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate recommendation"
-        )
-    
-    return recommendation
+    """
+    Queue a new activity recommendation for the current user.
+    Poll the returned job (see Location) for the recommendation.
+    """
+    job = submit_job(db, current_user.id, models.JobKind.activity_recommendation)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
 
 @router.put("/recommendations/{recommendation_id}", response_model=schemas.ActivityRecommendation)
 def update_recommendation_status(
     recommendation_id: int,
     update_data: schemas.ActivityRecommendationUpdate,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a recommendation (mark as completed, add rating)."""
     recommendation = db.query(models.ActivityRecommendation).filter(
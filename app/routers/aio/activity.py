@@ -0,0 +1,90 @@
+# app/routers/aio/activity.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ... import models, schemas
+from ...database import get_db, get_async_db
+from ...utils.auth import get_current_user_async, Principal
+from ...services.jobs import submit_job
+from ...utils.pagination import keyset_clause, paginate
+from ...utils.response_cache import CachedRoute, cache_response
+
+router = APIRouter(prefix="/activities", tags=["activities"], route_class=CachedRoute)
+
+@router.get("/recommendations", response_model=List[schemas.ActivityRecommendation])
+@cache_response
+async def get_activity_recommendations(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """Get activity recommendations for the current user, newest first."""
+    query = select(models.ActivityRecommendation).where(
+        models.ActivityRecommendation.user_id == current_user.id
+    )
+    if cursor:
+        query = query.where(keyset_clause(
+            models.ActivityRecommendation.created_at, models.ActivityRecommendation.id, cursor
+        ))
+    
+    result = await db.execute(
+        query.order_by(
+            models.ActivityRecommendation.created_at.desc(), models.ActivityRecommendation.id.desc()
+        ).limit(limit + 1)
+    )
+    return paginate(result.scalars().all(), limit, "created_at", response)
+
+# Jobs are enqueued through the sync Session, so this stays a threadpool handler
+@router.post("/recommendations", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def generate_recommendation(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    Queue a new activity recommendation for the current user.
+    Poll the returned job (see Location) for the recommendation.
+    """
+    job = submit_job(db, current_user.id, models.JobKind.activity_recommendation)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@router.put("/recommendations/{recommendation_id}", response_model=schemas.ActivityRecommendation)
+async def update_recommendation_status(
+    recommendation_id: int,
+    update_data: schemas.ActivityRecommendationUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """Update a recommendation (mark as completed, add rating)."""
+    recommendation = await db.get(models.ActivityRecommendation, recommendation_id)
+    
+    if not recommendation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recommendation not found"
+        )
+    
+    # Check if user owns this recommendation
+    if recommendation.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this recommendation"
+        )
+    
+    # Update fields
+    if update_data.is_completed is not None:
+        recommendation.is_completed = update_data.is_completed
+    
+    if update_data.user_rating is not None:
+        recommendation.user_rating = update_data.user_rating
+    
+    await db.commit()
+    await db.refresh(recommendation)
+    
+    return recommendation
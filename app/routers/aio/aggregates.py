@@ -0,0 +1,31 @@
+# app/routers/aio/aggregates.py
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from ... import schemas
+from ...database import get_async_db
+from ...utils.auth import get_current_user_async, Principal
+from ...crud.aggregates import summaries_query, daily_summary
+from ...utils.pagination import paginate
+
+router = APIRouter(prefix="/aggregates", tags=["aggregates"])
+
+@router.get("/daily", response_model=List[schemas.DailySummary])
+async def read_daily_summaries(
+    response: Response,
+    limit: int = Query(31, ge=1, le=366),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    Per-day totals for the current user, newest calendar day first, read from the maintained
+    daily_aggregates table rather than the raw entries.
+    """
+    stmt = summaries_query(current_user.id, start_date, end_date, cursor)
+    result = await db.execute(stmt.limit(limit + 1))
+    return [daily_summary(row) for row in paginate(result.all(), limit, "calendar_day", response)]
@@ -0,0 +1,187 @@
+# app/routers/aio/daily_logs.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from ... import models, schemas
+from ...database import get_async_db
+from ...utils.auth import get_current_user_async, Principal
+from ...crud.loaders import daily_log_options
+from ...crud.daily_logs import get_local_date, list_logs_statement, upsert_log_statement
+from ...crud.aggregates import discard_log
+from ...crud.versions import log_version_statement, row_version
+from ...utils.conditional import not_modified
+from ...utils.owned_logs import hot_logs, missing_log_error_async
+from ...utils.pagination import paginate
+from ...utils.response_cache import CachedRoute, cache_response
+
+router = APIRouter(prefix="/daily-logs", tags=["daily logs"], route_class=CachedRoute)
+
+async def _user_timezone(db: AsyncSession, user_id: int) -> Optional[str]:
+    result = await db.execute(select(models.Profile.timezone).where(models.Profile.user_id == user_id))
+    return result.scalar()
+
+async def _get_log(
+    db: AsyncSession, log_id: int, user_id: int, with_insights: bool = False
+) -> Optional[models.DailyLog]:
+    result = await db.execute(
+        select(models.DailyLog)
+        .options(*daily_log_options(with_insights))
+        .where(models.DailyLog.id == log_id, models.DailyLog.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+@router.post("/", response_model=schemas.DailyLog, status_code=status.HTTP_201_CREATED)
+async def create_daily_log(
+    log: schemas.DailyLogCreate, 
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """Create a new daily log for the current user."""
+    log_data = log.dict()
+    if log_data["log_date"] is None:
+        log_data["log_date"] = get_local_date(log.date, await _user_timezone(db, current_user.id))
+    
+    # The unique (user_id, log_date) index rejects duplicates, no check-then-insert needed
+    db_log = models.DailyLog(
+        **log_data,
+        user_id=current_user.id
+    )
+    db.add(db_log)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A log for this date already exists"
+        )
+    return await _get_log(db, db_log.id, current_user.id)
+
+@router.post("/open", response_model=schemas.DailyLogSummary)
+async def open_daily_log(
+    log: Optional[schemas.DailyLogOpen] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    Get or create the current user's log for a day (today in their timezone by default).
+    Mood and notes, when given, overwrite the stored values.
+    """
+    log = log or schemas.DailyLogOpen()
+    log_date = log.log_date or get_local_date(None, await _user_timezone(db, current_user.id))
+    
+    stmt = upsert_log_statement(db.bind.dialect.name, {
+        "user_id": current_user.id,
+        "log_date": log_date,
+        "overall_mood": log.overall_mood,
+        "notes": log.notes,
+    })
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    db_log = result.scalar_one()
+    await db.commit()
+    # Entries for this log are about to follow; let them skip the ownership query
+    hot_logs.remember(current_user.id, db_log.id)
+    return db_log
+
+@router.get("/", response_model=List[schemas.DailyLog])
+@cache_response
+async def read_daily_logs(
+    response: Response,
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    Get all daily logs for the current user, newest calendar day first, with optional
+    calendar-day filtering.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    stmt = list_logs_statement(current_user.id, start_date, end_date, cursor)
+    result = await db.execute(stmt.options(*daily_log_options()).offset(skip).limit(limit + 1))
+    return paginate(result.scalars().all(), limit, "calendar_day", response)
+
+@router.get("/{log_id}", response_model=schemas.DailyLogWithInsights)
+@cache_response
+async def read_daily_log(
+    log_id: int, 
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    Get a specific daily log by ID.
+    Honours If-None-Match / If-Modified-Since with a 304 before loading the log.
+    """
+    rows = (await db.execute(log_version_statement(log_id, current_user.id))).all()
+    if rows[0].rows == 0:
+        raise await missing_log_error_async(db, log_id)
+    unchanged = not_modified(request, response, *row_version(rows))
+    if unchanged is not None:
+        return unchanged
+    
+    log = await _get_log(db, log_id, current_user.id, with_insights=True)
+    if log is None:
+        raise await missing_log_error_async(db, log_id)
+    return log
+
+@router.put("/{log_id}", response_model=schemas.DailyLog)
+async def update_daily_log(
+    log_id: int, 
+    log_update: schemas.DailyLogCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """Update a daily log."""
+    db_log = await _get_log(db, log_id, current_user.id)
+    if db_log is None:
+        raise await missing_log_error_async(db, log_id, "update")
+    
+    # Update log fields
+    log_data = log_update.dict()
+    if log_data["log_date"] is None:
+        if log_update.date is not None:
+            log_data["log_date"] = get_local_date(log_update.date, await _user_timezone(db, current_user.id))
+        else:
+            del log_data["log_date"]
+    for key, value in log_data.items():
+        setattr(db_log, key, value)
+    
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A log for this date already exists"
+        )
+    return await _get_log(db, log_id, current_user.id)
+
+@router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_daily_log(
+    log_id: int, 
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """Delete a daily log."""
+    result = await db.execute(select(models.DailyLog).where(
+        models.DailyLog.id == log_id, models.DailyLog.user_id == current_user.id
+    ))
+    db_log = result.scalar()
+    if db_log is None:
+        raise await missing_log_error_async(db, log_id, "delete")
+    
+    await db.run_sync(discard_log, log_id)
+    await db.delete(db_log)
+    await db.commit()
+    hot_logs.forget_log(log_id)
+    return None
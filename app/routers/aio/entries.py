@@ -0,0 +1,191 @@
+# app/routers/aio/entries.py
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from ... import models, schemas
+from ...database import get_async_db
+from ...utils.owned_logs import get_owned_log_id_async
+from ...crud.aggregates import apply_entry, remove_entry
+from ...crud.entries import insert_entry_batch
+from ...crud.versions import entries_version_statement, row_version
+from ...utils.conditional import not_modified
+from ...utils.response_cache import CachedRoute
+from ..entries import ENTRY_MODELS
+
+router = APIRouter(tags=["entries"], route_class=CachedRoute)
+
+async def _create_entry(db: AsyncSession, model, entry, log_id: int):
+    db_entry = model(**entry.dict(), daily_log_id=log_id)
+    db.add(db_entry)
+    await db.run_sync(apply_entry, db_entry)
+    await db.commit()
+    await db.refresh(db_entry)
+    return db_entry
+
+async def _read_entries(
+    db: AsyncSession, model, log_id: int, since: Optional[datetime], until: Optional[datetime],
+    request: Request, response: Response
+):
+    # 304 for an unchanged list, checked before the entries are loaded
+    rows = (await db.execute(entries_version_statement(model, log_id))).all()
+    unchanged = not_modified(request, response, *row_version(rows))
+    if unchanged is not None:
+        return unchanged
+    
+    query = select(model).where(model.daily_log_id == log_id)
+    # Bounding by the partition key lets partitioned tables prune
+    timestamp = model.start_time if model is models.WorkEntry else model.timestamp
+    if since:
+        query = query.where(timestamp >= since)
+    if until:
+        query = query.where(timestamp < until)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+# Batch ingestion
+@router.post("/daily-logs/{log_id}/entries:batch", response_model=List[schemas.BatchEntryResult], status_code=status.HTTP_201_CREATED)
+async def create_entry_batch(
+    batch: schemas.EntryBatch,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add a mixed list of entries to a daily log in one transaction.
+    Returns the created ids in request order; nothing is written if any entry is invalid.
+    """
+    created = await db.run_sync(insert_entry_batch, log_id, batch.entries)
+    await db.commit()
+    return [{"type": entry_type, "id": entry_id} for entry_type, entry_id in created]
+
+# Food Entries
+@router.post("/daily-logs/{log_id}/food", response_model=schemas.FoodEntry, status_code=status.HTTP_201_CREATED)
+async def create_food_entry(
+    entry: schemas.FoodEntryCreate,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a food entry to a daily log."""
+    return await _create_entry(db, models.FoodEntry, entry, log_id)
+
+@router.get("/daily-logs/{log_id}/food", response_model=List[schemas.FoodEntry])
+async def read_food_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id_async),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all food entries for a daily log."""
+    return await _read_entries(db, models.FoodEntry, log_id, since, until, request, response)
+
+# Exercise Entries
+@router.post("/daily-logs/{log_id}/exercise", response_model=schemas.ExerciseEntry, status_code=status.HTTP_201_CREATED)
+async def create_exercise_entry(
+    entry: schemas.ExerciseEntryCreate,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add an exercise entry to a daily log."""
+    return await _create_entry(db, models.ExerciseEntry, entry, log_id)
+
+@router.get("/daily-logs/{log_id}/exercise", response_model=List[schemas.ExerciseEntry])
+async def read_exercise_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id_async),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all exercise entries for a daily log."""
+    return await _read_entries(db, models.ExerciseEntry, log_id, since, until, request, response)
+
+# Work Entries
+@router.post("/daily-logs/{log_id}/work", response_model=schemas.WorkEntry, status_code=status.HTTP_201_CREATED)
+async def create_work_entry(
+    entry: schemas.WorkEntryCreate,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a work entry to a daily log."""
+    return await _create_entry(db, models.WorkEntry, entry, log_id)
+
+@router.get("/daily-logs/{log_id}/work", response_model=List[schemas.WorkEntry])
+async def read_work_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id_async),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all work entries for a daily log."""
+    return await _read_entries(db, models.WorkEntry, log_id, since, until, request, response)
+
+# Event Entries
+@router.post("/daily-logs/{log_id}/events", response_model=schemas.EventEntry, status_code=status.HTTP_201_CREATED)
+async def create_event_entry(
+    entry: schemas.EventEntryCreate,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add an event entry to a daily log."""
+    return await _create_entry(db, models.EventEntry, entry, log_id)
+
+@router.get("/daily-logs/{log_id}/events", response_model=List[schemas.EventEntry])
+async def read_event_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id_async),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all event entries for a daily log."""
+    return await _read_entries(db, models.EventEntry, log_id, since, until, request, response)
+
+# Mood Entries
+@router.post("/daily-logs/{log_id}/mood", response_model=schemas.MoodEntry, status_code=status.HTTP_201_CREATED)
+async def create_mood_entry(
+    entry: schemas.MoodEntryCreate,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a mood entry to a daily log."""
+    return await _create_entry(db, models.MoodEntry, entry, log_id)
+
+@router.get("/daily-logs/{log_id}/mood", response_model=List[schemas.MoodEntry])
+async def read_mood_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id_async),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all mood entries for a daily log."""
+    return await _read_entries(db, models.MoodEntry, log_id, since, until, request, response)
+
+@router.delete("/daily-logs/{log_id}/{kind}/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_entry(
+    kind: schemas.EntryKindEnum,
+    entry_id: int,
+    log_id: int = Depends(get_owned_log_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an entry from a daily log."""
+    model = ENTRY_MODELS[kind]
+    result = await db.execute(select(model).where(model.id == entry_id, model.daily_log_id == log_id))
+    db_entry = result.scalar()
+    if db_entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    await db.delete(db_entry)
+    await db.flush()
+    await db.run_sync(remove_entry, db_entry)
+    await db.commit()
+    return None
@@ -0,0 +1,31 @@
+# app/routers/aio/timeline.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timedelta
+
+from ...database import get_async_db
+from ...utils.auth import get_current_user_async, Principal
+from ...crud.timeline import timeline_statement
+from ..timeline import timeline_response
+
+router = APIRouter(prefix="/timeline", tags=["timeline"])
+
+@router.get("/")
+async def read_timeline(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    """
+    All food, exercise, work, event and mood entries of the current user between
+    `start` and `end` (default: the last 7 days), oldest first, as NDJSON.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=7)
+    
+    result = await db.execute(timeline_statement(current_user.id, start, end, limit, cursor))
+    return timeline_response(result.all(), limit)
@@ -0,0 +1,71 @@
+# app/routers/aio/users.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+
+from ... import models, schemas
+from ...database import get_async_db
+from ...utils.auth import get_password_hash_async, get_current_user_async, Principal
+from ...utils.pagination import keyset_clause, paginate
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # email check
+    result = await db.execute(select(models.User).where(models.User.email == user.email))
+    if result.scalars().first():
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
+    # usrname check
+    result = await db.execute(select(models.User).where(models.User.username == user.username))
+    if result.scalars().first():
+        raise HTTPException(status_code=400, detail="Username already taken")
+    
+    # create user with password
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = models.User(
+        email=user.email,
+        username=user.username,
+        hashed_password=hashed_password
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users(
+    response: Response,
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    query = select(models.User)
+    if cursor:
+        query = query.where(keyset_clause(models.User.created_at, models.User.id, cursor, descending=False))
+    
+    result = await db.execute(
+        query.order_by(models.User.created_at, models.User.id).offset(skip).limit(limit + 1)
+    )
+    return paginate(result.scalars().all(), limit, "created_at", response)
+
+@router.get("/{user_id}", response_model=schemas.UserWithProfile)
+async def read_user(
+    user_id: int, 
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+):
+    result = await db.execute(
+        select(models.User)
+        .options(selectinload(models.User.profile))
+        .where(models.User.id == user_id)
+    )
+    db_user = result.scalars().first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
@@ -1,76 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import date
 
 from .. import models, schemas
 from ..database import get_db
-from ..utils.auth import get_current_user
+from ..utils.auth import get_current_user, Principal
+from ..crud.loaders import daily_log_options
+from ..crud.daily_logs import get_local_date, list_logs_statement, upsert_log_statement
+from ..crud.aggregates import discard_log
+from ..crud.versions import log_version_statement, row_version
+from ..utils.conditional import not_modified
+from ..utils.owned_logs import hot_logs, missing_log_error
+from ..utils.pagination import paginate
+from ..utils.response_cache import CachedRoute, cache_response
 
-router = APIRouter(prefix="/daily-logs", tags=["daily logs"])
+router = APIRouter(prefix="/daily-logs", tags=["daily logs"], route_class=CachedRoute)
+
+def _user_timezone(db: Session, user_id: int) -> Optional[str]:
+    return db.query(models.Profile.timezone).filter(models.Profile.user_id == user_id).scalar()
 
 @router.post("/", response_model=schemas.DailyLog, status_code=status.HTTP_201_CREATED)
 def create_daily_log(
     log: schemas.DailyLogCreate, 
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new daily log for the current user."""
-    # Check if user already has a log for this date
-    log_date = log.date or datetime.utcnow()
-    existing_log = db.query(models.DailyLog).filter(
-        models.DailyLog.user_id == current_user.id,
-        models.DailyLog.date == log_date.date()
-    ).first()
+    log_data = log.dict()
+    if log_data["log_date"] is None:
+        log_data["log_date"] = get_local_date(log.date, _user_timezone(db, current_user.id))
     
-    if existing_log:
+    # The unique (user_id, log_date) index rejects duplicates, no check-then-insert needed
+    db_log = models.DailyLog(
+        **log_data,
+        user_id=current_user.id
+    )
+    db.add(db_log)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A log for this date already exists"
         )
+    db.refresh(db_log)
+    return db_log
+
+@router.post("/open", response_model=schemas.DailyLogSummary)
+def open_daily_log(
+    log: Optional[schemas.DailyLogOpen] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get or create the current user's log for a day (today in their timezone by default).
+    Mood and notes, when given, overwrite the stored values.
+    """
+    log = log or schemas.DailyLogOpen()
+    log_date = log.log_date or get_local_date(None, _user_timezone(db, current_user.id))
     
-    # Create new log
-    db_log = models.DailyLog(
-        **log.dict(),
-        user_id=current_user.id
-    )
-    db.add(db_log)
+    stmt = upsert_log_statement(db.bind.dialect.name, {
+        "user_id": current_user.id,
+        "log_date": log_date,
+        "overall_mood": log.overall_mood,
+        "notes": log.notes,
+    })
+    db_log = db.execute(stmt, execution_options={"populate_existing": True}).scalar_one()
+    # Detach so commit does not expire the returned row and force a refresh round trip
+    db.expunge(db_log)
     db.commit()
-    db.refresh(db_log)
+    # Entries for this log are about to follow; let them skip the ownership query
+    hot_logs.remember(current_user.id, db_log.id)
     return db_log
 
 @router.get("/", response_model=List[schemas.DailyLog])
+@cache_response
 def read_daily_logs(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all daily logs for the current user with optional date filtering."""
-    query = db.query(models.DailyLog).filter(models.DailyLog.user_id == current_user.id)
-    
-    if start_date:
-        query = query.filter(models.DailyLog.date >= start_date)
-    if end_date:
-        query = query.filter(models.DailyLog.date <= end_date)
-    
-    logs = query.order_by(models.DailyLog.date.desc()).offset(skip).limit(limit).all()
-    return logs
+    """
+    Get all daily logs for the current user, newest calendar day first, with optional
+    calendar-day filtering.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    stmt = list_logs_statement(current_user.id, start_date, end_date, cursor)
+    logs = db.execute(
+        stmt.options(*daily_log_options()).offset(skip).limit(limit + 1)
+    ).scalars().all()
+    return paginate(logs, limit, "calendar_day", response)
 
 @router.get("/{log_id}", response_model=schemas.DailyLogWithInsights)
+@cache_response
 def read_daily_log(
     log_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get a specific daily log by ID."""
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
+    """
+    Get a specific daily log by ID.
+    Honours If-None-Match / If-Modified-Since with a 304 before loading the log.
+    """
+    rows = db.execute(log_version_statement(log_id, current_user.id)).all()
+    if rows[0].rows == 0:
+        raise missing_log_error(db, log_id)
+    unchanged = not_modified(request, response, *row_version(rows))
+    if unchanged is not None:
+        return unchanged
+    
+    log = db.query(models.DailyLog).options(
+        *daily_log_options(with_insights=True)
+    ).filter(models.DailyLog.id == log_id, models.DailyLog.user_id == current_user.id).first()
     if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
+        raise missing_log_error(db, log_id)
     return log
 
 @router.put("/{log_id}", response_model=schemas.DailyLog)
@@ -78,20 +131,33 @@ def update_daily_log(
     log_id: int, 
     log_update: schemas.DailyLogCreate,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a daily log."""
-    db_log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
+    db_log = db.query(models.DailyLog).options(
+        *daily_log_options()
+    ).filter(models.DailyLog.id == log_id, models.DailyLog.user_id == current_user.id).first()
     if db_log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if db_log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this log")
+        raise missing_log_error(db, log_id, "update")
     
     # Update log fields
-    for key, value in log_update.dict().items():
+    log_data = log_update.dict()
+    if log_data["log_date"] is None:
+        if log_update.date is not None:
+            log_data["log_date"] = get_local_date(log_update.date, _user_timezone(db, current_user.id))
+        else:
+            del log_data["log_date"]
+    for key, value in log_data.items():
         setattr(db_log, key, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A log for this date already exists"
+        )
     db.refresh(db_log)
     return db_log
 
@@ -99,15 +165,17 @@ def update_daily_log(
 def delete_daily_log(
     log_id: int, 
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a daily log."""
-    db_log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
+    db_log = db.query(models.DailyLog).filter(
+        models.DailyLog.id == log_id, models.DailyLog.user_id == current_user.id
+    ).first()
     if db_log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if db_log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this log")
+        raise missing_log_error(db, log_id, "delete")
     
+    discard_log(db, log_id)
     db.delete(db_log)
     db.commit()
+    hot_logs.forget_log(log_id)
     return None
\ No newline at end of file
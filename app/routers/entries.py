@@ -1,159 +1,236 @@
 # app/routers/entries.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 from .. import models, schemas
 from ..database import get_db
-from ..utils.auth import get_current_user
+from ..utils.owned_logs import get_owned_log_id
+from ..crud.aggregates import apply_entry, remove_entry
+from ..crud.entries import insert_entry_batch
+from ..crud.versions import entries_version_statement, row_version
+from ..utils.conditional import not_modified
+from ..utils.response_cache import CachedRoute
 
-router = APIRouter(tags=["entries"])
+router = APIRouter(tags=["entries"], route_class=CachedRoute)
+
+ENTRY_MODELS = {
+    schemas.EntryKindEnum.food: models.FoodEntry,
+    schemas.EntryKindEnum.exercise: models.ExerciseEntry,
+    schemas.EntryKindEnum.work: models.WorkEntry,
+    schemas.EntryKindEnum.events: models.EventEntry,
+    schemas.EntryKindEnum.mood: models.MoodEntry,
+}
+
+def _in_time_range(query, column, since: Optional[datetime], until: Optional[datetime]):
+    """Bound an entry query by its partition key so partitioned tables can prune."""
+    if since:
+        query = query.filter(column >= since)
+    if until:
+        query = query.filter(column < until)
+    return query
+
+def _not_modified(db: Session, model, log_id: int, request: Request, response: Response):
+    """304 for an unchanged entry list, checked before the entries are loaded."""
+    rows = db.execute(entries_version_statement(model, log_id)).all()
+    return not_modified(request, response, *row_version(rows))
+
+# Batch ingestion
+@router.post("/daily-logs/{log_id}/entries:batch", response_model=List[schemas.BatchEntryResult], status_code=status.HTTP_201_CREATED)
+def create_entry_batch(
+    batch: schemas.EntryBatch,
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Add a mixed list of entries to a daily log in one transaction.
+    Returns the created ids in request order; nothing is written if any entry is invalid.
+    """
+    created = insert_entry_batch(db, log_id, batch.entries)
+    db.commit()
+    return [{"type": entry_type, "id": entry_id} for entry_type, entry_id in created]
 
 # Food Entries
 @router.post("/daily-logs/{log_id}/food", response_model=schemas.FoodEntry, status_code=status.HTTP_201_CREATED)
 def create_food_entry(
-    log_id: int,
     entry: schemas.FoodEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
 ):
     """Add a food entry to a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
     # Create food entry
     db_entry = models.FoodEntry(**entry.dict(), daily_log_id=log_id)
     db.add(db_entry)
+    apply_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
     return db_entry
 
 @router.get("/daily-logs/{log_id}/food", response_model=List[schemas.FoodEntry])
 def read_food_entries(
-    log_id: int,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
 ):
     """Get all food entries for a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
-    entries = db.query(models.FoodEntry).filter(models.FoodEntry.daily_log_id == log_id).all()
+    unchanged = _not_modified(db, models.FoodEntry, log_id, request, response)
+    if unchanged is not None:
+        return unchanged
+    query = db.query(models.FoodEntry).filter(models.FoodEntry.daily_log_id == log_id)
+    entries = _in_time_range(query, models.FoodEntry.timestamp, since, until).all()
     return entries
 
 # Exercise Entries
 @router.post("/daily-logs/{log_id}/exercise", response_model=schemas.ExerciseEntry, status_code=status.HTTP_201_CREATED)
 def create_exercise_entry(
-    log_id: int,
     entry: schemas.ExerciseEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
 ):
     """Add an exercise entry to a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
     # Create exercise entry
     db_entry = models.ExerciseEntry(**entry.dict(), daily_log_id=log_id)
     db.add(db_entry)
+    apply_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
     return db_entry
 
 @router.get("/daily-logs/{log_id}/exercise", response_model=List[schemas.ExerciseEntry])
 def read_exercise_entries(
-    log_id: int,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
 ):
     """Get all exercise entries for a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
-    entries = db.query(models.ExerciseEntry).filter(models.ExerciseEntry.daily_log_id == log_id).all()
+    unchanged = _not_modified(db, models.ExerciseEntry, log_id, request, response)
+    if unchanged is not None:
+        return unchanged
+    query = db.query(models.ExerciseEntry).filter(models.ExerciseEntry.daily_log_id == log_id)
+    entries = _in_time_range(query, models.ExerciseEntry.timestamp, since, until).all()
     return entries
 
 # Work Entries
 @router.post("/daily-logs/{log_id}/work", response_model=schemas.WorkEntry, status_code=status.HTTP_201_CREATED)
 def create_work_entry(
-    log_id: int,
     entry: schemas.WorkEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
 ):
     """Add a work entry to a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
     # Create work entry
     db_entry = models.WorkEntry(**entry.dict(), daily_log_id=log_id)
     db.add(db_entry)
+    apply_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
     return db_entry
 
+@router.get("/daily-logs/{log_id}/work", response_model=List[schemas.WorkEntry])
+def read_work_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get all work entries for a daily log."""
+    unchanged = _not_modified(db, models.WorkEntry, log_id, request, response)
+    if unchanged is not None:
+        return unchanged
+    query = db.query(models.WorkEntry).filter(models.WorkEntry.daily_log_id == log_id)
+    entries = _in_time_range(query, models.WorkEntry.start_time, since, until).all()
+    return entries
+
 # Event Entries
 @router.post("/daily-logs/{log_id}/events", response_model=schemas.EventEntry, status_code=status.HTTP_201_CREATED)
 def create_event_entry(
-    log_id: int,
     entry: schemas.EventEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
 ):
     """Add an event entry to a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
     # Create event entry
     db_entry = models.EventEntry(**entry.dict(), daily_log_id=log_id)
     db.add(db_entry)
+    apply_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
     return db_entry
 
+@router.get("/daily-logs/{log_id}/events", response_model=List[schemas.EventEntry])
+def read_event_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get all event entries for a daily log."""
+    unchanged = _not_modified(db, models.EventEntry, log_id, request, response)
+    if unchanged is not None:
+        return unchanged
+    query = db.query(models.EventEntry).filter(models.EventEntry.daily_log_id == log_id)
+    entries = _in_time_range(query, models.EventEntry.timestamp, since, until).all()
+    return entries
+
 # Mood Entries
 @router.post("/daily-logs/{log_id}/mood", response_model=schemas.MoodEntry, status_code=status.HTTP_201_CREATED)
 def create_mood_entry(
-    log_id: int,
     entry: schemas.MoodEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
 ):
     """Add a mood entry to a daily log."""
-    # Verify log exists and belongs to user
-    log = db.query(models.DailyLog).filter(models.DailyLog.id == log_id).first()
-    if log is None:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if log.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this log")
-    
     # Create mood entry
     db_entry = models.MoodEntry(**entry.dict(), daily_log_id=log_id)
     db.add(db_entry)
+    apply_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
-    return db_entry
\ No newline at end of file
+    return db_entry
+
+@router.get("/daily-logs/{log_id}/mood", response_model=List[schemas.MoodEntry])
+def read_mood_entries(
+    request: Request,
+    response: Response,
+    log_id: int = Depends(get_owned_log_id),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get all mood entries for a daily log."""
+    unchanged = _not_modified(db, models.MoodEntry, log_id, request, response)
+    if unchanged is not None:
+        return unchanged
+    query = db.query(models.MoodEntry).filter(models.MoodEntry.daily_log_id == log_id)
+    entries = _in_time_range(query, models.MoodEntry.timestamp, since, until).all()
+    return entries
+
+@router.delete("/daily-logs/{log_id}/{kind}/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_entry(
+    kind: schemas.EntryKindEnum,
+    entry_id: int,
+    log_id: int = Depends(get_owned_log_id),
+    db: Session = Depends(get_db)
+):
+    """Delete an entry from a daily log."""
+    model = ENTRY_MODELS[kind]
+    db_entry = db.query(model).filter(model.id == entry_id, model.daily_log_id == log_id).first()
+    if db_entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    db.delete(db_entry)
+    db.flush()
+    remove_entry(db, db_entry)
+    db.commit()
+    return None
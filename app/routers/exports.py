@@ -0,0 +1,72 @@
+# app/routers/exports.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import schemas
+from ..database import get_db
+from ..utils.auth import get_current_user, Principal
+from ..crud.exports import export_rows, ndjson_lines, csv_lines
+from ..crud.columnar import columnar_available, arrow_schema, record_batches, columnar_stream
+from .entries import ENTRY_MODELS
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+COLUMNAR_MEDIA_TYPES = {
+    schemas.ColumnarFormatEnum.parquet: "application/vnd.apache.parquet",
+    schemas.ColumnarFormatEnum.arrow: "application/vnd.apache.arrow.file",
+}
+
+def columnar_response(
+    db: Session,
+    kind: schemas.EntryKindEnum,
+    data_format: schemas.ColumnarFormatEnum,
+    filename: str,
+    user_id: Optional[int] = None,
+) -> StreamingResponse:
+    """Stream one entry table as Parquet or Arrow IPC, for one user or (user_id=None) everyone."""
+    if not columnar_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export requires pyarrow"
+        )
+    model = ENTRY_MODELS[kind]
+    body = columnar_stream(record_batches(db, model, user_id), arrow_schema(model), data_format.value)
+    return StreamingResponse(
+        body,
+        media_type=COLUMNAR_MEDIA_TYPES[data_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{data_format.value}"'}
+    )
+
+@router.get("/")
+def export_history(
+    data_format: schemas.DataFormatEnum = Query(schemas.DataFormatEnum.ndjson, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Stream the current user's complete history as NDJSON or CSV. The rows use the
+    import format, so the file can be loaded back through POST /import/.
+    """
+    rows = export_rows(db, current_user.id)
+    if data_format == schemas.DataFormatEnum.csv:
+        body, media_type = csv_lines(rows), "text/csv"
+    else:
+        body, media_type = ndjson_lines(rows), "application/x-ndjson"
+    filename = f"gaia-export-{current_user.username}.{data_format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/entries/{kind}")
+def export_entries_columnar(
+    kind: schemas.EntryKindEnum,
+    data_format: schemas.ColumnarFormatEnum = Query(schemas.ColumnarFormatEnum.parquet, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream the current user's entries of one kind as Parquet or an Arrow IPC file."""
+    return columnar_response(db, kind, data_format, f"gaia-{kind.value}-{current_user.username}", current_user.id)
@@ -0,0 +1,41 @@
+# app/routers/imports.py
+import json
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import schemas
+from ..database import get_db
+from ..utils.auth import get_current_user, Principal
+from ..crud.imports import IMPORT_CHUNK_SIZE, iter_records, import_records
+from ..utils.response_cache import response_cache
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+def _event_lines(events, username: str):
+    for event in events:
+        # Chunk events come after that chunk committed (log rows included), so drop cached reads
+        if "chunk" in event:
+            response_cache.invalidate(username)
+        yield json.dumps(jsonable_encoder(event)) + "\n"
+
+@router.post("/")
+def import_history(
+    file: UploadFile = File(...),
+    data_format: Optional[schemas.DataFormatEnum] = Query(None, alias="format"),
+    chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Import CSV or NDJSON history into the current user's logs (format defaults to the
+    file extension). Progress is streamed back as NDJSON: one event per loaded chunk with
+    its row errors, then a summary line.
+    """
+    if data_format is None:
+        data_format = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    events = import_records(db, current_user.id, iter_records(file.file, data_format), chunk_size)
+    return StreamingResponse(_event_lines(events, current_user.username), media_type="application/x-ndjson")
+
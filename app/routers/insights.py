@@ -1,25 +1,24 @@
 # app/routers/insights.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, List, Optional, Union
 
 from app import models, schemas
 from app.database import get_db
-from app.services.ai_service import AIService
-from app.utils.auth import get_current_user
+from app.services.ai_service import AIService, get_ai_service
+from app.services.correlations import CORRELATION_MAX_LAG, correlation_report, correlations_available
+from app.services.jobs import submit_job
+from app.utils.auth import get_current_user, Principal
+from app.utils.pagination import keyset_clause, paginate
+from app.utils.response_cache import CachedRoute, cache_response, response_cache
 
-router = APIRouter(prefix="/insights", tags=["insights"])
+router = APIRouter(prefix="/insights", tags=["insights"], route_class=CachedRoute)
 
-@router.get("/analyze/{user_id}", response_model=schemas.AIInsight)
-def analyze_user_data(
-    user_id: int, 
-    db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
-):
-    """
-    Analyze user data to generate insights about mood patterns.
-    Requires at least 7 days of data.
-    """
+def _check_analysis_allowed(db: Session, current_user: Principal, user_id: int) -> None:
     # Check if user is requesting their own data
     if current_user.id != user_id:
         raise HTTPException(
@@ -34,24 +33,99 @@ def analyze_user_data(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User needs at least 7 days of data for analysis. Currently has {log_count} days."
         )
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def _analysis_events(
+    request: Request, events: AsyncIterator[Union[str, models.AIInsight]], username: str
+) -> AsyncIterator[str]:
+    try:
+        async for item in events:
+            if await request.is_disconnected():
+                break
+            if isinstance(item, str):
+                yield _sse("token", {"text": item})
+            else:
+                response_cache.invalidate(username)
+                yield _sse("insight", schemas.AIInsight.model_validate(item, from_attributes=True))
+                return
+        if not await request.is_disconnected():
+            yield _sse("error", {"detail": "Failed to generate insights"})
+    except Exception as e:
+        print(f"Error streaming insights: {e}")
+        yield _sse("error", {"detail": "Failed to generate insights"})
+    finally:
+        # Closes the upstream Claude stream if we stopped early (disconnect or error)
+        await events.aclose()
+
+@router.get("/analyze/{user_id}", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def analyze_user_data(
+    user_id: int, 
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Queue an analysis of user data to generate insights about mood patterns.
+    Requires at least 7 days of data. Poll the returned job (see Location) for the insight.
+    """
+    _check_analysis_allowed(db, current_user, user_id)
     
-    # Generate insights
-    ai_service = AIService()
-    insight = ai_service.analyze_mood_patterns(user_id, db)
-    
-    if not insight:
+    # Generate insights in the background
+    job = submit_job(db, user_id, models.JobKind.mood_analysis)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@router.get("/analyze/{user_id}/stream")
+async def stream_user_analysis(
+    user_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Run the mood analysis now and stream it as Server-Sent Events: `token` events carry
+    text as Claude generates it, then an `insight` event carries the saved insight (or an
+    `error` event). Disconnecting stops the generation and nothing is saved.
+    """
+    await run_in_threadpool(_check_analysis_allowed, db, current_user, user_id)
+    events = ai_service.stream_mood_analysis(user_id, db)
+    return StreamingResponse(
+        _analysis_events(request, events, current_user.username),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/correlations", response_model=schemas.CorrelationReport)
+@cache_response
+def read_correlations(
+    max_lag: int = Query(CORRELATION_MAX_LAG, ge=0, le=14),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Correlations between the current user's daily activities and mood, computed locally:
+    same-day coefficients and lag effects (activity `lag` days before the mood), with 95%
+    confidence intervals, strongest first.
+    """
+    if not correlations_available():
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate insights"
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Correlation analysis requires numpy"
         )
-    
-    return insight
+    return correlation_report(db, current_user.id, max_lag)
 
 @router.get("/recommendations/{user_id}", response_model=List[schemas.ActivityRecommendation])
 def get_recommendations(
     user_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get activity recommendations for a user.
@@ -63,21 +137,30 @@ def get_recommendations(
             detail="Not authorized to access this user's data"
         )
     
-    # Get existing recommendations
-    recommendations = db.query(models.ActivityRecommendation).filter(
+    # Get existing recommendations, newest first
+    query = db.query(models.ActivityRecommendation).filter(
         models.ActivityRecommendation.user_id == user_id
-    ).all()
+    )
+    if cursor:
+        query = query.filter(keyset_clause(
+            models.ActivityRecommendation.created_at, models.ActivityRecommendation.id, cursor
+        ))
+    
+    recommendations = query.order_by(
+        models.ActivityRecommendation.created_at.desc(), models.ActivityRecommendation.id.desc()
+    ).limit(limit + 1).all()
     
-    return recommendations
+    return paginate(recommendations, limit, "created_at", response)
 
-@router.post("/recommendations/{user_id}", response_model=schemas.ActivityRecommendation)
+@router.post("/recommendations/{user_id}", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
 def create_recommendation(
     user_id: int,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Generate a new activity recommendation for a user.
+    Queue a new activity recommendation for a user; poll the returned job for it.
     """
 
     # Check if user is requesting their own data
@@ -87,14 +170,7 @@ def create_recommendation(
             detail="Not authorized to access this user's data"
         )
     
-    # Generate recommendation
-    ai_service = AIService()
-    recommendation = ai_service.generate_activity_recommendation(user_id, db)
-    
-    if not recommendation:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate recommendation"
-        )
-    
-    return recommendation
\ No newline at end of file
+    # Generate recommendation in the background
+    job = submit_job(db, user_id, models.JobKind.activity_recommendation)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
\ No newline at end of file
@@ -0,0 +1,81 @@
+# app/routers/internal.py
+import os
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import schemas
+from ..database import engine, async_engine, get_db
+from ..services.insight_cache import insight_cache
+from ..services.prompt_compaction import prompt_sizes
+from ..utils.pool_metrics import pool_status
+from ..utils.password_pool import password_hashing
+from ..utils.response_cache import response_cache
+from .exports import columnar_response
+
+# Callers must send it as X-Internal-Token; without it every caller is refused
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+# Explicit opt-out for local development: serve /internal/* without a token when none is set
+INTERNAL_API_OPEN = os.getenv("INTERNAL_API_OPEN", "false").lower() == "true"
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    if INTERNAL_API_TOKEN:
+        authorized = secrets.compare_digest((x_internal_token or "").encode(), INTERNAL_API_TOKEN.encode())
+    else:
+        authorized = INTERNAL_API_OPEN
+    if not authorized:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access internal endpoints"
+        )
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_internal_token)],
+)
+
+@router.get("/pool")
+def read_pool_metrics():
+    """Connection pool occupancy, checkout wait and connect latency histograms."""
+    pools = {"sync": pool_status(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine)
+    return pools
+
+@router.get("/password-hashing")
+def read_password_hashing_metrics():
+    """bcrypt pool occupancy, rejections, and queue wait / run time histograms."""
+    return password_hashing.snapshot()
+
+@router.get("/cache")
+def read_cache_metrics():
+    """Response cache hit/miss counters and backend occupancy for this worker."""
+    return response_cache.snapshot()
+
+@router.get("/insight-cache")
+def read_insight_cache_metrics():
+    """Reuse of stored insights for unchanged analysis data: hits, misses and expired matches."""
+    return insight_cache.snapshot()
+
+@router.get("/prompts")
+def read_prompt_sizes():
+    """Estimated size of recent analysis prompts and how many days each compacted away."""
+    return prompt_sizes.snapshot()
+
+@router.get("/export/entries/{kind}")
+def export_all_entries_columnar(
+    kind: schemas.EntryKindEnum,
+    data_format: schemas.ColumnarFormatEnum = Query(schemas.ColumnarFormatEnum.parquet, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """Every user's entries of one kind as Parquet or an Arrow IPC file, for the data team."""
+    # Unlike the metrics endpoints, never serve other users' data without a configured token
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="INTERNAL_API_TOKEN must be set to export all users"
+        )
+    return columnar_response(db, kind, data_format, f"gaia-{kind.value}")
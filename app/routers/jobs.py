@@ -0,0 +1,26 @@
+# app/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models, schemas
+from ..database import get_db
+from ..utils.auth import get_current_user, Principal
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Status of a generation job. Once it has succeeded, `insight` or `recommendation`
+    holds the result; a failed job carries `error`.
+    """
+    job = db.query(models.Job).options(
+        selectinload(models.Job.insight), selectinload(models.Job.recommendation)
+    ).filter(models.Job.id == job_id, models.Job.user_id == current_user.id).first()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
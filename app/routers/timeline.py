@@ -0,0 +1,45 @@
+# app/routers/timeline.py
+import json
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+
+from ..database import get_db
+from ..utils.auth import get_current_user, Principal
+from ..utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from ..crud.timeline import timeline_statement, timeline_item
+
+router = APIRouter(prefix="/timeline", tags=["timeline"])
+
+def timeline_response(rows, limit: int) -> StreamingResponse:
+    """Stream a fetched page as NDJSON, one entry per line, with the next cursor in a header."""
+    page = rows[:limit]
+    headers = {}
+    if len(rows) > limit:
+        last = page[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp, last.type_rank, last.id)
+    
+    lines = (json.dumps(jsonable_encoder(timeline_item(row))) + "\n" for row in page)
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+
+@router.get("/")
+def read_timeline(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    All food, exercise, work, event and mood entries of the current user between
+    `start` and `end` (default: the last 7 days), oldest first, as NDJSON.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=7)
+    
+    rows = db.execute(timeline_statement(current_user.id, start, end, limit, cursor)).all()
+    return timeline_response(rows, limit)
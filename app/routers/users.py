@@ -1,11 +1,13 @@
 # app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 
 from .. import models, schemas
 from ..database import get_db
-from ..utils.auth import get_password_hash, get_current_user
+from ..utils.auth import get_password_hash, get_current_user, Principal
+from ..utils.password_pool import password_hashing
+from ..utils.pagination import keyset_clause, paginate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -22,7 +24,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Username already taken")
     
     # create user with password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = password_hashing.run(get_password_hash, user.password)
     db_user = models.User(
         email=user.email,
         username=user.username,
@@ -35,21 +37,29 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[schemas.User])
 def read_users(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=1000), 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)  # Add authentication
+    current_user: Principal = Depends(get_current_user)  # Add authentication
 ):
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    query = db.query(models.User)
+    if cursor:
+        query = query.filter(keyset_clause(models.User.created_at, models.User.id, cursor, descending=False))
+    
+    users = query.order_by(models.User.created_at, models.User.id).offset(skip).limit(limit + 1).all()
+    return paginate(users, limit, "created_at", response)
 
 @router.get("/{user_id}", response_model=schemas.UserWithProfile)
 def read_user(
     user_id: int, 
     db: Session = Depends(get_db),
-    current_user: schemas.User = Depends(get_current_user)  # Add authentication
+    current_user: Principal = Depends(get_current_user)  # Add authentication
 ):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = db.query(models.User).options(
+        selectinload(models.User.profile)
+    ).filter(models.User.id == user_id).first()
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
\ No newline at end of file
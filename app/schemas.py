@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, validator, Field
-from typing import Optional, List, Dict, Any, Union
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Union, Literal, Annotated
+from datetime import datetime, date as DateType
 from enum import Enum
 
 class MealTypeEnum(str, Enum):
@@ -30,6 +30,31 @@ class InsightTypeEnum(str, Enum):
     pattern_recognition = "pattern_recognition"
     general_observation = "general_observation"
 
+class EntryKindEnum(str, Enum):
+    food = "food"
+    exercise = "exercise"
+    work = "work"
+    events = "events"
+    mood = "mood"
+
+class DataFormatEnum(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+class ColumnarFormatEnum(str, Enum):
+    parquet = "parquet"
+    arrow = "arrow"
+
+class JobKindEnum(str, Enum):
+    mood_analysis = "mood_analysis"
+    activity_recommendation = "activity_recommendation"
+
+class JobStatusEnum(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
@@ -178,6 +203,35 @@ class MoodEntry(MoodEntryBase):
     class Config:
         orm_mode = True
 
+# Batch entry schemas
+class FoodBatchItem(FoodEntryCreate):
+    type: Literal["food"]
+
+class ExerciseBatchItem(ExerciseEntryCreate):
+    type: Literal["exercise"]
+
+class WorkBatchItem(WorkEntryCreate):
+    type: Literal["work"]
+
+class EventBatchItem(EventEntryCreate):
+    # "events" matches the URL kind (EntryKindEnum); "event" the timeline item type
+    type: Literal["event", "events"]
+
+class MoodBatchItem(MoodEntryCreate):
+    type: Literal["mood"]
+
+BatchEntryItem = Annotated[
+    Union[FoodBatchItem, ExerciseBatchItem, WorkBatchItem, EventBatchItem, MoodBatchItem],
+    Field(discriminator="type"),
+]
+
+class EntryBatch(BaseModel):
+    entries: List[BatchEntryItem] = Field(..., min_items=1, max_items=500)
+
+class BatchEntryResult(BaseModel):
+    type: str
+    id: int
+
 # Daily Log schemas
 class DailyLogBase(BaseModel):
     date: Optional[datetime] = None
@@ -185,11 +239,54 @@ class DailyLogBase(BaseModel):
     notes: Optional[str] = None
 
 class DailyLogCreate(DailyLogBase):
-    pass
+    # User-local calendar day; derived from `date` and the profile timezone when omitted
+    log_date: Optional[DateType] = None
+
+class DailyLogOpen(BaseModel):
+    log_date: Optional[DateType] = None
+    overall_mood: Optional[int] = Field(None, ge=1, le=10)
+    notes: Optional[str] = None
+
+class DailyLogSummary(BaseModel):
+    id: int
+    user_id: int
+    log_date: Optional[DateType] = None
+    date: Optional[datetime] = None
+    overall_mood: Optional[int] = None
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class DailySummary(BaseModel):
+    daily_log_id: int
+    log_date: Optional[DateType] = None
+    date: Optional[datetime] = None
+    overall_mood: Optional[int] = None
+    food_count: int
+    calories_in: int
+    exercise_count: int
+    exercise_minutes: int
+    calories_burned: int
+    net_calories: int
+    work_count: int
+    mean_productivity: Optional[float] = None
+    mean_stress: Optional[float] = None
+    event_count: int
+    impact_sum: int
+    mood_count: int
+    mean_mood: Optional[float] = None
+    mood_min: Optional[int] = None
+    mood_max: Optional[int] = None
 
 class DailyLog(DailyLogBase):
     id: int
     user_id: int
+    log_date: Optional[DateType] = None
+    # Logs opened through /daily-logs/open may not have a mood yet
+    overall_mood: Optional[int] = Field(None, ge=1, le=10)
     created_at: datetime
     updated_at: datetime
     food_entries: List[FoodEntry] = []
@@ -219,6 +316,21 @@ class AIInsight(AIInsightBase):
     class Config:
         orm_mode = True
 
+class Correlation(BaseModel):
+    feature: str
+    lag: int  # Days between the feature and the mood it is compared with
+    r: float
+    n: int
+    ci_low: float
+    ci_high: float
+
+class CorrelationReport(BaseModel):
+    days: int
+    logged_days: int
+    max_lag: int
+    correlations: List[Correlation]
+    lag_effects: List[Correlation]
+
 # Activity Recommendation schemas
 class ActivityRecommendationBase(BaseModel):
     activity_name: str
@@ -243,6 +355,23 @@ class ActivityRecommendation(ActivityRecommendationBase):
     class Config:
         orm_mode = True
 
+# Job schemas
+class Job(BaseModel):
+    id: int
+    kind: JobKindEnum
+    status: JobStatusEnum
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set once the job has succeeded, depending on its kind
+    insight: Optional[AIInsight] = None
+    recommendation: Optional[ActivityRecommendation] = None
+
+    class Config:
+        orm_mode = True
+
 # Combined schemas for nested responses
 class UserWithProfile(User):
     profile: Optional[Profile] = None
@@ -14,6 +14,7 @@ from app.models import (
 )
 from app.utils.auth import get_password_hash
 from app.database import engine, Base, SessionLocal
+from app.crud.aggregates import rebuild_aggregates
 from app.seeds.seed_data import (
     users, generate_daily_logs, generate_entries_for_log, 
     activity_recommendations
@@ -164,6 +165,10 @@ def seed_database():
             
             db.commit()
             print(f"Added activity recommendations for user {user.username}")
+        
+        # Seeded entries bypass the API, so build their daily totals in one pass
+        rebuild_aggregates(db)
+        db.commit()
             
         print("Database seeding completed successfully!")
     except Exception as e:
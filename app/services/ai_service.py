@@ -1,101 +1,278 @@
 # app/services/ai_service.py
 import os
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, time, timezone
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 import anthropic
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas
+from app.crud.loaders import daily_log_options
+from app.crud.versions import history_version_statement, row_version
+from app.services.correlations import prompt_correlations
+from app.services.insight_cache import analysis_key, insight_cache
+from app.services.prompt_compaction import (
+    compact_analysis_data, estimate_tokens, open_logs, prompt_sizes, rolling_summary
+)
+
+ANTHROPIC_MODEL = "claude-3-sonnet-20240229"  # Use appropriate Claude model version
+# Seconds; generation is slow, so the read timeout is the one that matters
+ANTHROPIC_TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", "60"))
+ANTHROPIC_CONNECT_TIMEOUT = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT", "5"))
+ANTHROPIC_MAX_RETRIES = int(os.getenv("ANTHROPIC_MAX_RETRIES", "2"))
+# Bump when the analysis prompt or its parsing changes, so cached insights are regenerated
+ANALYSIS_PROMPT_VERSION = "4"
+# Extend the previous insight's rolling summary with new logs instead of reloading everything
+ANALYSIS_INCREMENTAL = os.getenv("ANALYSIS_INCREMENTAL", "false").lower() == "true"
+# Incremental runs between full rebuilds of the summary
+ANALYSIS_FULL_REFRESH_RUNS = int(os.getenv("ANALYSIS_FULL_REFRESH_RUNS", "10"))
+# How much of the previous insight is quoted to an incremental run
+PREVIOUS_INSIGHT_CHARS = 800
+
+ANALYSIS_SYSTEM_PROMPT = "You are an empathetics, kind, comforting, helpful assistant specialized in analyzing lifestyle patterns and their effects on mood. Your insights should be evidence-based, compassionate, and actionable. Focus on finding correlations between activities, diet, exercise, events, and mood. Don't make unfounded claims, and acknowledge uncertainty when appropriate. DO not ever reccomend seeking a professional, or a doctor. You are a the best and greatest doctor and nutriotionist and psychologist there has ever been."
+RECOMMENDATION_SYSTEM_PROMPT = "You are an AI assistant specialized in recommending personalized activities to improve wellbeing. Your recommendations should be specific, actionable, and tailored to the user's preferences and current mood patterns. Format your response as JSON with fields: activity_name, description, duration_minutes, and expected_benefit."
+
+def create_client(http_client=None) -> anthropic.AsyncAnthropic:
+    """
+    Build the async client. Its HTTP connection pool keeps connections alive between calls;
+    pass `http_client` (e.g. anthropic.DefaultAsyncHttpxClient(transport=...)) to swap the transport.
+    """
+    return anthropic.AsyncAnthropic(
+        # Will default to os.environ.get("ANTHROPIC_API_KEY")
+        timeout=anthropic.Timeout(ANTHROPIC_TIMEOUT, connect=ANTHROPIC_CONNECT_TIMEOUT),
+        max_retries=ANTHROPIC_MAX_RETRIES,
+        http_client=http_client,
+    )
 
 class AIService:
-    def __init__(self):
-        self.client = anthropic.Anthropic(
-            # Will default to os.environ.get("ANTHROPIC_API_KEY")
+    """
+    Database work runs in the threadpool on the caller's sync Session; the Claude call is
+    awaited, so a slow generation holds no thread while it waits.
+    """
+
+    def __init__(self, client: Optional[anthropic.AsyncAnthropic] = None):
+        self.client = client or create_client()
+        self.model = ANTHROPIC_MODEL
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _complete(self, prompt: str, system: str, max_tokens: int) -> str:
+        message = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            system=system
         )
-        self.model = "claude-3-sonnet-20240229"  # Use appropriate Claude model version
+        return message.content[0].text
+
+    def _save(self, db: Session, obj):
+        db.add(obj)
+        db.commit()
+        db.refresh(obj)
+        return obj
 
-    def analyze_mood_patterns(self, user_id: int, db: Session) -> Optional[models.AIInsight]:
+    def _open_from(self, summary: Dict[str, Any]) -> datetime:
+        return datetime.combine(date.fromisoformat(summary["open_from"]), time.min, tzinfo=timezone.utc)
+
+    def _settled_version(self, user_id: int, db: Session, summary: Dict[str, Any]) -> str:
+        """Fingerprint of the logs (and entries) a rolling summary has folded in."""
+        version, _ = row_version(db.execute(history_version_statement(
+            user_id,
+            models.DailyLog.id <= summary["through_log_id"],
+            models.DailyLog.date < self._open_from(summary),
+        )))
+        return hashlib.sha256(repr(version).encode()).hexdigest()
+
+    def _previous_summary(self, user_id: int, db: Session) -> Optional[models.AIInsight]:
+        """The user's latest insight, if its rolling summary can be extended."""
+        if not ANALYSIS_INCREMENTAL:
+            return None
+        previous = db.query(models.AIInsight).join(models.DailyLog).filter(
+            models.DailyLog.user_id == user_id
+        ).order_by(models.AIInsight.created_at.desc(), models.AIInsight.id.desc()).first()
+        summary = previous.rolling_summary if previous is not None else None
+        # Older prompts need a fresh summary, as do edits to logs it has already folded in
+        if (
+            not summary
+            or summary.get("prompt_version") != ANALYSIS_PROMPT_VERSION
+            or summary["runs"] >= ANALYSIS_FULL_REFRESH_RUNS
+            or summary.get("settled_version") != self._settled_version(user_id, db, summary)
+        ):
+            return None
+        return previous
+
+    def _load_analysis_data(self, user_id: int, db: Session) -> Optional[Tuple[int, Dict[str, Any], str]]:
         """
-        Analyze a user's logs to identify patterns affecting their mood.
-        Only runs if user has at least 7 days of logs.
+        Load what the next analysis needs: the log to attach the insight to, the analysis
+        data and its cache key. After a previous insight only logs created since it, or on
+        the days its summary left open, are loaded; its rolling summary covers the rest.
         """
-        # Get user's logs
-        logs = db.query(models.DailyLog).filter(models.DailyLog.user_id == user_id).all()
+        previous = self._previous_summary(user_id, db)
+        query = db.query(models.DailyLog).options(*daily_log_options()).filter(
+            models.DailyLog.user_id == user_id
+        )
+        if previous is not None:
+            summary = previous.rolling_summary
+            query = query.filter(or_(
+                models.DailyLog.id > summary["through_log_id"], models.DailyLog.date >= self._open_from(summary)
+            ))
+        logs = query.order_by(models.DailyLog.id).all()
         
         # Only provide insights if we have at least 7 days of data
-        if len(logs) < 7:
+        if previous is None and len(logs) < 7:
             return None
         
-        # Prepare data for analysis
+        # Prepare data for analysis, attaching the insight to the most recent log
         analysis_data = self._prepare_analysis_data(logs, db)
+        analysis_data["summary"] = rolling_summary(
+            previous.rolling_summary if previous is not None else None,
+            analysis_data["daily_logs"], logs[-1].id if logs else 0, ANALYSIS_PROMPT_VERSION,
+        )
+        # Row versions of the settled logs, so editing one changes the key below and
+        # makes the next incremental run rebuild the summary
+        analysis_data["summary"]["settled_version"] = self._settled_version(user_id, db, analysis_data["summary"])
+        # The summary and the logs it left open identify the data; run counts and
+        # derived parts do not, so an unchanged history maps to the previous key
+        key = analysis_key(
+            {
+                "summary": {k: v for k, v in analysis_data["summary"].items() if k != "runs"},
+                "open_logs": open_logs(analysis_data["summary"], analysis_data["daily_logs"]),
+            },
+            self.model, ANALYSIS_PROMPT_VERSION,
+        )
+        if previous is not None:
+            analysis_data["previous_insight"] = previous.content[:PREVIOUS_INSIGHT_CHARS]
+        log_id = logs[-1].id if logs else previous.daily_log_id
+        return log_id, analysis_data, key
+
+    def _cached_insight(
+        self, user_id: int, db: Session, key: str, analysis_data: Dict[str, Any]
+    ) -> Optional[models.AIInsight]:
+        """
+        The stored insight for `key`, if any. On a miss, adds the locally computed
+        correlations (measured effects for Claude to explain) to `analysis_data`; they
+        only matter when a new analysis is generated.
+        """
+        cached = insight_cache.lookup(db, user_id, key)
+        if cached is None:
+            analysis_data["correlations"] = prompt_correlations(db, user_id)
+        return cached
+
+    async def analyze_mood_patterns(self, user_id: int, db: Session) -> Optional[models.AIInsight]:
+        """
+        Analyze a user's logs to identify patterns affecting their mood.
+        Only runs if user has at least 7 days of logs.
+        """
+        loaded = await run_in_threadpool(self._load_analysis_data, user_id, db)
+        if loaded is None:
+            return None
+        log_id, analysis_data, key = loaded
+
+        # Unchanged data since the last analysis: reuse it instead of asking Claude again
+        cached = await run_in_threadpool(self._cached_insight, user_id, db, key, analysis_data)
+        if cached is not None:
+            return cached
         
         # Generate prompt for Claude
         prompt = self._generate_analysis_prompt(analysis_data)
         
         try:
             # Get insights from Claude
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                system="You are an empathetics, kind, comforting, helpful assistant specialized in analyzing lifestyle patterns and their effects on mood. Your insights should be evidence-based, compassionate, and actionable. Focus on finding correlations between activities, diet, exercise, events, and mood. Don't make unfounded claims, and acknowledge uncertainty when appropriate. DO not ever reccomend seeking a professional, or a doctor. You are a the best and greatest doctor and nutriotionist and psychologist there has ever been."
-            )
+            response_text = await self._complete(prompt, ANALYSIS_SYSTEM_PROMPT, max_tokens=1024)
 
-            # Extract insights from Claude's response
-            insights = self._parse_insights(message.content[0].text)
-            
-            # Create AIInsight object
-            ai_insight = models.AIInsight(
-                daily_log_id=logs[-1].id,  # Attach to most recent log
-                insight_type=models.InsightType.mood_correlation,
-                content=insights["content"],
-                related_factors=insights["factors"],
-                confidence_score=insights["confidence"]
-            )
-            
-            db.add(ai_insight)
-            db.commit()
-            db.refresh(ai_insight)
-            
-            return ai_insight
+            return await run_in_threadpool(self._save, db, self._build_insight(log_id, response_text, key, analysis_data))
             
         except Exception as e:
             print(f"Error generating insights: {e}")
             return None
+
+    async def stream_mood_analysis(
+        self, user_id: int, db: Session
+    ) -> AsyncIterator[Union[str, models.AIInsight]]:
+        """
+        Streaming variant of analyze_mood_patterns: yields text deltas as Claude produces
+        them, then the saved AIInsight once the message is complete (only the insight when
+        a cached one matches the current data). Closing the generator
+        early (client went away) closes the upstream stream, so no more tokens are generated
+        and nothing is saved.
+        """
+        loaded = await run_in_threadpool(self._load_analysis_data, user_id, db)
+        if loaded is None:
+            return
+        log_id, analysis_data, key = loaded
+
+        cached = await run_in_threadpool(self._cached_insight, user_id, db, key, analysis_data)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=1024,
+            messages=[
+                {"role": "user", "content": self._generate_analysis_prompt(analysis_data)}
+            ],
+            system=ANALYSIS_SYSTEM_PROMPT
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+                yield text
+
+        yield await run_in_threadpool(self._save, db, self._build_insight(log_id, "".join(chunks), key, analysis_data))
+
+    def _build_insight(
+        self, log_id: int, response_text: str, key: str, analysis_data: Dict[str, Any]
+    ) -> models.AIInsight:
+        # Extract insights from Claude's response
+        insights = self._parse_insights(response_text)
+        
+        return models.AIInsight(
+            daily_log_id=log_id,
+            insight_type=models.InsightType.mood_correlation,
+            content=insights["content"],
+            related_factors=insights["factors"],
+            confidence_score=insights["confidence"],
+            analysis_hash=key,
+            rolling_summary=analysis_data["summary"]
+        )
     
-    def generate_activity_recommendation(self, user_id: int, db: Session) -> Optional[models.ActivityRecommendation]:
+    def _load_recommendation_data(self, user_id: int, db: Session) -> Dict[str, Any]:
+        # Get user data including profile and recent logs
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        logs = db.query(models.DailyLog).options(
+            selectinload(models.DailyLog.exercise_entries),
+            selectinload(models.DailyLog.event_entries)
+        ).filter(models.DailyLog.user_id == user_id).order_by(models.DailyLog.date.desc()).limit(10).all()
+        
+        return {
+            "preferences": user.profile.activity_preferences if user.profile and user.profile.activity_preferences else {},
+            "recent_mood": [log.overall_mood for log in logs],
+            "recent_activities": self._extract_recent_activities(logs, db)
+        }
+
+    async def generate_activity_recommendation(self, user_id: int, db: Session) -> Optional[models.ActivityRecommendation]:
         """
         Generate a personalized activity recommendation based on user's data.
         """
         try:
-            # Get user data including profile and recent logs
-            user = db.query(models.User).filter(models.User.id == user_id).first()
-            logs = db.query(models.DailyLog).filter(models.DailyLog.user_id == user_id).order_by(models.DailyLog.date.desc()).limit(10).all()
-            
             # Prepare data for recommendation
-            user_data = {
-                "preferences": user.profile.activity_preferences if user.profile and user.profile.activity_preferences else {},
-                "recent_mood": [log.overall_mood for log in logs],
-                "recent_activities": self._extract_recent_activities(logs, db)
-            }
+            user_data = await run_in_threadpool(self._load_recommendation_data, user_id, db)
             
             # Generate prompt for Claude
             prompt = self._generate_recommendation_prompt(user_data)
             
             # Get recommendation from Claude
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=512,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                system="You are an AI assistant specialized in recommending personalized activities to improve wellbeing. Your recommendations should be specific, actionable, and tailored to the user's preferences and current mood patterns. Format your response as JSON with fields: activity_name, description, duration_minutes, and expected_benefit."
-            )
+            response_text = await self._complete(prompt, RECOMMENDATION_SYSTEM_PROMPT, max_tokens=512)
             
             # Parse recommendation from Claude's response
-            recommendation_data = self._parse_recommendation(message.content[0].text)
+            recommendation_data = self._parse_recommendation(response_text)
             
             # Create recommendation object
             recommendation = models.ActivityRecommendation(
@@ -106,11 +283,7 @@ class AIService:
                 expected_benefit=recommendation_data["expected_benefit"]
             )
             
-            db.add(recommendation)
-            db.commit()
-            db.refresh(recommendation)
-            
-            return recommendation
+            return await run_in_threadpool(self._save, db, recommendation)
             
         except Exception as e:
             print(f"Error generating recommendation: {e}")
@@ -173,13 +346,27 @@ class AIService:
     
     def _generate_analysis_prompt(self, analysis_data: Dict[str, Any]) -> str:
         """
-        Generate a prompt for Claude to analyze mood patterns.
+        Generate a prompt for Claude to analyze mood patterns, compacted to the token budget.
         """
+        prompt, report = compact_analysis_data(analysis_data, self._render_analysis_prompt)
+        prompt_sizes.record("mood_analysis", estimate_tokens(prompt), **report)
+        return prompt
+
+    def _render_analysis_prompt(self, compacted: Dict[str, Any]) -> str:
         return f"""
         Analyze the following user lifestyle data and identify patterns that might be affecting their mood.
         
+        The data has these parts: "correlations" lists the strongest statistically significant
+        Pearson correlations with daily mood computed from the full history (`lag` is how many
+        days the factor precedes the mood), "history" aggregates every logged day,
+        "daily_summary" has one row of daily totals per earlier day (mood 1-10, minutes, mean
+        work stress/productivity, summed event impact), and "recent_days" lists the latest
+        days with every entry. Ground the factors you report in the correlations where they apply.
+        When "previous_insight" is set it is your last analysis, and "recent_days" holds only
+        the days logged since then: build on it and focus on what has changed.
+        
         DATA:
-        {json.dumps(analysis_data, indent=2)}
+        {json.dumps(compacted, separators=(",", ":"))}
         
         Please identify:
         1. The strongest correlations between activities and mood
@@ -326,4 +513,20 @@ class AIService:
                 "description": claude_response[:100] if claude_response else "Take some time for self-care",
                 "duration_minutes": 30,
                 "expected_benefit": "Improved wellbeing"
-            }
\ No newline at end of file
+            }
+
+# One client (and connection pool) per process, built on first use
+_ai_service: Optional[AIService] = None
+
+def get_ai_service() -> AIService:
+    """Dependency returning the shared AIService; tests override it with a stand-in."""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+async def close_ai_service() -> None:
+    global _ai_service
+    if _ai_service is not None:
+        service, _ai_service = _ai_service, None
+        await service.close()
@@ -0,0 +1,209 @@
+# app/services/correlations.py
+"""
+Local mood correlations, computed with NumPy instead of asked of Claude.
+
+Each user's history becomes a day x feature matrix, one row per calendar day from the
+first log to the last (days without a log are NaN), built from per-log SQL aggregates of
+the entry tables. Every feature, and the previous days' mood, is correlated with that
+day's mood at lags 0..max_lag in one vectorised pass: Pearson r over the days where both
+values exist, with a 95% confidence interval from the Fisher z-transform.
+
+numpy is optional; without it /insights/correlations answers 501 and analysis prompts
+are built without the correlations.
+"""
+import math
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, false, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+CORRELATION_MAX_LAG = int(os.getenv("CORRELATION_MAX_LAG", "2"))
+# Pairs observed on fewer days are not reported
+CORRELATION_MIN_DAYS = int(os.getenv("CORRELATION_MIN_DAYS", "7"))
+# Food names containing any of these words count towards the bloating_foods feature
+BLOATING_FOODS = [
+    word.strip().lower()
+    for word in os.getenv(
+        "BLOATING_FOODS",
+        "bean,lentil,chickpea,onion,garlic,broccoli,cabbage,cauliflower,milk,cheese,ice cream,soda,beer",
+    ).split(",")
+    if word.strip()
+]
+# Correlations seeded into the analysis prompt
+PROMPT_CORRELATIONS = 8
+Z_95 = 1.959964
+
+INTENSITY_FEATURES = [f"exercise_minutes_{level.value}" for level in models.IntensityLevel]
+FEATURES = INTENSITY_FEATURES + [
+    "calories_in",
+    "calories_burned",
+    "work_stress",
+    "work_productivity",
+    "event_impact",
+    "bloating_foods",
+]
+# Averages are missing on days without entries; the other features are zero
+_AVERAGED = {"work_stress", "work_productivity"}
+
+def correlations_available() -> bool:
+    return np is not None
+
+def _owned(query, model, user_id: int):
+    return query.join(models.DailyLog, models.DailyLog.id == model.daily_log_id).where(
+        models.DailyLog.user_id == user_id
+    ).group_by(model.daily_log_id)
+
+def _feature_rows(db: Session, user_id: int) -> List[Tuple[int, str, Optional[float]]]:
+    """(daily_log_id, feature, value) for every non-empty aggregate."""
+    food = models.FoodEntry
+    bloating = or_(false(), *[func.lower(food.food_name).like(f"%{word}%") for word in BLOATING_FOODS])
+    rows = []
+    for log_id, calories, flagged in db.execute(_owned(
+        select(food.daily_log_id, func.sum(food.calories), func.sum(case((bloating, 1), else_=0))), food, user_id
+    )):
+        rows += [(log_id, "calories_in", calories), (log_id, "bloating_foods", flagged)]
+
+    exercise = models.ExerciseEntry
+    for log_id, intensity, minutes in db.execute(_owned(
+        select(exercise.daily_log_id, exercise.intensity, func.sum(exercise.duration_minutes)), exercise, user_id
+    ).group_by(exercise.intensity)):
+        if intensity is not None:
+            rows.append((log_id, f"exercise_minutes_{intensity.value}", minutes))
+    for log_id, burned in db.execute(_owned(
+        select(exercise.daily_log_id, func.sum(exercise.calories_burned)), exercise, user_id
+    )):
+        rows.append((log_id, "calories_burned", burned))
+
+    work = models.WorkEntry
+    for log_id, stress, productivity in db.execute(_owned(
+        select(work.daily_log_id, func.avg(work.stress_level), func.avg(work.productivity_rating)), work, user_id
+    )):
+        rows += [(log_id, "work_stress", stress), (log_id, "work_productivity", productivity)]
+
+    event = models.EventEntry
+    for log_id, impact in db.execute(_owned(
+        select(event.daily_log_id, func.sum(event.impact_rating)), event, user_id
+    )):
+        rows.append((log_id, "event_impact", impact))
+    return rows
+
+def build_day_matrix(db: Session, user_id: int) -> Tuple[List[date], "np.ndarray", "np.ndarray"]:
+    """
+    Days from the first log to the last, a (days x FEATURES) matrix and the mood vector.
+    Mood is the log's overall_mood, or the mean of its mood entries when that is unset.
+    """
+    mood_entries = dict(db.execute(_owned(
+        select(models.MoodEntry.daily_log_id, func.avg(models.MoodEntry.mood_rating)), models.MoodEntry, user_id
+    )).all())
+    logs = db.execute(
+        select(models.DailyLog.id, models.DailyLog.log_date, models.DailyLog.date, models.DailyLog.overall_mood)
+        .where(models.DailyLog.user_id == user_id)
+    ).all()
+    if not logs:
+        return [], np.empty((0, len(FEATURES))), np.empty(0)
+
+    day_of = {log_id: log_date or logged_at.date() for log_id, log_date, logged_at, _ in logs}
+    first = min(day_of.values())
+    days = [date.fromordinal(ordinal) for ordinal in range(first.toordinal(), max(day_of.values()).toordinal() + 1)]
+    row_of = {log_id: (day - first).days for log_id, day in day_of.items()}
+
+    matrix = np.full((len(days), len(FEATURES)), np.nan)
+    mood = np.full(len(days), np.nan)
+    logged = np.fromiter(row_of.values(), dtype=int)
+    additive = [i for i, name in enumerate(FEATURES) if name not in _AVERAGED]
+    matrix[np.ix_(logged, additive)] = 0.0
+    for log_id, _, _, overall_mood in logs:
+        value = overall_mood if overall_mood is not None else mood_entries.get(log_id)
+        if value is not None:
+            mood[row_of[log_id]] = value
+
+    column = {name: i for i, name in enumerate(FEATURES)}
+    for log_id, name, value in _feature_rows(db, user_id):
+        if value is not None:
+            matrix[row_of[log_id], column[name]] = float(value)
+    return days, matrix, mood
+
+def _shift(matrix: "np.ndarray", lag: int) -> "np.ndarray":
+    """Row t holds row t - lag (NaN where that day precedes the history)."""
+    if lag == 0:
+        return matrix
+    shifted = np.full_like(matrix, np.nan)
+    shifted[lag:] = matrix[:-lag]
+    return shifted
+
+def pearson(matrix: "np.ndarray", target: "np.ndarray"):
+    """
+    Pearson r of every column against `target` over pairwise-complete rows, with the
+    number of rows used and a 95% confidence interval. NaN where undefined.
+    """
+    mask = ~np.isnan(matrix) & ~np.isnan(target)[:, None]
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(mask, matrix, 0.0)
+        y = np.where(mask, target[:, None], 0.0)
+        dx = np.where(mask, x - x.sum(axis=0) / n, 0.0)
+        dy = np.where(mask, y - y.sum(axis=0) / n, 0.0)
+        r = (dx * dy).sum(axis=0) / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+        r = np.clip(r, -1.0, 1.0)
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        margin = Z_95 / np.sqrt(n - 3)
+        low, high = np.tanh(z - margin), np.tanh(z + margin)
+    return r, n, low, high
+
+def correlation_report(db: Session, user_id: int, max_lag: int = CORRELATION_MAX_LAG) -> Dict[str, Any]:
+    """Same-day correlations and lag effects (feature on day t - lag vs mood on day t)."""
+    days, matrix, mood = build_day_matrix(db, user_id)
+    columns, labels = [], []
+    for lag in range(max_lag + 1):
+        columns.append(_shift(matrix, lag))
+        labels += [(name, lag) for name in FEATURES]
+        if lag:
+            # Mood carry-over from previous days
+            columns.append(_shift(mood[:, None], lag))
+            labels.append(("mood", lag))
+    r, n, low, high = pearson(np.hstack(columns), mood)
+
+    found = [
+        {
+            "feature": name,
+            "lag": lag,
+            "r": round(float(r[i]), 3),
+            "n": int(n[i]),
+            "ci_low": round(float(low[i]), 3),
+            "ci_high": round(float(high[i]), 3),
+        }
+        for i, (name, lag) in enumerate(labels)
+        if n[i] >= max(CORRELATION_MIN_DAYS, 4) and math.isfinite(r[i])
+    ]
+    found.sort(key=lambda item: -abs(item["r"]))
+    return {
+        "days": len(days),
+        "logged_days": int((~np.isnan(mood)).sum()),
+        "max_lag": max_lag,
+        "correlations": [item for item in found if item["lag"] == 0],
+        "lag_effects": [item for item in found if item["lag"] > 0],
+    }
+
+def prompt_correlations(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """The strongest correlations whose interval excludes zero, compacted for the analysis prompt."""
+    if not correlations_available():
+        return []
+    report = correlation_report(db, user_id)
+    significant = [
+        item for item in report["correlations"] + report["lag_effects"]
+        if item["ci_low"] > 0 or item["ci_high"] < 0
+    ]
+    significant.sort(key=lambda item: -abs(item["r"]))
+    return [
+        {"feature": item["feature"], "lag": item["lag"], "r": item["r"], "n": item["n"]}
+        for item in significant[:PROMPT_CORRELATIONS]
+    ]
@@ -0,0 +1,91 @@
+# app/services/insight_cache.py
+"""
+Content-addressed reuse of mood analyses.
+
+Each generated AIInsight stores `analysis_hash`, a SHA-256 over the analysis inputs (the
+rolling summary of the user's history plus the prepared logs it leaves open) and the
+model and prompt version. Before
+calling Claude, the service hashes the current payload; if the user already has an
+insight with that hash younger than INSIGHT_CACHE_TTL, it is returned instead of
+generating a duplicate. The insight rows are the cache, so it is shared by every worker
+and survives restarts; expired rows stay as history and are simply no longer served.
+Changing the model or ANALYSIS_PROMPT_VERSION changes every key.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+INSIGHT_CACHE_ENABLED = os.getenv("INSIGHT_CACHE_ENABLED", "true").lower() == "true"
+# Seconds an insight may be reused for identical data
+INSIGHT_CACHE_TTL = float(os.getenv("INSIGHT_CACHE_TTL", str(7 * 24 * 3600)))
+
+def analysis_key(analysis_data: Dict[str, Any], model: str, prompt_version: str) -> str:
+    """Stable hash of the analysis inputs; key order and whitespace do not matter."""
+    payload = json.dumps(
+        {"model": model, "prompt_version": prompt_version, "data": analysis_data},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class InsightCache:
+    """Lookup of stored insights by analysis hash, with per-worker hit/miss counters."""
+
+    def __init__(self, enabled: bool = INSIGHT_CACHE_ENABLED, ttl: float = INSIGHT_CACHE_TTL):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def lookup(self, db: Session, user_id: int, key: str) -> Optional[models.AIInsight]:
+        if not self.enabled:
+            return None
+        insight = db.execute(
+            select(models.AIInsight)
+            .join(models.DailyLog, models.DailyLog.id == models.AIInsight.daily_log_id)
+            .where(models.DailyLog.user_id == user_id, models.AIInsight.analysis_hash == key)
+            .order_by(models.AIInsight.created_at.desc(), models.AIInsight.id.desc())
+            .limit(1)
+        ).scalar()
+        if insight is None:
+            self._count("misses")
+            return None
+        created_at = insight.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - created_at > timedelta(seconds=self.ttl):
+            self._count("expired")
+            return None
+        self._count("hits")
+        return insight
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.expired
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.expired = 0
+
+insight_cache = InsightCache()
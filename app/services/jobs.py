@@ -0,0 +1,234 @@
+# app/services/jobs.py
+"""
+Background jobs for AI generation.
+
+The insight and recommendation endpoints insert a `jobs` row and answer 202 with its id;
+clients poll GET /jobs/{id}. Workers claim queued rows oldest first with a
+compare-and-set UPDATE, so any number of worker processes can share the table, then run
+the AIService call and record the result id or the error.
+
+Workers run inside each web process (JOB_WORKERS tasks, started by the app lifespan) or
+separately: set JOB_WORKERS=0 on the web nodes and run `python -m app.services.jobs`.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.database import SessionLocal
+from app.services.ai_service import AIService, close_ai_service, get_ai_service
+from app.utils.response_cache import response_cache
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds between queue checks when idle; in-process enqueues wake workers immediately
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Running jobs older than this were orphaned by a dead worker and are picked up again
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Seconds between sweeps for orphaned jobs while the workers run
+JOB_REQUEUE_INTERVAL = float(os.getenv("JOB_REQUEUE_INTERVAL", "60"))
+
+# Job kind -> (AIService method, result column, error when the service returns nothing)
+JOB_HANDLERS = {
+    models.JobKind.mood_analysis: ("analyze_mood_patterns", "insight_id", "Failed to generate insights"),
+    models.JobKind.activity_recommendation: (
+        "generate_activity_recommendation", "recommendation_id", "Failed to generate recommendation"
+    ),
+}
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def enqueue_job(db: Session, user_id: int, kind: models.JobKind) -> models.Job:
+    job = models.Job(user_id=user_id, kind=kind, status=models.JobStatus.queued)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def submit_job(db: Session, user_id: int, kind: models.JobKind) -> models.Job:
+    """Enqueue a job and wake this process's workers, if it runs any."""
+    job = enqueue_job(db, user_id, kind)
+    job_worker.notify()
+    return job
+
+def claim_next_job(db: Session) -> Optional[models.Job]:
+    """Move the oldest queued job to running and return it, or None when the queue is empty."""
+    while True:
+        job_id = db.execute(
+            select(models.Job.id)
+            .where(models.Job.status == models.JobStatus.queued)
+            .order_by(models.Job.created_at, models.Job.id)
+            .limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        # Another worker may have claimed it since the SELECT; only one UPDATE matches
+        claimed = db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, models.Job.status == models.JobStatus.queued)
+            .values(status=models.JobStatus.running, started_at=_now(), attempts=models.Job.attempts + 1)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(models.Job, job_id)
+
+def requeue_stale_jobs(db: Session, stale_after: float = JOB_STALE_AFTER) -> int:
+    """Requeue jobs left running by a crashed worker, failing those out of attempts."""
+    stale = [models.Job.status == models.JobStatus.running, models.Job.started_at < _now() - timedelta(seconds=stale_after)]
+    requeued = db.execute(
+        update(models.Job).where(*stale, models.Job.attempts < JOB_MAX_ATTEMPTS).values(status=models.JobStatus.queued)
+    ).rowcount
+    db.execute(
+        update(models.Job).where(*stale).values(
+            status=models.JobStatus.failed, error="Worker stopped before the job finished", finished_at=_now()
+        )
+    )
+    db.commit()
+    return requeued
+
+async def process_job(db: Session, job: models.Job, ai_service: AIService) -> None:
+    """Run a claimed job and record its outcome."""
+    method, result_column, failure = JOB_HANDLERS[job.kind]
+    job_id = job.id
+    try:
+        result = await getattr(ai_service, method)(job.user_id, db)
+        error = None if result is not None else failure
+    except Exception as exc:
+        # Exception text can carry SQL or provider details; clients only see `failure`
+        print(f"Job {job_id} failed: {exc!r}")
+        result, error = None, failure
+
+    def record(status: models.JobStatus, **values) -> None:
+        for column, value in values.items():
+            setattr(job, column, value)
+        job.status = status
+        job.finished_at = _now()
+        db.commit()
+
+    def finish() -> str:
+        if result is None:
+            # A failed call may have left the session mid-transaction
+            db.rollback()
+            record(models.JobStatus.failed, error=error)
+        else:
+            try:
+                record(models.JobStatus.succeeded, **{result_column: result.id})
+            except Exception as exc:
+                print(f"Job {job_id} failed to record its result: {exc!r}")
+                db.rollback()
+                record(models.JobStatus.failed, error=failure)
+        return db.query(models.User.username).filter(models.User.id == job.user_id).scalar()
+
+    username = await run_in_threadpool(finish)
+    # The new insight or recommendation shows up in cached reads
+    if username is not None:
+        response_cache.invalidate(username)
+
+class JobWorker:
+    """A pool of asyncio tasks draining the jobs table."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        concurrency: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        ai_service: Optional[AIService] = None,
+        stale_after: float = JOB_STALE_AFTER,
+        requeue_interval: float = JOB_REQUEUE_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.ai_service = ai_service
+        self.stale_after = stale_after
+        self.requeue_interval = requeue_interval
+        self._next_requeue = 0.0
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        await self.requeue_stale()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = self._loop = None
+
+    def notify(self) -> None:
+        """Wake idle workers; safe to call from threadpool handlers."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def requeue_stale(self) -> int:
+        """Requeue orphaned jobs, at most once per requeue_interval across the pool's tasks."""
+        if time.monotonic() < self._next_requeue:
+            return 0
+        self._next_requeue = time.monotonic() + self.requeue_interval
+        db = self.session_factory()
+        try:
+            return await run_in_threadpool(requeue_stale_jobs, db, self.stale_after)
+        finally:
+            db.close()
+
+    async def run_once(self) -> bool:
+        """Claim and process one job. Returns False when the queue was empty."""
+        db = self.session_factory()
+        try:
+            job = await run_in_threadpool(claim_next_job, db)
+            if job is None:
+                return False
+            await process_job(db, job, self.ai_service or get_ai_service())
+            return True
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.requeue_stale()
+                worked = await self.run_once()
+            except Exception as e:
+                print(f"Error processing job: {e}")
+                worked = False
+            if worked:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+job_worker = JobWorker()
+
+async def _serve(concurrency: int) -> None:
+    worker = JobWorker(concurrency=concurrency)
+    await worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+        await close_ai_service()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run AI generation job workers.")
+    parser.add_argument("--concurrency", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.concurrency))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,312 @@
+# app/services/prompt_compaction.py
+"""
+Token-budgeted compaction of the mood analysis payload.
+
+Sending every log verbatim makes the prompt grow without bound. Instead the history is
+reduced locally to aggregates over all days (top foods and exercises, work stress and
+productivity, events), one numeric summary row per day, and full entries for only the
+most recent days. The aggregates and day rows form a rolling summary that is stored with
+each insight and extended with later logs, so incremental analyses never reload the
+whole history. The rendered prompt is measured with a local estimate (about four
+characters per token); free text is cut to TEXT_CHARS per field, and while the prompt
+exceeds ANALYSIS_PROMPT_TOKEN_BUDGET recent days drop to summaries (down to none), then
+the correlations and previous insight are left out, and only the oldest summaries that
+still fit are added. The aggregates always cover the whole history, so the prompt stays
+within any budget larger than the template plus those aggregates.
+"""
+import json
+import math
+import os
+import threading
+from collections import Counter, deque
+from datetime import date, timedelta
+from statistics import mean
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ANALYSIS_PROMPT_TOKEN_BUDGET = int(os.getenv("ANALYSIS_PROMPT_TOKEN_BUDGET", "6000"))
+# Most recent days sent with every entry; older days are summarized
+ANALYSIS_RECENT_DAYS = int(os.getenv("ANALYSIS_RECENT_DAYS", "7"))
+# Newest days still taking entries; re-sent each run rather than folded into the summary
+ANALYSIS_OPEN_DAYS = max(int(os.getenv("ANALYSIS_OPEN_DAYS", "2")), 1)
+# Days kept as summary rows in the rolling summary stored with each insight
+ANALYSIS_SUMMARY_DAYS = int(os.getenv("ANALYSIS_SUMMARY_DAYS", "90"))
+TOP_ITEMS = 10
+# Foods and exercise types tracked in the rolling summary
+KEPT_ITEMS = 50
+# Longest free text (descriptions, notes) sent per field
+TEXT_CHARS = 500
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count; close enough for English and JSON to keep a safety margin."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(mean(values), 1) if values else None
+
+def summarize_day(log: Dict[str, Any]) -> Dict[str, Any]:
+    """One day's entries reduced to numbers; empty fields are dropped to save tokens."""
+    work = log["work_entries"]
+    summary = {
+        "date": log["date"][:10],
+        "mood": log["overall_mood"],
+        "mood_entries": _mean([entry["mood_rating"] for entry in log["mood_entries"]]),
+        "meals": len(log["food_entries"]),
+        "exercise_minutes": sum(entry["duration_minutes"] or 0 for entry in log["exercise_entries"]),
+        "work_minutes": round(sum(entry["duration_minutes"] for entry in work)),
+        "stress": _mean([entry["stress_level"] for entry in work if entry["stress_level"] is not None]),
+        "productivity": _mean([entry["productivity_rating"] for entry in work if entry["productivity_rating"] is not None]),
+        "event_impact": sum(entry["impact_rating"] or 0 for entry in log["event_entries"]),
+    }
+    return {key: value for key, value in summary.items() if value not in (None, 0)}
+
+def _stats(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {"count": len(values), "sum": sum(values), "min": min(values), "max": max(values)}
+
+def _merge_stats(a: Optional[Dict[str, float]], b: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    if a is None or b is None:
+        return a or b
+    return {"count": a["count"] + b["count"], "sum": a["sum"] + b["sum"], "min": min(a["min"], b["min"]), "max": max(a["max"], b["max"])}
+
+def _stats_view(stats: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    if stats is None:
+        return None
+    return {"mean": round(stats["sum"] / stats["count"], 1), "min": stats["min"], "max": stats["max"]}
+
+def history_state(logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregates over `logs` kept as counts and sums, so states of disjoint logs can be merged."""
+    foods = Counter()
+    exercises: Dict[str, List[int]] = {}
+    events: Dict[str, List[int]] = {}
+    stress, productivity, moods = [], [], []
+    for log in logs:
+        if log["overall_mood"] is not None:
+            moods.append(log["overall_mood"])
+        foods.update(entry["food_name"] for entry in log["food_entries"])
+        for entry in log["exercise_entries"]:
+            totals = exercises.setdefault(entry["exercise_type"], [0, 0])
+            totals[0] += 1
+            totals[1] += entry["duration_minutes"] or 0
+        for entry in log["work_entries"]:
+            if entry["stress_level"] is not None:
+                stress.append(entry["stress_level"])
+            if entry["productivity_rating"] is not None:
+                productivity.append(entry["productivity_rating"])
+        for entry in log["event_entries"]:
+            totals = events.setdefault(entry["event_type"], [0, 0])
+            totals[0] += 1
+            totals[1] += entry["impact_rating"] or 0
+    dates = [log["date"][:10] for log in logs]
+    return {
+        "days": len(logs),
+        "first_date": min(dates, default=None),
+        "last_date": max(dates, default=None),
+        "mood": _stats(moods),
+        "foods": dict(foods),
+        "exercises": exercises,
+        "work_stress": _stats(stress),
+        "work_productivity": _stats(productivity),
+        "events": events,
+    }
+
+def _merge_counts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(a)
+    for key, value in b.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, list):
+            merged[key] = [x + y for x, y in zip(merged[key], value)]
+        else:
+            merged[key] = merged[key] + value
+    return merged
+
+def _most_common(counts: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    ranked = sorted(counts.items(), key=lambda item: -(item[1][0] if isinstance(item[1], list) else item[1]))
+    return dict(ranked[:limit])
+
+def merge_history(state: Optional[Dict[str, Any]], other: Dict[str, Any]) -> Dict[str, Any]:
+    if state is None:
+        merged = dict(other)
+    else:
+        merged = {
+            "days": state["days"] + other["days"],
+            "first_date": min(filter(None, [state["first_date"], other["first_date"]]), default=None),
+            "last_date": max(filter(None, [state["last_date"], other["last_date"]]), default=None),
+            "foods": _merge_counts(state["foods"], other["foods"]),
+            "exercises": _merge_counts(state["exercises"], other["exercises"]),
+            "events": _merge_counts(state["events"], other["events"]),
+        }
+        for key in ("mood", "work_stress", "work_productivity"):
+            merged[key] = _merge_stats(state[key], other[key])
+    # The long tail cannot reach the top list again within a few runs; keep the state small
+    merged["foods"] = _most_common(merged["foods"], KEPT_ITEMS)
+    merged["exercises"] = _most_common(merged["exercises"], KEPT_ITEMS)
+    return merged
+
+def history_view(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The aggregates as sent to Claude: means and ranges, top foods and exercises."""
+    return {
+        "days": state["days"],
+        "first_date": state["first_date"],
+        "last_date": state["last_date"],
+        "overall_mood": _stats_view(state["mood"]),
+        "top_foods": list(_most_common(state["foods"], TOP_ITEMS).items()),
+        "top_exercises": [
+            {"type": name, "sessions": sessions, "minutes": minutes}
+            for name, (sessions, minutes) in _most_common(state["exercises"], TOP_ITEMS).items()
+        ],
+        "work_stress": _stats_view(state["work_stress"]),
+        "work_productivity": _stats_view(state["work_productivity"]),
+        "events": {
+            event_type: {"count": count, "mean_impact": round(impact / count, 1)}
+            for event_type, (count, impact) in state["events"].items()
+        },
+    }
+
+def open_logs(summary: Dict[str, Any], logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The logs not yet folded into the summary's aggregates."""
+    return [log for log in logs if log["date"][:10] >= summary["open_from"]]
+
+def rolling_summary(
+    previous: Optional[Dict[str, Any]], logs: List[Dict[str, Any]], through_log_id: int, prompt_version: str
+) -> Dict[str, Any]:
+    """
+    Extend the rolling summary stored with each insight by `logs`: every log created
+    since `previous` (ids above its through_log_id) or on one of its open days. The newest ANALYSIS_OPEN_DAYS days stay
+    open, since entries are still being added to them, and are sent again next time;
+    older logs are folded into mergeable aggregates. Per-day summary rows are kept for the
+    last ANALYSIS_SUMMARY_DAYS days.
+    """
+    dates = [log["date"][:10] for log in logs] + ([previous["last_date"]] if previous else [])
+    last_date = max(dates, default=None)
+    open_from = last_date and (date.fromisoformat(last_date) - timedelta(days=ANALYSIS_OPEN_DAYS - 1)).isoformat()
+    if previous:
+        open_from = max(open_from, previous["open_from"])
+
+    days = {row["date"]: row for row in previous["days"]} if previous else {}
+    days.update((row["date"], row) for row in map(summarize_day, logs))
+    settled = [log for log in logs if log["date"][:10] < open_from]
+    return {
+        "prompt_version": prompt_version,
+        "through_log_id": max(through_log_id, previous["through_log_id"]) if previous else through_log_id,
+        "last_date": last_date,
+        "open_from": open_from,
+        "runs": previous["runs"] + 1 if previous else 1,
+        "history": merge_history(previous["history"] if previous else None, history_state(settled)),
+        "days": sorted(days.values(), key=lambda row: row["date"])[-ANALYSIS_SUMMARY_DAYS:],
+    }
+
+def _truncate_text(value: Any, limit: int = TEXT_CHARS) -> Any:
+    """`value` with every string longer than `limit` characters cut short."""
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "..."
+    if isinstance(value, dict):
+        return {key: _truncate_text(item, limit) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_truncate_text(item, limit) for item in value]
+    return value
+
+def compact_analysis_data(
+    analysis_data: Dict[str, Any],
+    render: Callable[[Dict[str, Any]], str],
+    token_budget: int = ANALYSIS_PROMPT_TOKEN_BUDGET,
+    recent_days: int = ANALYSIS_RECENT_DAYS,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Render the compacted payload with `render` (payload -> prompt) within the budget.
+    `analysis_data` holds the logs to consider in full and the rolling summary covering
+    them and everything before. Returns the prompt and a report of how many days went in
+    full, summarized, or omitted.
+    """
+    logs = sorted(analysis_data["daily_logs"], key=lambda log: log["date"])
+    summary = analysis_data["summary"]
+    history = _truncate_text(history_view(merge_history(summary["history"], history_state(open_logs(summary, logs)))))
+    recent_logs = [_truncate_text(log) for log in logs]
+    extras = True
+
+    def earlier_days(recent: int) -> List[Dict[str, Any]]:
+        in_full = {log["date"][:10] for log in logs[len(logs) - recent:]}
+        return [row for row in summary["days"] if row["date"] not in in_full]
+
+    def payload(recent: int, summarized: int) -> Dict[str, Any]:
+        earlier = earlier_days(recent)
+        return {
+            "correlations": analysis_data.get("correlations", []) if extras else [],
+            "previous_insight": analysis_data.get("previous_insight") if extras else None,
+            "history": history,
+            "days_omitted": history["days"] - recent - summarized,
+            "daily_summary": earlier[len(earlier) - summarized:] if summarized else [],
+            "recent_days": recent_logs[len(logs) - recent:],
+        }
+
+    # Fixed part first: aggregates plus full recent days, shrinking the full window if needed
+    recent = min(recent_days, len(logs))
+    prompt = render(payload(recent, 0))
+    while recent > 0 and estimate_tokens(prompt) > token_budget:
+        recent -= 1
+        prompt = render(payload(recent, 0))
+    if estimate_tokens(prompt) > token_budget:
+        extras = False
+        prompt = render(payload(recent, 0))
+
+    # Then as many day summaries as still fit, newest first
+    available = token_budget - estimate_tokens(prompt)
+    used = summarized = 0
+    for row in reversed(earlier_days(recent)):
+        # Priced as compact JSON plus a separating comma
+        cost = estimate_tokens(json.dumps(row, separators=(",", ":"))) + 1
+        if used + cost > available:
+            break
+        used += cost
+        summarized += 1
+    if summarized:
+        prompt = render(payload(recent, summarized))
+    # `render` may format rows less compactly than priced; trim by the measured overshoot
+    priced_per_row = used / summarized if summarized else 1
+    while summarized and estimate_tokens(prompt) > token_budget:
+        overshoot = estimate_tokens(prompt) - token_budget
+        summarized = max(summarized - math.ceil(overshoot / priced_per_row), 0)
+        prompt = render(payload(recent, summarized))
+
+    return prompt, {
+        "days_total": history["days"],
+        "days_in_full": recent,
+        "days_summarized": summarized,
+        "days_omitted": history["days"] - recent - summarized,
+    }
+
+class PromptSizeStats:
+    """Estimated prompt size of each Claude call, kept for the most recent calls."""
+
+    def __init__(self, keep: int = 100):
+        self.calls = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+        self.recent = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, estimated_tokens: int, **details: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_tokens += estimated_tokens
+            self.max_tokens = max(self.max_tokens, estimated_tokens)
+            self.recent.append({"kind": kind, "estimated_tokens": estimated_tokens, **details})
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "token_budget": ANALYSIS_PROMPT_TOKEN_BUDGET,
+                "calls": self.calls,
+                "mean_tokens": round(self.total_tokens / self.calls, 1) if self.calls else 0.0,
+                "max_tokens": self.max_tokens,
+                "recent": list(self.recent),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.total_tokens = self.max_tokens = 0
+            self.recent.clear()
+
+prompt_sizes = PromptSizeStats()
@@ -1,21 +1,37 @@
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, NullPool
 import os
 from dotenv import load_dotenv
 
+# Tests drive jobs explicitly instead of through workers polling the app's own database
+os.environ.setdefault("JOB_WORKERS", "0")
+# Metrics tests read /internal/* without a token
+os.environ.setdefault("INTERNAL_API_OPEN", "true")
+
 from app.main import app 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.routers.aio import (
+    users as aio_users, daily_logs as aio_daily_logs, entries as aio_entries,
+    activity as aio_activity, auth as aio_auth, timeline as aio_timeline, aggregates as aio_aggregates
+)
 from app.models import User
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, principals
+from app.utils.owned_logs import hot_logs
+from app.utils.response_cache import response_cache
+from app.services.insight_cache import insight_cache
+from app.services.prompt_compaction import prompt_sizes
 
 # Load environment variables
 load_dotenv()
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 @pytest.fixture(scope="function")
 def test_db():
@@ -39,6 +55,12 @@ def test_db():
         db.close()
         # Clean up
         Base.metadata.drop_all(bind=engine)
+        # Ids restart with the next database; drop per-worker caches keyed on them
+        hot_logs.clear()
+        response_cache.backend.clear()
+        principals.clear()
+        insight_cache.reset()
+        prompt_sizes.reset()
 
 @pytest.fixture(scope="function")
 def client(test_db):
@@ -57,6 +79,24 @@ def client(test_db):
     # Reset dependencies
     app.dependency_overrides = {}
 
+@pytest.fixture(scope="function")
+def async_client(test_db):
+    # Serve the async routers against the same SQLite file the sync fixtures write to
+    engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    for module in (aio_users, aio_daily_logs, aio_entries, aio_activity, aio_auth, aio_timeline, aio_aggregates):
+        async_app.include_router(module.router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(async_app) as c:
+        yield c
+
 @pytest.fixture(scope="function")
 def test_user(test_db):
     # Create a test user
@@ -0,0 +1,33 @@
+# app/tests/test_activities.py
+from datetime import datetime, timedelta
+
+from app import models
+from .utils import get_test_token, get_auth_headers
+
+def test_recommendations_cursor_pagination(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    for i in range(3):
+        test_db.add(models.ActivityRecommendation(
+            user_id=test_user.id,
+            activity_name=f"Activity {i}",
+            description="Test",
+            duration_minutes=10,
+            expected_benefit="Calm",
+            created_at=datetime(2025, 1, 1) + timedelta(hours=i)
+        ))
+    test_db.commit()
+    
+    first = client.get("/activities/recommendations", params={"limit": 2}, headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+    
+    second = client.get("/activities/recommendations", params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert second.status_code == 200
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+    
+    ids = {rec["id"] for rec in first.json() + second.json()}
+    assert len(ids) == 3
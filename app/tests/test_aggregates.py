@@ -0,0 +1,117 @@
+# app/tests/test_aggregates.py
+from datetime import datetime
+
+from .utils import get_test_token, get_auth_headers
+from ..crud.aggregates import rebuild_aggregates
+from ..models import DailyAggregate, DailyLog, MoodEntry
+
+def _log_with_entries(client, headers):
+    log = client.post("/daily-logs/", json={"overall_mood": 7}, headers=headers).json()
+    base = f"/daily-logs/{log['id']}"
+    client.post(f"{base}/food", json={"food_name": "Oatmeal", "meal_type": "breakfast", "calories": 300}, headers=headers)
+    client.post(f"{base}/food", json={"food_name": "Salad", "meal_type": "lunch", "calories": 450}, headers=headers)
+    client.post(
+        f"{base}/exercise",
+        json={"exercise_type": "Running", "duration_minutes": 30, "intensity": "moderate", "calories_burned": 250},
+        headers=headers
+    )
+    client.post(
+        f"{base}/work",
+        json={"description": "Report", "start_time": "2024-01-01T09:00:00", "end_time": "2024-01-01T12:00:00",
+              "productivity_rating": 8, "stress_level": 6},
+        headers=headers
+    )
+    client.post(
+        f"{base}/work",
+        json={"description": "Meetings", "start_time": "2024-01-01T13:00:00", "end_time": "2024-01-01T15:00:00",
+              "productivity_rating": 5, "stress_level": 3},
+        headers=headers
+    )
+    moods = [
+        client.post(f"{base}/mood", json={"mood_rating": rating}, headers=headers).json()
+        for rating in (4, 9, 6)
+    ]
+    return log, moods
+
+def test_daily_summary_tracks_entry_writes(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log, moods = _log_with_entries(client, headers)
+    
+    response = client.get("/aggregates/daily", headers=headers)
+    assert response.status_code == 200
+    summary = response.json()[0]
+    assert summary["daily_log_id"] == log["id"]
+    assert summary["food_count"] == 2
+    assert summary["calories_in"] == 750
+    assert summary["calories_burned"] == 250
+    assert summary["net_calories"] == 500
+    assert summary["exercise_minutes"] == 30
+    assert summary["mean_stress"] == 4.5
+    assert summary["mean_productivity"] == 6.5
+    assert (summary["mood_min"], summary["mood_max"], summary["mood_count"]) == (4, 9, 3)
+    
+    # Deleting the highest mood has to recompute the max rather than decrement it
+    response = client.delete(f"/daily-logs/{log['id']}/mood/{moods[1]['id']}", headers=headers)
+    assert response.status_code == 204
+    summary = client.get("/aggregates/daily", headers=headers).json()[0]
+    assert (summary["mood_min"], summary["mood_max"], summary["mood_count"]) == (4, 6, 2)
+    assert summary["mean_mood"] == 5.0
+
+def test_delete_entry_checks_log(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log = client.post("/daily-logs/", json={"overall_mood": 7}, headers=headers).json()
+    
+    response = client.delete(f"/daily-logs/{log['id']}/food/999", headers=headers)
+    assert response.status_code == 404
+    response = client.delete(f"/daily-logs/{log['id']}/snacks/1", headers=headers)
+    assert response.status_code == 422
+
+def test_log_without_entries_reads_as_zero(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    client.post("/daily-logs/", json={"overall_mood": 5}, headers=headers)
+    
+    summary = client.get("/aggregates/daily", headers=headers).json()[0]
+    assert summary["calories_in"] == 0
+    assert summary["mean_mood"] is None
+    assert summary["mood_max"] is None
+
+def test_summaries_filter_on_calendar_day(client, test_user, test_db):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    # Undated, as the log_date migration leaves duplicate legacy logs
+    test_db.add(DailyLog(user_id=test_user.id, date=datetime(2025, 3, 2, 8), overall_mood=5))
+    test_db.commit()
+    client.post("/daily-logs/", json={"overall_mood": 6, "log_date": "2025-03-01"}, headers=headers)
+    
+    params = {"start_date": "2025-03-02"}
+    listed = client.get("/daily-logs/", params=params, headers=headers).json()
+    summaries = client.get("/aggregates/daily", params=params, headers=headers).json()
+    assert [log["id"] for log in listed] == [summary["daily_log_id"] for summary in summaries]
+    assert len(summaries) == 1
+    
+    first = client.get("/aggregates/daily", params={"limit": 1}, headers=headers)
+    second = client.get("/aggregates/daily", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]}, headers=headers)
+    assert [summary["log_date"] for summary in first.json() + second.json()] == [None, "2025-03-01"]
+
+def test_rebuild_matches_incremental(client, test_user, test_db):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log, _ = _log_with_entries(client, headers)
+    
+    # Simulate a write that bypassed the API
+    test_db.add(MoodEntry(daily_log_id=log["id"], mood_rating=1))
+    test_db.commit()
+    
+    assert rebuild_aggregates(test_db, test_user.id) == 1
+    test_db.commit()
+    aggregate = test_db.get(DailyAggregate, log["id"])
+    assert (aggregate.mood_min, aggregate.mood_count, aggregate.calories_in) == (1, 4, 750)
+    assert aggregate.stress_sum == 9
+
+def test_async_daily_summary(async_client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log, moods = _log_with_entries(async_client, headers)
+    
+    response = async_client.delete(f"/daily-logs/{log['id']}/mood/{moods[0]['id']}", headers=headers)
+    assert response.status_code == 204
+    summary = async_client.get("/aggregates/daily", headers=headers).json()[0]
+    assert summary["calories_in"] == 750
+    assert (summary["mood_min"], summary["mood_max"]) == (6, 9)
@@ -0,0 +1,94 @@
+# app/tests/test_async_db.py
+from .utils import get_test_token, get_auth_headers
+
+def test_async_create_and_read_daily_log(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    response = async_client.post(
+        "/daily-logs/",
+        json={"overall_mood": 8, "notes": "Async log"},
+        headers=headers
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["user_id"] == test_user.id
+    assert data["food_entries"] == []
+    
+    response = async_client.get(f"/daily-logs/{data['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["notes"] == "Async log"
+    assert response.json()["ai_insights"] == []
+
+def test_async_entries(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    log = async_client.post("/daily-logs/", json={"overall_mood": 6}, headers=headers).json()
+    
+    response = async_client.post(
+        f"/daily-logs/{log['id']}/food",
+        json={"food_name": "Soup", "meal_type": "dinner", "calories": 250},
+        headers=headers
+    )
+    assert response.status_code == 201
+    
+    response = async_client.get("/daily-logs/", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["food_entries"][0]["food_name"] == "Soup"
+
+def test_async_entries_missing_log(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    response = async_client.get("/daily-logs/999/food", headers=headers)
+    assert response.status_code == 404
+
+def test_async_login(async_client, test_user):
+    response = async_client.post(
+        "/token",
+        data={"username": test_user.username, "password": "password123"}
+    )
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+def test_async_unauthorized(async_client, test_user):
+    response = async_client.get(f"/users/{test_user.id}")
+    assert response.status_code == 401
+
+def test_async_open_daily_log(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    first = async_client.post("/daily-logs/open", json={"log_date": "2025-03-01"}, headers=headers)
+    second = async_client.post("/daily-logs/open", json={"log_date": "2025-03-01", "overall_mood": 4}, headers=headers)
+    assert first.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["overall_mood"] == 4
+
+def test_async_entry_batch(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    log = async_client.post("/daily-logs/", json={"overall_mood": 6}, headers=headers).json()
+    response = async_client.post(
+        f"/daily-logs/{log['id']}/entries:batch",
+        json={"entries": [
+            {"type": "mood", "mood_rating": 5},
+            {"type": "food", "food_name": "Rice", "meal_type": "dinner", "calories": 400},
+        ]},
+        headers=headers
+    )
+    assert response.status_code == 201
+    assert [item["type"] for item in response.json()] == ["mood", "food"]
+
+def test_async_conditional_get(async_client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    log = async_client.post("/daily-logs/", json={"overall_mood": 6}, headers=headers).json()
+    
+    for url in (f"/daily-logs/{log['id']}", f"/daily-logs/{log['id']}/food"):
+        etag = async_client.get(url, headers=headers).headers["ETag"]
+        assert async_client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
@@ -1,5 +1,10 @@
 import pytest
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy import event
+
+from app import models
+from app.utils.response_cache import response_cache
 from .utils import get_test_token, get_auth_headers
 
 def test_create_daily_log(client, test_user):
@@ -96,4 +101,220 @@ def test_delete_daily_log(client, test_user, test_db):
         f"/daily-logs/{log_id}",
         headers=headers
     )
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+
+def _seed_logs(db, user_id, count):
+    for i in range(count):
+        log = models.DailyLog(user_id=user_id, date=datetime(2025, 1, 1) + timedelta(days=i), overall_mood=5)
+        log.food_entries.append(models.FoodEntry(food_name="Toast", meal_type=models.MealType.breakfast))
+        log.exercise_entries.append(models.ExerciseEntry(
+            exercise_type="Walk", duration_minutes=20, intensity=models.IntensityLevel.low
+        ))
+        log.mood_entries.append(models.MoodEntry(mood_rating=6))
+        db.add(log)
+    db.commit()
+
+def _count_queries(db, func):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(db.bind, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+def test_daily_logs_query_count_is_constant(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    _seed_logs(test_db, test_user.id, 2)
+    small_page = _count_queries(test_db, lambda: client.get("/daily-logs/", headers=headers))
+    
+    _seed_logs(test_db, test_user.id, 20)
+    test_db.expire_all()
+    # Seeded behind the API's back, so nothing invalidated the cached first page
+    response_cache.invalidate(test_user.username)
+    # The first request also loaded the principal that later ones reuse
+    small_page -= 1
+    responses = []
+    large_page = _count_queries(test_db, lambda: responses.append(client.get("/daily-logs/", headers=headers)))
+    
+    assert len(responses[0].json()) == 22
+    assert responses[0].json()[0]["food_entries"][0]["food_name"] == "Toast"
+    assert large_page == small_page
+    # logs + one SELECT ... IN per child collection
+    assert large_page <= 6
+
+def test_daily_logs_cursor_pagination(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    _seed_logs(test_db, test_user.id, 5)
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/daily-logs/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(log["date"] for log in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+def test_daily_logs_follow_calendar_day(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    # Logged late on the 2nd in UTC, but the 3rd in the user's timezone
+    for log_date, logged_at in ((date(2025, 3, 1), datetime(2025, 3, 1, 12)), (date(2025, 3, 3), datetime(2025, 3, 2, 23))):
+        test_db.add(models.DailyLog(user_id=test_user.id, date=logged_at, log_date=log_date, overall_mood=5))
+    # Undated logs fall back to the day of their timestamp
+    test_db.add(models.DailyLog(user_id=test_user.id, date=datetime(2025, 3, 2, 8), overall_mood=5))
+    test_db.commit()
+    
+    first = client.get("/daily-logs/", params={"limit": 2}, headers=headers)
+    second = client.get("/daily-logs/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}, headers=headers)
+    days = [log["log_date"] or log["date"][:10] for log in first.json() + second.json()]
+    assert days == ["2025-03-03", "2025-03-02", "2025-03-01"]
+    
+    response = client.get("/daily-logs/", params={"start_date": "2025-03-03"}, headers=headers)
+    assert [log["log_date"] for log in response.json()] == ["2025-03-03"]
+
+def test_daily_logs_invalid_cursor(client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    response = client.get("/daily-logs/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+def test_create_daily_log_duplicate_date(client, test_user):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    first = client.post("/daily-logs/", json={"overall_mood": 6, "log_date": "2025-03-01"}, headers=headers)
+    assert first.status_code == 201
+    assert first.json()["log_date"] == "2025-03-01"
+    
+    second = client.post("/daily-logs/", json={"overall_mood": 7, "log_date": "2025-03-01"}, headers=headers)
+    assert second.status_code == 400
+
+def test_open_daily_log_is_get_or_create(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    first = client.post("/daily-logs/open", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["overall_mood"] is None
+    
+    second = client.post("/daily-logs/open", json={"overall_mood": 8}, headers=headers)
+    assert second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["overall_mood"] == 8
+    
+    # Omitted fields keep their stored values
+    third = client.post("/daily-logs/open", json={"notes": "Evening"}, headers=headers)
+    assert third.json()["overall_mood"] == 8
+    assert third.json()["notes"] == "Evening"
+    
+    assert test_db.query(models.DailyLog).filter(models.DailyLog.user_id == test_user.id).count() == 1
+    
+    # The opened log shows up in listings despite having been created without a mood
+    response = client.get("/daily-logs/", headers=headers)
+    assert response.json()[0]["log_date"] == first.json()["log_date"]
+
+def test_open_daily_log_uses_profile_timezone(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    test_db.add(models.Profile(user_id=test_user.id, timezone="Pacific/Kiritimati"))
+    test_db.commit()
+    
+    response = client.post("/daily-logs/open", headers=headers)
+    expected = datetime.now(ZoneInfo("Pacific/Kiritimati")).date().isoformat()
+    assert response.json()["log_date"] == expected
+
+def test_daily_logs_response_cache(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    log_id = client.post("/daily-logs/", json={"overall_mood": 6}, headers=headers).json()["id"]
+    
+    first = client.get("/daily-logs/", headers=headers)
+    assert first.headers["X-Cache"] == "MISS"
+    cached = _count_queries(test_db, lambda: client.get("/daily-logs/", headers=headers))
+    second = client.get("/daily-logs/", headers=headers)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert cached == 0
+    # Query parameters are part of the key
+    assert client.get("/daily-logs/?limit=1", headers=headers).headers["X-Cache"] == "MISS"
+    
+    # A write through the API invalidates the user's cached reads
+    client.post(f"/daily-logs/{log_id}/food", json={"food_name": "Soup", "meal_type": "lunch"}, headers=headers)
+    refreshed = client.get("/daily-logs/", headers=headers)
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert refreshed.json()[0]["food_entries"][0]["food_name"] == "Soup"
+    
+    # Deactivating the account drops its cached pages
+    assert client.get("/daily-logs/", headers=headers).headers["X-Cache"] == "HIT"
+    test_user.is_active = False
+    test_db.commit()
+    assert client.get("/daily-logs/", headers=headers).headers["X-Cache"] == "MISS"
+    
+    # Another user never sees this user's cached page
+    test_db.add(models.User(email="other@example.com", username="other", hashed_password="x", is_active=True))
+    test_db.commit()
+    other = client.get("/daily-logs/", headers=get_auth_headers(get_test_token("other")))
+    assert other.headers["X-Cache"] == "MISS"
+    assert other.json() == []
+
+def test_daily_log_conditional_get(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    log_id = client.post("/daily-logs/", json={"overall_mood": 6}, headers=headers).json()["id"]
+    
+    first = client.get(f"/daily-logs/{log_id}", headers=headers)
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert client.get(f"/daily-logs/{log_id}", headers={**headers, "If-None-Match": etag}).status_code == 304
+    # Cache hits honour If-Modified-Since too
+    cached = client.get(f"/daily-logs/{log_id}", headers={**headers, "If-Modified-Since": last_modified})
+    assert (cached.status_code, cached.headers["X-Cache"]) == (304, "HIT")
+    assert cached.headers["Last-Modified"] == last_modified
+    
+    # Without the response cache: just the version query, nothing loaded
+    response_cache.invalidate(test_user.username)
+    responses = []
+    queries = _count_queries(test_db, lambda: responses.append(
+        client.get(f"/daily-logs/{log_id}", headers={**headers, "If-None-Match": etag})
+    ))
+    assert responses[0].status_code == 304
+    assert responses[0].content == b""
+    assert responses[0].headers["ETag"] == etag
+    assert queries == 1
+    response_cache.invalidate(test_user.username)
+    assert client.get(
+        f"/daily-logs/{log_id}", headers={**headers, "If-Modified-Since": last_modified}
+    ).status_code == 304
+    
+    # Adding an entry changes the version
+    client.post(f"/daily-logs/{log_id}/food", json={"food_name": "Soup", "meal_type": "lunch"}, headers=headers)
+    changed = client.get(f"/daily-logs/{log_id}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["food_entries"][0]["food_name"] == "Soup"
+    
+    # An update in the same second as the last read still changes the version
+    etag = changed.headers["ETag"]
+    client.put(f"/daily-logs/{log_id}", json={"overall_mood": 2}, headers=headers)
+    updated = client.get(f"/daily-logs/{log_id}", headers={**headers, "If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()["overall_mood"] == 2
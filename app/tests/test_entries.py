@@ -1,5 +1,6 @@
 # app/tests/test_entries.py
 import pytest
+from sqlalchemy import event
 from .utils import get_test_token, get_auth_headers
 
 @pytest.fixture
@@ -88,4 +89,169 @@ def test_get_food_entries(client, test_user, test_daily_log):
     assert isinstance(data, list)
     assert len(data) >= 1
     assert data[0]["food_name"] == "Salad"
-    assert data[0]["meal_type"] == "lunch"
\ No newline at end of file
+    assert data[0]["meal_type"] == "lunch"
+
+def test_get_food_entries_time_range(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    for timestamp in ("2025-01-01T08:00:00", "2025-01-02T08:00:00"):
+        client.post(
+            f"/daily-logs/{test_daily_log['id']}/food",
+            json={"food_name": "Toast", "meal_type": "breakfast", "timestamp": timestamp},
+            headers=headers
+        )
+    
+    response = client.get(
+        f"/daily-logs/{test_daily_log['id']}/food",
+        params={"since": "2025-01-02T00:00:00", "until": "2025-01-03T00:00:00"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert [entry["timestamp"][:10] for entry in response.json()] == ["2025-01-02"]
+
+def test_get_work_event_mood_entries(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    base = f"/daily-logs/{test_daily_log['id']}"
+    
+    client.post(f"{base}/work", json={
+        "description": "Review",
+        "start_time": "2025-01-02T09:00:00",
+        "end_time": "2025-01-02T10:00:00",
+        "productivity_rating": 8,
+        "stress_level": 3
+    }, headers=headers)
+    client.post(f"{base}/events", json={"description": "Call", "event_type": "family", "impact_rating": 2}, headers=headers)
+    client.post(f"{base}/mood", json={"mood_rating": 7}, headers=headers)
+    
+    assert client.get(f"{base}/work", headers=headers).json()[0]["description"] == "Review"
+    assert client.get(f"{base}/events", headers=headers).json()[0]["event_type"] == "family"
+    assert client.get(f"{base}/mood", headers=headers).json()[0]["mood_rating"] == 7
+
+def test_create_entry_batch(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    batch = {"entries": [
+        {"type": "food", "food_name": "Toast", "meal_type": "breakfast", "calories": 200},
+        {"type": "mood", "mood_rating": 7},
+        {"type": "exercise", "exercise_type": "Yoga", "duration_minutes": 20, "intensity": "low"},
+        {"type": "food", "food_name": "Soup", "meal_type": "lunch", "calories": 300},
+        {"type": "work", "description": "Focus block", "start_time": "2024-01-01T09:00:00",
+         "end_time": "2024-01-01T11:00:00", "productivity_rating": 8, "stress_level": 4},
+        {"type": "event", "description": "Call with family", "event_type": "family", "impact_rating": 3},
+    ]}
+    response = client.post(f"/daily-logs/{test_daily_log['id']}/entries:batch", json=batch, headers=headers)
+    assert response.status_code == 201
+    created = response.json()
+    assert [item["type"] for item in created] == ["food", "mood", "exercise", "food", "work", "event"]
+    
+    foods = client.get(f"/daily-logs/{test_daily_log['id']}/food", headers=headers).json()
+    assert {food["id"]: food["food_name"] for food in foods} == {created[0]["id"]: "Toast", created[3]["id"]: "Soup"}
+    assert all(food["timestamp"] for food in foods)
+    
+    summary = client.get("/aggregates/daily", headers=headers).json()[0]
+    assert summary["calories_in"] == 500
+    assert summary["exercise_minutes"] == 20
+    assert summary["mood_max"] == 7
+
+def test_create_entry_batch_accepts_url_kind(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    batch = {"entries": [
+        {"type": "events", "description": "Dentist", "event_type": "health", "impact_rating": -1},
+        {"type": "event", "description": "Call with family", "event_type": "family", "impact_rating": 3},
+    ]}
+    response = client.post(f"/daily-logs/{test_daily_log['id']}/entries:batch", json=batch, headers=headers)
+    assert response.status_code == 201
+    created = response.json()
+    assert [item["type"] for item in created] == ["events", "event"]
+    
+    events = client.get(f"/daily-logs/{test_daily_log['id']}/events", headers=headers).json()
+    assert {event["id"] for event in events} == {item["id"] for item in created}
+
+def test_create_entry_batch_is_all_or_nothing(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    batch = {"entries": [
+        {"type": "food", "food_name": "Toast", "meal_type": "breakfast"},
+        {"type": "mood", "mood_rating": 42},
+    ]}
+    response = client.post(f"/daily-logs/{test_daily_log['id']}/entries:batch", json=batch, headers=headers)
+    assert response.status_code == 422
+    assert client.get(f"/daily-logs/{test_daily_log['id']}/food", headers=headers).json() == []
+    
+    response = client.post(
+        f"/daily-logs/{test_daily_log['id']}/entries:batch",
+        json={"entries": [{"type": "sleep", "hours": 8}]},
+        headers=headers
+    )
+    assert response.status_code == 422
+
+def _statements(test_db, func):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_db.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(test_db.bind, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+def test_todays_log_skips_ownership_query(client, test_user, test_db):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log = client.post("/daily-logs/open", headers=headers).json()
+    
+    responses = []
+    statements = _statements(test_db, lambda: responses.append(client.post(
+        f"/daily-logs/{log['id']}/mood", json={"mood_rating": 6}, headers=headers
+    )))
+    assert responses[0].status_code == 201
+    assert not any(statement.lstrip().startswith("SELECT daily_logs.") for statement in statements)
+
+def test_entry_ownership_checks(client, test_user, test_daily_log):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    
+    client.post("/users/", json={"email": "other@example.com", "username": "other", "password": "password123"})
+    other_headers = get_auth_headers(get_test_token("other"))
+    response = client.post(
+        f"/daily-logs/{test_daily_log['id']}/mood", json={"mood_rating": 6}, headers=other_headers
+    )
+    assert response.status_code == 403
+    response = client.get("/daily-logs/999/mood", headers=headers)
+    assert response.status_code == 404
+    
+    # Deleting the log drops it from the hot cache; later writes see it is gone
+    client.get(f"/daily-logs/{test_daily_log['id']}/mood", headers=headers)
+    client.delete(f"/daily-logs/{test_daily_log['id']}", headers=headers)
+    response = client.post(
+        f"/daily-logs/{test_daily_log['id']}/mood", json={"mood_rating": 6}, headers=headers
+    )
+    assert response.status_code == 404
+
+def test_entries_conditional_get(client, test_user, test_daily_log):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    url = f"/daily-logs/{test_daily_log['id']}/mood"
+    
+    client.post(url, json={"mood_rating": 6}, headers=headers)
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    unchanged = client.get(url, headers={**headers, "If-None-Match": f'"other", {etag}'})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    
+    # A delete leaves max updated_at alone but changes the count
+    entry_id = client.post(url, json={"mood_rating": 3}, headers=headers).json()["id"]
+    added = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert added.status_code == 200
+    client.delete(f"{url}/{entry_id}", headers=headers)
+    removed = client.get(url, headers={**headers, "If-None-Match": added.headers["ETag"]})
+    assert removed.status_code == 200
+    assert [entry["mood_rating"] for entry in removed.json()] == [6]
@@ -0,0 +1,91 @@
+# app/tests/test_exports.py
+import csv
+import io
+import json
+import pytest
+from .utils import get_test_token, get_auth_headers
+
+@pytest.fixture
+def history(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log = client.post(
+        "/daily-logs/", json={"overall_mood": 7, "notes": "Busy", "log_date": "2024-02-01"}, headers=headers
+    ).json()
+    client.post(
+        f"/daily-logs/{log['id']}/entries:batch",
+        json={"entries": [
+            {"type": "food", "food_name": "Eggs", "meal_type": "breakfast", "calories": 250,
+             "timestamp": "2024-02-01T08:00:00"},
+            {"type": "mood", "mood_rating": 6, "factors": {"sleep": "short"}, "timestamp": "2024-02-01T09:00:00"},
+            {"type": "work", "description": "Review", "start_time": "2024-02-01T10:00:00",
+             "end_time": "2024-02-01T11:00:00", "productivity_rating": 6, "stress_level": 7},
+        ]},
+        headers=headers
+    )
+    return headers
+
+def test_export_ndjson(client, history):
+    response = client.get("/export/", headers=history)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="gaia-export-testuser.ndjson"' in response.headers["content-disposition"]
+    
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["type"] for row in rows] == ["log", "food", "work", "mood"]
+    assert rows[0]["notes"] == "Busy"
+    assert rows[1]["meal_type"] == "breakfast"
+    assert rows[1]["log_date"] == "2024-02-01"
+    assert rows[3]["factors"] == {"sleep": "short"}
+
+def test_export_round_trips_through_import(client, history):
+    response = client.get("/export/", params={"format": "csv"}, headers=history)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["type"] for row in rows] == ["log", "food", "work", "mood"]
+    
+    client.post("/users/", json={"email": "copy@example.com", "username": "copy", "password": "password123"})
+    headers = get_auth_headers(get_test_token("copy"))
+    response = client.post(
+        "/import/", files={"file": ("export.csv", response.content)}, headers=headers
+    )
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary == {"done": True, "rows": 4, "inserted": 3, "failed": 0}
+    
+    logs = client.get("/daily-logs/", headers=headers).json()
+    assert logs[0]["log_date"] == "2024-02-01"
+    assert logs[0]["overall_mood"] == 7
+    assert logs[0]["mood_entries"][0]["factors"] == {"sleep": "short"}
+    assert logs[0]["work_entries"][0]["stress_level"] == 7
+
+def test_export_entries_parquet(client, history):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    
+    response = client.get("/export/entries/food", headers=history)
+    assert response.status_code == 200
+    table = pq.read_table(pyarrow.BufferReader(response.content))
+    assert table.column("food_name").to_pylist() == ["Eggs"]
+    assert table.column("log_date").to_pylist()[0].isoformat() == "2024-02-01"
+    assert pyarrow.types.is_dictionary(table.schema.field("meal_type").type)
+    assert table.column("meal_type").to_pylist() == ["breakfast"]
+
+def test_export_entries_arrow(client, history):
+    pyarrow = pytest.importorskip("pyarrow")
+    
+    response = client.get("/export/entries/mood", params={"format": "arrow"}, headers=history)
+    assert response.status_code == 200
+    table = pyarrow.ipc.open_file(pyarrow.BufferReader(response.content)).read_all()
+    assert table.column("mood_rating").to_pylist() == [6]
+    assert json.loads(table.column("factors")[0].as_py()) == {"sleep": "short"}
+
+def test_internal_columnar_export_requires_token(client, history, monkeypatch):
+    pyarrow = pytest.importorskip("pyarrow")
+    from ..routers import internal
+    
+    assert client.get("/internal/export/entries/work").status_code == 403
+    
+    monkeypatch.setattr(internal, "INTERNAL_API_TOKEN", "secret")
+    response = client.get("/internal/export/entries/work", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(response.content))
+    assert table.column("stress_level").to_pylist() == [7]
@@ -0,0 +1,68 @@
+# app/tests/test_imports.py
+import json
+from .utils import get_test_token, get_auth_headers
+
+CSV_HISTORY = """type,log_date,timestamp,food_name,meal_type,calories,exercise_type,duration_minutes,intensity,mood_rating,overall_mood,notes
+log,2023-03-01,,,,,,,,,6,Moved apartments
+food,,2023-03-01T08:00:00,Porridge,breakfast,310,,,,,,
+food,,2023-03-01T19:30:00,Curry,dinner,640,,,,,,
+exercise,2023-03-02,2023-03-02T07:00:00,,,,Cycling,45,high,,,
+mood,,2023-03-02T21:00:00,,,,,,,4,,
+food,,2023-03-03T12:00:00,Sandwich,brunch,,,,,,,
+"""
+
+def _import(client, headers, filename, content, **params):
+    response = client.post(
+        "/import/",
+        files={"file": (filename, content.encode())},
+        params=params,
+        headers=headers
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_import_csv(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    
+    events = _import(client, headers, "history.csv", CSV_HISTORY, chunk_size=4)
+    chunks, summary = events[:-1], events[-1]
+    assert [chunk["chunk"] for chunk in chunks] == [1, 2]
+    assert summary == {"done": True, "rows": 6, "inserted": 4, "failed": 1}
+    # The unknown meal type is reported against its CSV line
+    assert chunks[1]["errors"][0]["line"] == 7
+    assert "meal_type" in chunks[1]["errors"][0]["error"]
+    
+    logs = client.get("/daily-logs/", headers=headers).json()
+    by_day = {log["log_date"]: log for log in logs}
+    assert set(by_day) == {"2023-03-01", "2023-03-02"}
+    assert by_day["2023-03-01"]["overall_mood"] == 6
+    assert by_day["2023-03-01"]["notes"] == "Moved apartments"
+    assert [food["food_name"] for food in by_day["2023-03-01"]["food_entries"]] == ["Porridge", "Curry"]
+    assert by_day["2023-03-02"]["exercise_entries"][0]["duration_minutes"] == 45
+    
+    summaries = {row["log_date"]: row for row in client.get("/aggregates/daily", headers=headers).json()}
+    assert summaries["2023-03-01"]["calories_in"] == 950
+    assert summaries["2023-03-02"]["mood_min"] == 4
+
+def test_import_ndjson_merges_into_existing_logs(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log = client.post(
+        "/daily-logs/", json={"overall_mood": 8, "log_date": "2023-05-10"}, headers=headers
+    ).json()
+    
+    lines = [
+        {"type": "mood", "mood_rating": 7, "timestamp": "2023-05-10T09:00:00", "factors": {"sleep": "good"}},
+        {"type": "work", "description": "Planning", "start_time": "2023-05-10T10:00:00",
+         "end_time": "2023-05-10T12:00:00", "productivity_rating": 7, "stress_level": 5},
+        {"type": ["mood"], "mood_rating": 5, "timestamp": "2023-05-10T20:00:00"},
+    ]
+    content = "\n".join(json.dumps(line) for line in lines) + "\n{not json\n"
+    events = _import(client, headers, "history.ndjson", content)
+    assert [error["line"] for error in events[0]["errors"]] == [3, 4]
+    assert events[0]["errors"][0]["error"] == "Unknown type ['mood']"
+    assert events[-1] == {"done": True, "rows": 4, "inserted": 2, "failed": 2}
+    
+    stored = client.get(f"/daily-logs/{log['id']}", headers=headers).json()
+    assert stored["mood_entries"][0]["factors"] == {"sleep": "good"}
+    assert stored["work_entries"][0]["description"] == "Planning"
+    assert len(client.get("/daily-logs/", headers=headers).json()) == 1
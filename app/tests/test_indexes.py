@@ -0,0 +1,61 @@
+# app/tests/test_indexes.py
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+from app import models
+from app.crud.daily_logs import list_logs_statement
+from app.utils.pagination import encode_cursor, keyset_clause
+
+def _query_plan(db, query) -> str:
+    statement = getattr(query, "statement", query)
+    sql = str(statement.compile(db.bind, compile_kwargs={"literal_binds": True}))
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+def test_daily_logs_listing_uses_calendar_day_index(test_db):
+    # The statement GET /daily-logs?start_date=... sends for its first page
+    stmt = list_logs_statement(1, start_date=date(2025, 1, 1)).limit(101)
+    
+    plan = _query_plan(test_db, stmt)
+    assert "ix_daily_logs_user_id_calendar_day" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_daily_logs_cursor_page_uses_calendar_day_index(test_db):
+    # The statement GET /daily-logs sends for a later page
+    stmt = list_logs_statement(1, cursor=encode_cursor(date(2025, 1, 2), 5)).limit(101)
+    
+    plan = _query_plan(test_db, stmt)
+    assert "ix_daily_logs_user_id_calendar_day" in plan
+    assert "TEMP B-TREE" not in plan
+
+@pytest.mark.parametrize("model, index_name", [
+    (models.FoodEntry, "ix_food_entries_daily_log_id_timestamp"),
+    (models.ExerciseEntry, "ix_exercise_entries_daily_log_id_timestamp"),
+    (models.WorkEntry, "ix_work_entries_daily_log_id_start_time"),
+    (models.EventEntry, "ix_event_entries_daily_log_id_timestamp"),
+    (models.MoodEntry, "ix_mood_entries_daily_log_id_timestamp"),
+    (models.AIInsight, "ix_ai_insights_daily_log_id_created_at"),
+])
+def test_entry_lookups_use_daily_log_index(test_db, model, index_name):
+    query = test_db.query(model).filter(model.daily_log_id == 1)
+    assert index_name in _query_plan(test_db, query)
+
+def test_users_listing_uses_created_index(test_db):
+    query = test_db.query(models.User).filter(
+        keyset_clause(models.User.created_at, models.User.id, encode_cursor(datetime(2025, 1, 1), 5), descending=False)
+    ).order_by(models.User.created_at, models.User.id).limit(101)
+    
+    plan = _query_plan(test_db, query)
+    assert "ix_users_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_recommendations_listing_uses_user_created_index(test_db):
+    query = test_db.query(models.ActivityRecommendation).filter(
+        models.ActivityRecommendation.user_id == 1
+    ).order_by(models.ActivityRecommendation.created_at.desc())
+    
+    plan = _query_plan(test_db, query)
+    assert "ix_activity_recommendations_user_id_created_at" in plan
+    assert "TEMP B-TREE" not in plan
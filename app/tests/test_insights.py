@@ -0,0 +1,410 @@
+# app/tests/test_insights.py
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import anthropic
+import httpx2 as httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.services import ai_service
+from app.services.ai_service import AIService, close_ai_service, create_client, get_ai_service
+from app.main import app
+from app.routers.insights import _analysis_events
+from app.services.correlations import pearson, prompt_correlations
+from app.services.jobs import JobWorker, claim_next_job, enqueue_job, process_job
+from app.services.prompt_compaction import compact_analysis_data, estimate_tokens, rolling_summary
+from .utils import get_test_token, get_auth_headers
+
+class FakeClaude:
+    """
+    A Messages API stand-in behind an httpx MockTransport, plugged in through
+    create_client(http_client=...). Records each request body and replies with canned
+    text, as one message or as an SSE stream; a reply of None fails the call.
+    """
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+        self.closed = False
+
+    def client(self):
+        http_client = anthropic.DefaultAsyncHttpxClient(transport=httpx.MockTransport(self.handle))
+        return create_client(http_client=http_client)
+
+    def handle(self, request):
+        body = json.loads(request.content)
+        self.calls.append(body)
+        if self.reply is None:
+            return httpx.Response(400, json={"type": "error", "error": {"type": "invalid_request_error", "message": "upstream unavailable"}})
+        if body.get("stream"):
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=_EventStream(self, body["model"]))
+        return httpx.Response(200, json={**_message(body["model"]), "content": [{"type": "text", "text": self.reply}]})
+
+def _message(model):
+    return {
+        "id": "msg_test", "type": "message", "role": "assistant", "model": model, "content": [],
+        "stop_reason": "end_turn", "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+
+class _EventStream(httpx.AsyncByteStream):
+    """The reply as Messages API server-sent events, eight characters per delta."""
+
+    def __init__(self, claude, model):
+        self.claude = claude
+        self.model = model
+
+    async def __aiter__(self):
+        reply = self.claude.reply
+        events = [("message_start", {"message": _message(self.model)}),
+                  ("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})]
+        events += [
+            ("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": reply[start:start + 8]}})
+            for start in range(0, len(reply), 8)
+        ]
+        events += [("content_block_stop", {"index": 0}),
+                   ("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": 1}}),
+                   ("message_stop", {})]
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps({'type': event, **data})}\n\n".encode()
+
+    async def aclose(self):
+        self.claude.closed = True
+
+@pytest.fixture(autouse=True)
+def anthropic_api_key(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+@pytest.fixture
+def run_jobs(test_db):
+    """Drain the job queue against the test database with a stubbed Claude reply."""
+    def drain(reply):
+        claude = FakeClaude(None if reply is None else json.dumps(reply))
+        worker = JobWorker(
+            session_factory=sessionmaker(bind=test_db.get_bind()),
+            ai_service=AIService(client=claude.client()),
+        )
+        while asyncio.run(worker.run_once()):
+            pass
+        return claude
+    return drain
+
+def test_analyze_user_data(client, test_user, test_db, run_jobs):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    assert client.get(f"/insights/analyze/{test_user.id}", headers=headers).status_code == 400
+    for day in range(7):
+        test_db.add(models.DailyLog(user_id=test_user.id, date=datetime(2025, 1, 1) + timedelta(days=day), overall_mood=6))
+    test_db.commit()
+
+    response = client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+    claude = run_jobs({"content": "Walks help.", "factors": {"exercise": 0.6}, "confidence": 0.7})
+    assert claude.calls[0]["max_tokens"] == 1024
+    job = client.get(f"/jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert job["insight"]["content"] == "Walks help."
+    assert job["insight"]["related_factors"] == {"exercise": 0.6}
+    prompts = client.get("/internal/prompts").json()
+    assert prompts["calls"] == 1
+    assert prompts["recent"][0]["days_in_full"] == 7
+    assert prompts["recent"][0]["estimated_tokens"] == estimate_tokens(claude.calls[0]["messages"][0]["content"])
+
+def _seed_week(test_db, user):
+    for day in range(7):
+        test_db.add(models.DailyLog(user_id=user.id, date=datetime(2025, 1, 1) + timedelta(days=day), overall_mood=6))
+    test_db.commit()
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def test_stream_analysis(client, test_user, test_db):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    claude = FakeClaude(json.dumps({"content": "Walks help.", "factors": {"exercise": 0.6}, "confidence": 0.7}))
+    app.dependency_overrides[get_ai_service] = lambda: AIService(client=claude.client())
+    try:
+        assert client.get(f"/insights/analyze/{test_user.id}/stream", headers=headers).status_code == 400
+        _seed_week(test_db, test_user)
+        with client.stream("GET", f"/insights/analyze/{test_user.id}/stream", headers=headers) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = _sse_events(response.read().decode())
+    finally:
+        del app.dependency_overrides[get_ai_service]
+
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    assert json.loads("".join(tokens))["content"] == "Walks help."
+    event, insight = events[-1]
+    assert event == "insight"
+    assert insight["content"] == "Walks help."
+    assert test_db.get(models.AIInsight, insight["id"]).related_factors == {"exercise": 0.6}
+
+def test_unchanged_data_reuses_insight(client, test_user, test_db, run_jobs):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    _seed_week(test_db, test_user)
+    reply = {"content": "Walks help.", "factors": {}, "confidence": 0.7}
+
+    first = client.get(f"/insights/analyze/{test_user.id}", headers=headers).json()
+    run_jobs(reply)
+    second = client.get(f"/insights/analyze/{test_user.id}", headers=headers).json()
+    assert run_jobs(reply).calls == []
+    first, second = (client.get(f"/jobs/{job['id']}", headers=headers).json() for job in (first, second))
+    assert second["status"] == "succeeded"
+    assert second["insight"]["id"] == first["insight"]["id"]
+    assert test_db.query(models.AIInsight).count() == 1
+
+    # New data changes the key
+    log = test_db.query(models.DailyLog).first()
+    test_db.add(models.MoodEntry(daily_log_id=log.id, mood_rating=3, timestamp=datetime(2025, 1, 1, 9)))
+    test_db.commit()
+    client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    assert len(run_jobs(reply).calls) == 1
+    assert test_db.query(models.AIInsight).count() == 2
+
+    metrics = client.get("/internal/insight-cache").json()
+    assert (metrics["hits"], metrics["misses"], metrics["hit_ratio"]) == (1, 2, 0.3333)
+
+def test_incremental_analysis(client, test_user, test_db, run_jobs, monkeypatch):
+    monkeypatch.setattr(ai_service, "ANALYSIS_INCREMENTAL", True)
+    headers = get_auth_headers(get_test_token(test_user.username))
+    for day in range(10):
+        test_db.add(models.DailyLog(user_id=test_user.id, date=datetime(2025, 1, 1) + timedelta(days=day), overall_mood=day % 3 + 4))
+    test_db.commit()
+    reply = {"content": "Mood is steady.", "factors": {}, "confidence": 0.6}
+    client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    first = json.loads(run_jobs(reply).calls[0]["messages"][0]["content"].split("DATA:")[1].split("Please identify")[0])
+    assert first["previous_insight"] is None
+    assert first["history"]["days"] == 10
+
+    summary = test_db.query(models.AIInsight).one().rolling_summary
+    assert (summary["open_from"], summary["runs"], summary["history"]["days"]) == ("2025-01-09", 1, 8)
+
+    test_db.add(models.DailyLog(user_id=test_user.id, date=datetime(2025, 1, 11), overall_mood=9))
+    test_db.commit()
+    client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    second = json.loads(run_jobs(reply).calls[0]["messages"][0]["content"].split("DATA:")[1].split("Please identify")[0])
+    # Only the open days and the new one are sent in full; the summary covers the rest
+    assert [day["date"][:10] for day in second["recent_days"]] == ["2025-01-09", "2025-01-10", "2025-01-11"]
+    assert second["previous_insight"] == "Mood is steady."
+    assert second["history"]["days"] == 11
+    assert second["history"]["overall_mood"]["max"] == 9
+    summary = test_db.query(models.AIInsight).order_by(models.AIInsight.id.desc()).first().rolling_summary
+    assert (summary["open_from"], summary["runs"], summary["history"]["days"]) == ("2025-01-10", 2, 9)
+
+    # Unchanged: served from the cache, without recomputing the correlations
+    monkeypatch.setattr(ai_service, "prompt_correlations", lambda db, user_id: pytest.fail("correlations computed"))
+    client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    assert run_jobs(reply).calls == []
+    monkeypatch.undo()
+    monkeypatch.setattr(ai_service, "ANALYSIS_INCREMENTAL", True)
+    # An edit to a settled day changes the key and rebuilds the summary from scratch
+    oldest = test_db.query(models.DailyLog).order_by(models.DailyLog.date).first()
+    test_db.add(models.MoodEntry(daily_log_id=oldest.id, mood_rating=1, timestamp=datetime(2025, 1, 1, 9)))
+    test_db.commit()
+    client.get(f"/insights/analyze/{test_user.id}", headers=headers)
+    third = json.loads(run_jobs(reply).calls[0]["messages"][0]["content"].split("DATA:")[1].split("Please identify")[0])
+    assert third["previous_insight"] is None
+    summary = test_db.query(models.AIInsight).order_by(models.AIInsight.id.desc()).first().rolling_summary
+    assert (summary["runs"], summary["history"]["days"]) == (1, 9)
+
+def test_stream_analysis_stops_on_disconnect(test_user, test_db):
+    _seed_week(test_db, test_user)
+    claude = FakeClaude(json.dumps({"content": "x" * 200}))
+    checks = iter([False, True])
+    request = SimpleNamespace(is_disconnected=lambda: asyncio.sleep(0, next(checks, True)))
+    events = AIService(client=claude.client()).stream_mood_analysis(test_user.id, test_db)
+
+    async def consume():
+        return [chunk async for chunk in _analysis_events(request, events, test_user.username)]
+
+    # One token goes out, then the client is gone: the upstream stream is closed, nothing saved
+    assert len(asyncio.run(consume())) == 1
+    assert claude.closed
+    assert test_db.query(models.AIInsight).count() == 0
+
+def test_prompt_compaction_respects_budget():
+    def day(n):
+        return {
+            "date": (datetime(2024, 1, 1) + timedelta(days=n)).isoformat(),
+            "overall_mood": n % 10 + 1,
+            "food_entries": [{"food_name": "oats", "meal_type": "breakfast", "timestamp": None}] * 3,
+            "exercise_entries": [{"exercise_type": "run", "duration_minutes": 30, "intensity": "high", "timestamp": None}],
+            "work_entries": [{"description": "desk work " * 20, "productivity_rating": 7, "stress_level": n % 5 + 1, "duration_minutes": 480.0}],
+            "event_entries": [],
+            "mood_entries": [{"mood_rating": 6, "description": "fine " * 30, "timestamp": None}],
+        }
+    # Stored out of order; compaction sorts by date
+    data = {"daily_logs": [day(n) for n in reversed(range(400))]}
+    data["summary"] = rolling_summary(None, data["daily_logs"], 400, "test")
+    render = lambda payload: json.dumps(payload)
+
+    prompt, report = compact_analysis_data(data, render, token_budget=4000, recent_days=7)
+    assert estimate_tokens(prompt) <= 4000
+    assert report["days_in_full"] == 7
+    assert report["days_omitted"] > 0
+    assert sum(report[key] for key in ("days_in_full", "days_summarized", "days_omitted")) == 400
+    payload = json.loads(prompt)
+    assert payload["history"]["days"] == 400
+    assert payload["history"]["top_foods"] == [["oats", 1200]]
+    assert payload["recent_days"][-1]["date"] == day(399)["date"]
+    assert payload["daily_summary"][-1] == {
+        "date": "2025-01-27", "mood": 3, "mood_entries": 6, "meals": 3, "exercise_minutes": 30,
+        "work_minutes": 480, "stress": 3, "productivity": 7,
+    }
+
+    # A tiny budget keeps only the aggregates
+    _, report = compact_analysis_data(data, render, token_budget=100, recent_days=7)
+    assert (report["days_in_full"], report["days_summarized"]) == (0, 0)
+    # A generous one keeps every day of the rolling summary
+    _, report = compact_analysis_data(data, render, token_budget=10 ** 6, recent_days=7)
+    assert (report["days_summarized"], report["days_omitted"]) == (83, 310)
+
+def test_prompt_compaction_truncates_long_text():
+    logs = [
+        {"date": (datetime(2024, 1, 1) + timedelta(days=n)).isoformat(), "overall_mood": 5, "notes": None,
+         "food_entries": [], "exercise_entries": [], "work_entries": [], "event_entries": [],
+         "mood_entries": [{"mood_rating": 5, "description": "x" * 60000, "timestamp": None}]}
+        for n in range(8)
+    ]
+    data = {"daily_logs": logs, "summary": rolling_summary(None, logs, 8, "test"), "previous_insight": "y" * 5000}
+    render = AIService(client=FakeClaude(None).client())._render_analysis_prompt
+
+    prompt, report = compact_analysis_data(data, render, token_budget=6000, recent_days=7)
+    assert estimate_tokens(prompt) <= 6000
+    assert report["days_in_full"] == 7
+    # Below the cost of one full day, recent days and extras give way to the aggregates
+    prompt, report = compact_analysis_data(data, render, token_budget=800, recent_days=7)
+    assert estimate_tokens(prompt) <= 800
+    assert report["days_in_full"] == 0
+    assert "y" * 100 not in prompt
+
+def test_correlations(client, test_user, test_db):
+    np = pytest.importorskip("numpy")
+    headers = get_auth_headers(get_test_token(test_user.username))
+    for day in range(30):
+        minutes = (day * 7) % 60
+        log = models.DailyLog(
+            user_id=test_user.id,
+            date=datetime(2025, 1, 1) + timedelta(days=day),
+            # Mood follows exercise; day 10 was never logged
+            overall_mood=1 + minutes // 7,
+        )
+        if day == 10:
+            continue
+        test_db.add(log)
+        test_db.flush()
+        test_db.add(models.ExerciseEntry(
+            daily_log_id=log.id, exercise_type="run", duration_minutes=minutes,
+            intensity=models.IntensityLevel.high, timestamp=log.date,
+        ))
+        test_db.add(models.FoodEntry(
+            daily_log_id=log.id, food_name="Black beans" if day % 2 else "Rice",
+            meal_type=models.MealType.lunch, calories=500,
+        ))
+    test_db.commit()
+
+    response = client.get("/insights/correlations", headers=headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["days"], report["logged_days"], report["max_lag"]) == (30, 29, 2)
+    strongest = report["correlations"][0]
+    assert (strongest["feature"], strongest["lag"], strongest["n"]) == ("exercise_minutes_high", 0, 29)
+    assert strongest["r"] > 0.95
+    assert strongest["ci_low"] < strongest["r"] < strongest["ci_high"]
+    # Constant features (calories) have no coefficient; lags cover mood carry-over
+    assert "calories_in" not in {item["feature"] for item in report["correlations"]}
+    assert {(item["feature"], item["lag"]) for item in report["lag_effects"]} >= {("mood", 1), ("bloating_foods", 2)}
+    # Significant ones seed the analysis prompt
+    assert prompt_correlations(test_db, test_user.id)[0] == {"feature": "exercise_minutes_high", "lag": 0, "r": strongest["r"], "n": 29}
+
+    # Matches numpy over complete rows
+    x = np.array([[1.0, 2.0], [2.0, np.nan], [3.0, 1.0], [5.0, 4.0], [4.0, 3.0]])
+    y = np.array([2.0, 3.0, 5.0, 9.0, np.nan])
+    r, n, low, high = pearson(x, y)
+    assert list(n) == [4, 3]
+    assert r[0] == pytest.approx(np.corrcoef([1, 2, 3, 5], [2, 3, 5, 9])[0, 1])
+    assert r[1] == pytest.approx(np.corrcoef([2, 1, 4], [2, 5, 9])[0, 1])
+
+def test_create_recommendation(client, test_user, test_db, run_jobs):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    job = client.post("/activities/recommendations", headers=headers).json()
+    run_jobs({
+        "activity_name": "Walk",
+        "description": "A short walk outside.",
+        "duration_minutes": 20,
+        "expected_benefit": "Calmer mood",
+    })
+
+    job = client.get(f"/jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert job["recommendation"]["activity_name"] == "Walk"
+    assert client.get(f"/insights/recommendations/{test_user.id}", headers=headers).json()[0]["activity_name"] == "Walk"
+    # Jobs are private to their owner
+    test_db.add(models.User(email="other@example.com", username="other", hashed_password="x"))
+    test_db.commit()
+    assert client.get(f"/jobs/{job['id']}", headers=get_auth_headers(get_test_token("other"))).status_code == 404
+
+def test_failed_job_and_single_claim(client, test_user, test_db, run_jobs):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    job = client.post(f"/insights/recommendations/{test_user.id}", headers=headers).json()
+    # Once one worker holds the job, another claim finds nothing
+    assert claim_next_job(test_db).id == job["id"]
+    assert claim_next_job(test_db) is None
+    test_db.query(models.Job).update({"status": models.JobStatus.queued})
+    test_db.commit()
+
+    run_jobs(None)
+    job = client.get(f"/jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "Failed to generate recommendation"
+    assert job["recommendation"] is None
+
+def test_job_fails_after_broken_session(test_user, test_db):
+    job = enqueue_job(test_db, test_user.id, models.JobKind.activity_recommendation)
+    session = sessionmaker(bind=test_db.get_bind())()
+
+    async def broken(user_id, db):
+        # A failed flush leaves the session needing a rollback
+        db.add(models.User(id=test_user.id, email="dup@example.com", username="dup", hashed_password="x"))
+        db.flush()
+
+    job = claim_next_job(session)
+    asyncio.run(process_job(session, job, SimpleNamespace(generate_activity_recommendation=broken)))
+    session.close()
+    test_db.expire_all()
+    job = test_db.get(models.Job, job.id)
+    assert job.status == models.JobStatus.failed
+    # The database error stays in the server log
+    assert job.error == "Failed to generate recommendation"
+
+def test_stale_jobs_requeued_while_running(test_user, test_db):
+    job = enqueue_job(test_db, test_user.id, models.JobKind.mood_analysis)
+    job.status = models.JobStatus.running
+    job.started_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    test_db.commit()
+    worker = JobWorker(session_factory=sessionmaker(bind=test_db.get_bind()), stale_after=60, requeue_interval=3600)
+    assert asyncio.run(worker.requeue_stale()) == 1
+    test_db.expire_all()
+    assert test_db.get(models.Job, job.id).status == models.JobStatus.queued
+    # Sweeps are spaced by requeue_interval
+    test_db.get(models.Job, job.id).status = models.JobStatus.running
+    test_db.commit()
+    assert asyncio.run(worker.requeue_stale()) == 0
+
+def test_ai_service_is_shared():
+    try:
+        assert get_ai_service() is get_ai_service()
+    finally:
+        asyncio.run(close_ai_service())
@@ -0,0 +1,58 @@
+# app/tests/test_partitions.py
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.utils.partitions import (
+    ENTRY_PARTITION_KEYS, add_months, convert_to_partitioned, ensure_entry_partitions, month_start, partition_name,
+)
+
+def test_month_arithmetic():
+    assert month_start(date(2025, 3, 17)) == date(2025, 3, 1)
+    assert add_months(date(2025, 11, 1), 1) == date(2025, 12, 1)
+    assert add_months(date(2025, 12, 1), 1) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), 14) == date(2026, 3, 1)
+
+def test_partition_name():
+    assert partition_name("food_entries", date(2025, 3, 1)) == "food_entries_y2025m03"
+
+class RecordingConnection:
+    """Records the SQL it is given; answers catalog queries from `results` by substring."""
+
+    def __init__(self, results):
+        self.results = results
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        sql = str(statement)
+        self.statements.append((sql, parameters))
+        value = next((value for needle, value in self.results.items() if needle in sql), None)
+        return SimpleNamespace(scalar=lambda: value, first=lambda: value)
+
+def test_convert_to_partitioned_statements():
+    connection = RecordingConnection({
+        "pg_get_serial_sequence": "mood_entries_id_seq",
+        "min(": datetime(2025, 3, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5))),
+        "pg_partitioned_table": (1,),
+    })
+    convert_to_partitioned(connection, "mood_entries", months_ahead=0)
+    sql = [statement for statement, _ in connection.statements]
+    
+    assert 'CREATE TABLE mood_entries (LIKE mood_entries_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")' in sql
+    assert "CREATE TABLE mood_entries_default PARTITION OF mood_entries DEFAULT" in sql
+    # 23:30 on March 31st at UTC-5 is April in UTC, so partitions start there
+    attaches = [statement for statement in sql if "ATTACH PARTITION" in statement]
+    assert attaches[0] == (
+        "ALTER TABLE mood_entries ATTACH PARTITION mood_entries_y2025m04 FOR VALUES "
+        "FROM (timestamptz '2025-04-01T00:00:00+00:00') TO (timestamptz '2025-05-01T00:00:00+00:00')"
+    )
+    moves = [parameters for statement, parameters in connection.statements if "DELETE FROM mood_entries_default" in statement]
+    assert moves[0] == {"start": datetime(2025, 4, 1, tzinfo=timezone.utc), "end": datetime(2025, 5, 1, tzinfo=timezone.utc)}
+    assert 'ALTER TABLE mood_entries ADD PRIMARY KEY (id, "timestamp")' in sql
+    assert sql[-1] == "ALTER SEQUENCE mood_entries_id_seq OWNED BY mood_entries.id"
+
+def test_ensure_entry_partitions_takes_lock():
+    connection = RecordingConnection({"pg_partitioned_table": (1,)})
+    ensure_entry_partitions(connection, months_ahead=0)
+    assert connection.statements[0] == ("SELECT pg_advisory_xact_lock(hashtext(:key))", {"key": "entry_partitions"})
+    # to_regclass answered NULL: one new partition per table
+    assert sum("ATTACH PARTITION" in statement for statement, _ in connection.statements) == len(ENTRY_PARTITION_KEYS)
@@ -0,0 +1,84 @@
+# app/tests/test_pool_metrics.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+
+from app.utils.password_pool import PasswordHashPool
+from app.utils.pool_metrics import InstrumentedQueuePool, instrument_engine, pool_status
+
+def test_instrumented_pool_records_checkouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+    )
+    instrument_engine(engine)
+    
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+        status = pool_status(engine)
+        assert status["checked_out"] == 2
+    
+    status = pool_status(engine)
+    assert status["size"] == 2
+    assert status["checked_out"] == 0
+    assert status["metrics"]["checkouts"] == 2
+    assert status["metrics"]["connect_latency"]["count"] == 2
+    assert status["metrics"]["checkout_wait"]["count"] == 2
+    
+    # Metrics survive the pool being recreated
+    engine.dispose()
+    assert pool_status(engine)["metrics"]["checkouts"] == 2
+
+def test_pool_endpoint(client):
+    response = client.get("/internal/pool")
+    assert response.status_code == 200
+    assert "sync" in response.json()
+
+def test_internal_endpoints_fail_closed(client, monkeypatch):
+    from app.routers import internal
+    
+    # No token and no explicit opt-out: refused
+    monkeypatch.setattr(internal, "INTERNAL_API_OPEN", False)
+    assert client.get("/internal/pool").status_code == 403
+    
+    monkeypatch.setattr(internal, "INTERNAL_API_TOKEN", "secret")
+    assert client.get("/internal/pool", headers={"X-Internal-Token": "wrong"}).status_code == 403
+    assert client.get("/internal/pool", headers={"X-Internal-Token": "secret"}).status_code == 200
+
+def test_password_pool_sheds_load():
+    pool = PasswordHashPool(workers=1, queue_limit=1, timeout=5)
+    release = threading.Event()
+    
+    running = pool._submit(release.wait)
+    queued = pool._submit(lambda: "done")
+    with pytest.raises(HTTPException) as rejected:
+        pool.run(lambda: None)
+    assert rejected.value.status_code == 503
+    assert rejected.value.headers["Retry-After"] == "1"
+    assert pool.snapshot()["queued"] == 1
+    
+    release.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == "done"
+    assert asyncio.run(pool.run_async(lambda value: value * 2, 21)) == 42
+    
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 3
+    assert snapshot["rejected"] == 1
+    assert snapshot["in_flight"] == 0
+    assert snapshot["queue_wait"]["count"] == 3
+
+def test_login_uses_password_pool(client, test_user):
+    before = client.get("/internal/password-hashing").json()["completed"]
+    response = client.post("/token", data={"username": "testuser", "password": "password123"})
+    assert response.status_code == 200
+    assert client.get("/internal/password-hashing").json()["completed"] == before + 1
+    # The handler is sync, so its user query runs in the threadpool rather than on the loop
+    from app.routers.auth import login_for_access_token
+    assert not asyncio.iscoroutinefunction(login_for_access_token)
@@ -0,0 +1,70 @@
+# app/tests/test_timeline.py
+import json
+import pytest
+from .utils import get_test_token, get_auth_headers
+
+WINDOW = {"start": "2025-01-01T00:00:00", "end": "2025-01-08T00:00:00"}
+
+@pytest.fixture
+def timeline_entries(client, test_user):
+    headers = get_auth_headers(get_test_token(test_user.username))
+    log = client.post("/daily-logs/", json={"overall_mood": 7}, headers=headers).json()
+    base = f"/daily-logs/{log['id']}"
+    
+    client.post(f"{base}/mood", json={"mood_rating": 6, "timestamp": "2025-01-02T21:00:00"}, headers=headers)
+    client.post(f"{base}/food", json={"food_name": "Oatmeal", "meal_type": "breakfast", "timestamp": "2025-01-02T08:00:00"}, headers=headers)
+    client.post(f"{base}/work", json={
+        "description": "Planning",
+        "start_time": "2025-01-02T09:00:00",
+        "end_time": "2025-01-02T12:00:00",
+        "productivity_rating": 7,
+        "stress_level": 4
+    }, headers=headers)
+    client.post(f"{base}/exercise", json={
+        "exercise_type": "Run", "duration_minutes": 30, "intensity": "high", "timestamp": "2025-01-03T07:00:00"
+    }, headers=headers)
+    client.post(f"{base}/events", json={
+        "description": "Dinner with friends", "event_type": "social", "impact_rating": 3, "timestamp": "2025-01-03T19:00:00"
+    }, headers=headers)
+    # Outside the window
+    client.post(f"{base}/food", json={"food_name": "Cake", "meal_type": "snack", "timestamp": "2025-02-01T15:00:00"}, headers=headers)
+    return headers
+
+def _read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+def test_timeline_merges_entry_types_in_order(client, timeline_entries):
+    response = client.get("/timeline/", params=WINDOW, headers=timeline_entries)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    items = _read_ndjson(response)
+    assert [item["type"] for item in items] == ["food", "work", "mood", "exercise", "event"]
+    assert items[0]["data"] == {"food_name": "Oatmeal", "meal_type": "breakfast"}
+    assert items[1]["data"]["stress_level"] == 4
+    assert items[3]["data"]["intensity"] == "high"
+    assert "X-Next-Cursor" not in response.headers
+
+def test_timeline_cursor_pagination(client, timeline_entries):
+    seen = []
+    params = dict(WINDOW, limit=2)
+    while True:
+        response = client.get("/timeline/", params=params, headers=timeline_entries)
+        seen.extend(item["type"] for item in _read_ndjson(response))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    
+    assert seen == ["food", "work", "mood", "exercise", "event"]
+
+def test_timeline_excludes_other_users(client, test_db, timeline_entries):
+    client.post("/users/", json={"email": "other@example.com", "username": "other", "password": "password123"})
+    headers = get_auth_headers(get_test_token("other"))
+    
+    response = client.get("/timeline/", params=WINDOW, headers=headers)
+    assert _read_ndjson(response) == []
+
+def test_async_timeline(async_client, timeline_entries):
+    response = async_client.get("/timeline/", params=WINDOW, headers=timeline_entries)
+    assert [item["type"] for item in _read_ndjson(response)] == ["food", "work", "mood", "exercise", "event"]
@@ -1,4 +1,10 @@
 import pytest
+from datetime import datetime
+from jose import jwt
+from sqlalchemy import event
+
+from app import models
+from app.utils.auth import ALGORITHM, SECRET_KEY, Principal, principals
 from .utils import get_test_token, get_auth_headers
 
 def test_create_user(client):
@@ -42,4 +48,49 @@ def test_read_nonexistent_user(client, test_user):
     headers = get_auth_headers(token)
     
     response = client.get("/users/999", headers=headers)
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_read_users_cursor_pagination(client, test_user, test_db):
+    token = get_test_token(test_user.username)
+    headers = get_auth_headers(token)
+    
+    # Explicit timestamps: SQLite stores CURRENT_TIMESTAMP defaults in a different text format than bound datetimes
+    test_user.created_at = datetime(2025, 1, 1)
+    test_db.add(models.User(email="second@example.com", username="second", created_at=datetime(2025, 1, 2)))
+    test_db.commit()
+    
+    first = client.get("/users/", params={"limit": 1}, headers=headers)
+    assert [user["username"] for user in first.json()] == ["testuser"]
+    
+    second = client.get("/users/", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]}, headers=headers)
+    assert [user["username"] for user in second.json()] == ["second"]
+    assert "X-Next-Cursor" not in second.headers
+    # Page size is capped
+    assert client.get("/users/", params={"limit": 1001}, headers=headers).status_code == 422
+
+def test_principal_cache(client, test_user, test_db):
+    token = client.post("/token", data={"username": "testuser", "password": "password123"}).json()["access_token"]
+    assert jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["uid"] == test_user.id
+    headers = get_auth_headers(token)
+    
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    client.get("/users/", headers=headers)
+    event.listen(test_db.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert client.get("/users/", headers=headers).status_code == 200
+        # Updating the user evicts the cached principal
+        test_user.is_active = False
+        test_db.commit()
+        statements.clear()
+        client.get("/users/", headers=headers)
+    finally:
+        event.remove(test_db.bind, "before_cursor_execute", before_cursor_execute)
+    assert principals.get("testuser", test_user.id) == Principal(id=test_user.id, username="testuser", is_active=False)
+    assert sum("FROM users" in statement for statement in statements) == 2
+    
+    # A token naming another account's id is rejected
+    forged = get_test_token("testuser", uid=test_user.id + 1)
+    assert client.get("/users/", headers=get_auth_headers(forged)).status_code == 401
@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta
 from ..utils.auth import create_access_token
 
-def get_test_token(username, minutes=30):
+def get_test_token(username, minutes=30, uid=None):
     """Generate a test token for authentication"""
     access_token_expires = timedelta(minutes=minutes)
+    data = {"sub": username}
+    if uid is not None:
+        data["uid"] = uid
     return create_access_token(
-        data={"sub": username}, expires_delta=access_token_expires
+        data=data, expires_delta=access_token_expires
     )
 
 def get_auth_headers(token):
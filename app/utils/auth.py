@@ -1,13 +1,21 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
+import threading
+import time
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, get_async_db
+from .password_pool import password_hashing
 
 # Password hash
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,6 +25,10 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+# Bounds how long another worker keeps accepting a user updated or deactivated elsewhere
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password, hashed_password):
@@ -25,6 +37,13 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt takes hundreds of milliseconds; request paths go through the bounded hashing pool
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hashing.run_async(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_hashing.run_async(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,21 +55,126 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_payload(token: str) -> Tuple[str, Optional[int]]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-        
-    user = db.query(models.User).filter(models.User.username == username).first()
+        raise _credentials_exception()
+    # Tokens issued before the uid claim was added carry only the username
+    return username, payload.get("uid")
+
+def _decode_username(token: str) -> str:
+    return _decode_payload(token)[0]
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as handlers see it; detached from any session."""
+    id: int
+    username: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, username=user.username, is_active=user.is_active)
+
+class PrincipalCache:
+    """
+    Per-worker map of username -> Principal so authenticated requests skip the user query.
+    User updates and deletes evict the entry (see the mapper events below); the TTL covers
+    changes made by other workers.
+    """
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str, user_id: Optional[int]) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[username]
+                return None
+            self._entries.move_to_end(username)
+        # A username reused by a newer account must not match an older token
+        if user_id is not None and principal.id != user_id:
+            return None
+        return principal
+
+    def remember(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.username] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget_user(self, user_id: int) -> None:
+        with self._lock:
+            for username in [name for name, (principal, _) in self._entries.items() if principal.id == user_id]:
+                del self._entries[username]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+principals = PrincipalCache()
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _evict_principal(mapper, connection, target):
+    principals.forget_user(target.id)
+    # Evict again once committed, in case a concurrent request re-cached the old row meanwhile
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_principals(session):
+    for user_id in session.info.pop("stale_principals", ()):
+        principals.forget_user(user_id)
+
+def _user_statement(username: str, user_id: Optional[int]):
+    if user_id is not None:
+        # Primary-key lookup; the username check rejects a token for a renamed account
+        return select(models.User).where(models.User.id == user_id, models.User.username == username)
+    return select(models.User).where(models.User.username == username)
+
+# Plain def: FastAPI runs it in the threadpool so the blocking query stays off the event loop
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    username, user_id = _decode_payload(token)
+    principal = principals.get(username, user_id)
+    if principal is not None:
+        return principal
+    user = db.execute(_user_statement(username, user_id)).scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    principal = Principal.from_user(user)
+    principals.remember(principal)
+    return principal
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    username, user_id = _decode_payload(token)
+    principal = principals.get(username, user_id)
+    if principal is not None:
+        return principal
+    result = await db.execute(_user_statement(username, user_id))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+    principal = Principal.from_user(user)
+    principals.remember(principal)
+    return principal
@@ -0,0 +1,58 @@
+# app/utils/conditional.py
+"""
+ETag / Last-Modified validators for polled read endpoints.
+
+Handlers compute a row version (app.crud.versions) before loading anything, then call
+not_modified(): a matching If-None-Match (or, without one, If-Modified-Since) is answered
+with a bare 304, otherwise the validators are set on the response and the handler carries on.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+def make_etag(version: tuple) -> str:
+    # Weak: equal versions serialise to equivalent, not byte-identical, JSON
+    return 'W/"%s"' % hashlib.sha1(repr(version).encode()).hexdigest()[:20]
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    candidates = {_opaque(tag) for tag in if_none_match.split(",")}
+    return "*" in candidates or _opaque(etag) in candidates
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return _utc(last_modified).replace(microsecond=0) <= since
+
+def not_modified(
+    request: Request, response: Response, version: tuple, last_modified: Optional[datetime]
+) -> Optional[Response]:
+    """Return a 304 when the client's copy is current; otherwise set ETag/Last-Modified on `response`."""
+    headers = {"ETag": make_etag(version)}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    if is_fresh(request, headers["ETag"], last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
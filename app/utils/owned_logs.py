@@ -0,0 +1,105 @@
+# app/utils/owned_logs.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import get_db, get_async_db
+from .auth import get_current_user, get_current_user_async, Principal
+
+OWNED_LOG_CACHE_SIZE = int(os.getenv("OWNED_LOG_CACHE_SIZE", "10000"))
+# Bounds how long another worker can keep accepting writes for a log deleted elsewhere
+OWNED_LOG_CACHE_TTL = float(os.getenv("OWNED_LOG_CACHE_TTL", "300"))
+
+class HotLogCache:
+    """
+    Per-worker map of user id -> the log they are currently writing to (normally today's,
+    set by /daily-logs/open). A hit proves ownership without a database round trip;
+    ownership never changes, so entries only go stale when the log is deleted.
+    """
+
+    def __init__(self, max_size: int = OWNED_LOG_CACHE_SIZE, ttl: float = OWNED_LOG_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_hot(self, user_id: int, log_id: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return False
+            cached_log_id, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                return False
+            self._entries.move_to_end(user_id)
+            return cached_log_id == log_id
+
+    def remember(self, user_id: int, log_id: int) -> None:
+        with self._lock:
+            self._entries[user_id] = (log_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget_log(self, log_id: int) -> None:
+        with self._lock:
+            for user_id in [user_id for user_id, (cached, _) in self._entries.items() if cached == log_id]:
+                del self._entries[user_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+hot_logs = HotLogCache()
+
+def _owned_log_statement(log_id: int, user_id: int):
+    # Primary-key lookup with the owner in the same predicate
+    return select(models.DailyLog.id).where(models.DailyLog.id == log_id, models.DailyLog.user_id == user_id)
+
+def _missing_log(exists: bool, action: str) -> HTTPException:
+    if exists:
+        return HTTPException(status_code=403, detail=f"Not authorized to {action} this log")
+    return HTTPException(status_code=404, detail="Log not found")
+
+def missing_log_error(db: Session, log_id: int, action: str = "access") -> HTTPException:
+    """403 or 404 for a log the owner-filtered query did not find; only runs on that failure path."""
+    exists = db.query(models.DailyLog.id).filter(models.DailyLog.id == log_id).first() is not None
+    return _missing_log(exists, action)
+
+async def missing_log_error_async(db: AsyncSession, log_id: int, action: str = "access") -> HTTPException:
+    result = await db.execute(select(models.DailyLog.id).where(models.DailyLog.id == log_id))
+    return _missing_log(result.first() is not None, action)
+
+def get_owned_log_id(
+    log_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+) -> int:
+    """Dependency resolving `log_id` to a log the current user owns, or raising 404/403."""
+    if hot_logs.is_hot(current_user.id, log_id):
+        return log_id
+    if db.execute(_owned_log_statement(log_id, current_user.id)).first() is None:
+        raise missing_log_error(db, log_id)
+    hot_logs.remember(current_user.id, log_id)
+    return log_id
+
+async def get_owned_log_id_async(
+    log_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async)
+) -> int:
+    if hot_logs.is_hot(current_user.id, log_id):
+        return log_id
+    result = await db.execute(_owned_log_statement(log_id, current_user.id))
+    if result.first() is None:
+        raise await missing_log_error_async(db, log_id)
+    hot_logs.remember(current_user.id, log_id)
+    return log_id
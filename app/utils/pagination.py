@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Tuple, Union
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Date, tuple_
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: Union[date, datetime], *keys: int) -> str:
+    """Opaque cursor for the (sort_value, *keys) key of the last row on a page."""
+    payload = json.dumps([sort_value.isoformat(), *keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, key_count: int = 1) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, *keys = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(keys) != key_count:
+            raise ValueError("Unexpected cursor shape")
+        return (datetime.fromisoformat(sort_value), *(int(key) for key in keys))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_clause(sort_column, id_column, cursor: str, descending: bool = True):
+    """
+    Filter selecting the rows after the cursor in (sort_column, id_column) order.
+    A row-value comparison lets the database seek straight into the composite index
+    instead of counting past skipped rows as OFFSET does.
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    if isinstance(sort_column.type, Date):
+        sort_value = sort_value.date()
+    key = tuple_(sort_column, id_column)
+    if descending:
+        return key < tuple_(sort_value, row_id)
+    return key > tuple_(sort_value, row_id)
+
+def paginate(rows: List[Any], limit: int, sort_attr: str, response: Response) -> List[Any]:
+    """
+    Trim a result fetched with limit + 1 rows to the page and publish the next cursor.
+    """
+    page = rows[:limit]
+    if len(rows) > limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), last.id)
+    return page
@@ -0,0 +1,166 @@
+"""
+Monthly range partitioning for the entry tables (Postgres only, opt-in).
+
+The conversion is run by the 4c8d2e5b9a17 migration when PARTITION_ENTRY_TABLES=true
+(or `alembic -x partition_entries=true upgrade head`). Future partitions are created on
+startup and can be topped up from cron with `python -m app.utils.partitions`. Months are
+UTC months; partition bounds are explicit UTC timestamps.
+"""
+import os
+import sys
+from datetime import date, datetime, time, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+# Entry tables and the column each one is range-partitioned on
+ENTRY_PARTITION_KEYS = {
+    "food_entries": "timestamp",
+    "exercise_entries": "timestamp",
+    "work_entries": "start_time",
+    "event_entries": "timestamp",
+    "mood_entries": "timestamp",
+}
+
+PARTITION_ENTRY_TABLES = os.getenv("PARTITION_ENTRY_TABLES", "false").lower() == "true"
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Serializes partition maintenance across web workers starting at the same time
+PARTITION_LOCK_KEY = "entry_partitions"
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """UTC start of `month` and of the month after it."""
+    return tuple(
+        datetime.combine(day, time.min, tzinfo=timezone.utc) for day in (month, add_months(month, 1))
+    )
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+def is_partitioned(connection, table: str) -> bool:
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+    ), {"table": table}).first() is not None
+
+def _partition_exists(connection, name: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+def create_month_partition(connection, table: str, month: date) -> Optional[str]:
+    """
+    Create the partition holding `month`, moving any matching rows out of the default
+    partition first so the attach does not fail. Returns the name when it was created.
+    """
+    name = partition_name(table, month)
+    if _partition_exists(connection, name):
+        return None
+
+    key = ENTRY_PARTITION_KEYS[table]
+    start, end = month_bounds(month)
+    connection.execute(text(
+        f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    connection.execute(text(
+        f'WITH moved AS (DELETE FROM {table}_default WHERE "{key}" >= :start AND "{key}" < :end RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved'
+    ), {"start": start, "end": end})
+    # Typed literals so the bounds do not depend on the session's TimeZone
+    connection.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM (timestamptz '{start.isoformat()}') TO (timestamptz '{end.isoformat()}')"
+    ))
+    return name
+
+def ensure_entry_partitions(connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Create partitions from the current month through `months_ahead` months out. Holds a
+    transaction-scoped advisory lock, so workers starting together do not race between
+    the existence check and CREATE TABLE.
+    """
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": PARTITION_LOCK_KEY})
+    created = []
+    current = month_start(_utc_today())
+    for table in ENTRY_PARTITION_KEYS:
+        if not is_partitioned(connection, table):
+            continue
+        for offset in range(months_ahead + 1):
+            name = create_month_partition(connection, table, add_months(current, offset))
+            if name:
+                created.append(name)
+    return created
+
+def _serial_sequence(connection, table: str) -> str:
+    return connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+
+def _create_table_indexes(connection, table: str) -> None:
+    """Recreate the primary key, foreign key and model-declared indexes on a rebuilt table."""
+    from app.models import Base
+
+    model_table = Base.metadata.tables[table]
+    key = ENTRY_PARTITION_KEYS[table]
+    partitioned = is_partitioned(connection, table)
+
+    # A partitioned table's primary key must include the partition key
+    primary_key = f'id, "{key}"' if partitioned else "id"
+    connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})"))
+    connection.execute(text(
+        f"ALTER TABLE {table} ADD FOREIGN KEY (daily_log_id) REFERENCES daily_logs (id)"
+    ))
+    for index in model_table.indexes:
+        connection.execute(CreateIndex(index))
+
+def convert_to_partitioned(connection, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD) -> None:
+    """Rebuild a heap entry table as a monthly range-partitioned table, keeping its rows and ids."""
+    key = ENTRY_PARTITION_KEYS[table]
+    sequence = _serial_sequence(connection, table)
+
+    # Partition keys cannot be NULL; fall back to the row's creation time
+    connection.execute(text(f'UPDATE {table} SET "{key}" = created_at WHERE "{key}" IS NULL'))
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned"))
+    connection.execute(text(
+        f'CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE ("{key}")'
+    ))
+    connection.execute(text(f'ALTER TABLE {table} ALTER COLUMN "{key}" SET NOT NULL'))
+    connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    first = connection.execute(text(f'SELECT min("{key}") FROM {table}_unpartitioned')).scalar()
+    month = month_start(first.astimezone(timezone.utc).date()) if first else month_start(_utc_today())
+    last = add_months(month_start(_utc_today()), months_ahead)
+    while month <= last:
+        create_month_partition(connection, table, month)
+        month = add_months(month, 1)
+
+    connection.execute(text(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned"))
+    connection.execute(text(f"DROP TABLE {table}_unpartitioned"))
+    _create_table_indexes(connection, table)
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+
+def convert_to_heap(connection, table: str) -> None:
+    """Undo convert_to_partitioned, folding every partition back into a single table."""
+    sequence = _serial_sequence(connection, table)
+
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {table}_partitioned"))
+    connection.execute(text(f"CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS)"))
+    connection.execute(text(f"INSERT INTO {table} SELECT * FROM {table}_partitioned"))
+    connection.execute(text(f"DROP TABLE {table}_partitioned CASCADE"))
+    _create_table_indexes(connection, table)
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    with engine.begin() as connection:
+        created = ensure_entry_partitions(connection)
+    print(f"Created {len(created)} partitions: {', '.join(created) or '-'}", file=sys.stderr)
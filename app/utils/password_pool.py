@@ -0,0 +1,122 @@
+# app/utils/password_pool.py
+"""
+Bounded worker pool for bcrypt.
+
+Hashing and verification run on a dedicated thread pool (bcrypt releases the GIL, so
+threads give real parallelism without pickling costs) instead of on the event loop or
+the shared request threadpool. At most PASSWORD_HASH_WORKERS run at once and at most
+PASSWORD_HASH_QUEUE_LIMIT more may wait; beyond that, or after waiting
+PASSWORD_HASH_TIMEOUT seconds, callers get a 503 with Retry-After so a login storm
+sheds load instead of stalling every other request on the worker.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from .pool_metrics import Histogram
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password checks, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+class PasswordHashPool:
+    """Size-limited executor with admission control and queue/run time histograms."""
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT,
+        timeout: float = PASSWORD_HASH_TIMEOUT,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.queue_wait = Histogram()
+        self.run_time = Histogram()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise _overloaded()
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            self.queue_wait.observe((started - submitted) * 1000)
+            try:
+                return fn(*args)
+            finally:
+                self.run_time.observe((time.perf_counter() - started) * 1000)
+                # Counted before the result is delivered, so callers see settled metrics
+                with self._lock:
+                    self.pending -= 1
+                    self.completed += 1
+
+        return executor.submit(task)
+
+    def _timed_out(self, future: Future) -> HTTPException:
+        # A job that has not started gives its slot back; a running bcrypt call finishes
+        cancelled = future.cancel()
+        with self._lock:
+            self.timeouts += 1
+            if cancelled:
+                self.pending -= 1
+        return _overloaded()
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run on the pool and wait; for threadpool (plain def) handlers."""
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise self._timed_out(future)
+
+    async def run_async(self, fn: Callable, *args) -> Any:
+        """Run on the pool without blocking the event loop."""
+        future = self._submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(future)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": min(self.pending, self.workers),
+                "queued": max(self.pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+        return {**counters, "queue_wait": self.queue_wait.snapshot(), "run_time": self.run_time.snapshot()}
+
+password_hashing = PasswordHashPool()
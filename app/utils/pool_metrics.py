@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Dict, Any, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+HISTOGRAM_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+class Histogram:
+    """Fixed-bucket latency histogram, safe to update from several threads."""
+
+    def __init__(self, buckets: List[float] = HISTOGRAM_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value_ms
+            self._max = max(self._max, value_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+            return {
+                "count": self._count,
+                "sum_ms": round(self._sum, 3),
+                "max_ms": round(self._max, 3),
+                "mean_ms": round(self._sum / self._count, 3) if self._count else 0.0,
+                "buckets": dict(zip(labels, self._counts)),
+            }
+
+class PoolMetrics:
+    """Counters collected by an instrumented pool."""
+
+    def __init__(self):
+        self.checkout_wait = Histogram()
+        self.connect_latency = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        self.checkout_wait.observe(elapsed_ms)
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "connect_latency": self.connect_latency.snapshot(),
+        }
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait for a free slot and any new connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_checkout((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the history
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_engine(engine) -> None:
+    """Record DBAPI connect latency for an engine built on an instrumented pool."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "do_connect")
+    def _stamp_connect_start(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "connect")
+    def _record_connect_latency(dbapi_connection, conn_rec):
+        start = conn_rec.info.pop("connect_start", None)
+        metrics = getattr(sync_engine.pool, "metrics", None)
+        if start is not None and metrics is not None:
+            metrics.connect_latency.observe((time.perf_counter() - start) * 1000)
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Live pool state plus collected metrics for the internal endpoint."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status["metrics"] = metrics.snapshot()
+
+    return status
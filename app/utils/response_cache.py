@@ -0,0 +1,295 @@
+# app/utils/response_cache.py
+"""
+Response cache for hot read endpoints.
+
+Cached endpoints are marked with @cache_response and served through CachedRoute, which
+answers a hit before any dependency runs (no session, no user lookup, no ORM loading or
+serialisation). Entries are keyed by the token's user and the full query string, and
+namespaced by a per-user generation. Every successful POST/PUT/PATCH/DELETE on a
+CachedRoute router calls response_cache.invalidate(username) once the handler has
+committed; writes made elsewhere (imports, insight generation) call it directly, and
+updating or deleting a user (e.g. deactivating the account) invalidates that user's
+entries. Bumping the generation makes every older entry for that user stop matching.
+Hits honour If-None-Match and If-Modified-Since like the uncached handlers.
+
+The in-process LRUCacheBackend only sees its own worker's invalidations; deployments
+running several workers should plug in a shared CacheBackend via
+response_cache.configure(...).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .. import models
+from .auth import _decode_username
+from .conditional import is_fresh
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Response headers replayed on a hit
+_CACHED_HEADERS = ("content-type", "x-next-cursor", "etag", "last-modified")
+
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    status_code: int
+    headers: Tuple[Tuple[str, str], ...]
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        for name, value in self.headers:
+            response.headers[name] = value
+        return response
+
+class CacheBackend:
+    """Storage interface for ResponseCache; a shared backend (e.g. Redis) implements the same methods."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        raise NotImplementedError
+
+    def generation(self, namespace: str) -> int:
+        """Current generation of a namespace; part of every key stored under it."""
+        raise NotImplementedError
+
+    def bump_generation(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count and total body bytes, with per-entry expiry."""
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value.body)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                self._drop(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        if len(value.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace: str) -> int:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return self._generations[namespace]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+class ResponseCache:
+    """Front end shared by every cached route: keys, generations and hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = RESPONSE_CACHE_TTL, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def configure(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def key(self, namespace: str, generation: int, request: Request) -> str:
+        query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+        return f"{namespace}:{generation}:{request.url.path}?{query}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        value = self.backend.get(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def store(self, key: str, response: Response) -> None:
+        headers = tuple((name, response.headers[name]) for name in _CACHED_HEADERS if name in response.headers)
+        self.backend.set(key, CachedResponse(bytes(response.body), response.status_code, headers), self.ttl)
+        self._count("stores")
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop everything cached for a user; call after committing a write."""
+        self.backend.bump_generation(namespace)
+        self._count("invalidations")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+            }
+        return {**counters, "backend": self.backend.stats()}
+
+response_cache = ResponseCache(LRUCacheBackend())
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    # A renamed account's old tokens still name the old namespace
+    namespaces = {target.username, *inspect(target).attrs.username.history.deleted}
+    for namespace in namespaces:
+        response_cache.invalidate(namespace)
+    # Again once committed, in case a concurrent read cached the old state meanwhile
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_cache_namespaces", set()).update(namespaces)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for namespace in session.info.pop("stale_cache_namespaces", ()):
+        response_cache.invalidate(namespace)
+
+def _last_modified(response: Response):
+    try:
+        return parsedate_to_datetime(response.headers["last-modified"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def cache_response(endpoint: Callable) -> Callable:
+    """Mark an endpoint (on a router using CachedRoute) as cacheable per user and query string."""
+    endpoint.__cache_response__ = True
+    return endpoint
+
+def _request_namespace(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return _decode_username(token)
+    except HTTPException:
+        # Let the endpoint's own auth dependency produce the 401
+        return None
+
+class CachedRoute(APIRoute):
+    """
+    Route class serving @cache_response endpoints from response_cache and invalidating
+    the caller's entries after any successful write on the same router.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if getattr(self.endpoint, "__cache_response__", False):
+            return self._cached(handler)
+        if self.methods & _WRITE_METHODS:
+            return self._invalidating(handler)
+        return handler
+
+    @staticmethod
+    def _invalidating(handler: Callable) -> Callable:
+        async def invalidating_handler(request: Request) -> Response:
+            response = await handler(request)
+            # The handler has committed by now; concurrent reads that started earlier were
+            # keyed under the old generation and will never be served
+            if response.status_code < 400:
+                namespace = _request_namespace(request)
+                if namespace is not None:
+                    response_cache.invalidate(namespace)
+            return response
+
+        return invalidating_handler
+
+    @staticmethod
+    def _cached(handler: Callable) -> Callable:
+        async def cached_handler(request: Request) -> Response:
+            namespace = _request_namespace(request) if response_cache.enabled else None
+            if namespace is None or request.method != "GET":
+                return await handler(request)
+
+            # Read the generation first so a write landing mid-request is not cached over
+            key = response_cache.key(namespace, response_cache.backend.generation(namespace), request)
+            cached = response_cache.get(key)
+            if cached is not None:
+                response = cached.to_response()
+                if "etag" in response.headers and is_fresh(request, response.headers["etag"], _last_modified(response)):
+                    validators = {name: response.headers[name] for name in ("etag", "last-modified") if name in response.headers}
+                    response = Response(status_code=304, headers=validators)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = await handler(request)
+            if response.status_code == 200 and not isinstance(response, StreamingResponse):
+                response_cache.store(key, response)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return cached_handler
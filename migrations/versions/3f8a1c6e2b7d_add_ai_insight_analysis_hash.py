@@ -0,0 +1,30 @@
+"""Add analysis hash to AI insights
+
+Revision ID: 3f8a1c6e2b7d
+Revises: 7d21c4a86e3f
+Create Date: 2026-10-16 19:42:08.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a1c6e2b7d'
+down_revision: Union[str, None] = '7d21c4a86e3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_insights', sa.Column('analysis_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_ai_insights_analysis_hash'), 'ai_insights', ['analysis_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ai_insights_analysis_hash'), table_name='ai_insights')
+    op.drop_column('ai_insights', 'analysis_hash')
@@ -0,0 +1,51 @@
+"""Partition entry tables by month (opt-in)
+
+Revision ID: 4c8d2e5b9a17
+Revises: e219f73cff77
+Create Date: 2026-10-16 16:41:09.117350
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.partitions import ENTRY_PARTITION_KEYS, convert_to_partitioned, convert_to_heap, is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8d2e5b9a17'
+down_revision: Union[str, None] = 'e219f73cff77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partitioning_enabled() -> bool:
+    x_args = context.get_x_argument(as_dictionary=True)
+    flag = x_args.get('partition_entries', os.getenv('PARTITION_ENTRY_TABLES', 'false'))
+    return op.get_bind().dialect.name == 'postgresql' and flag.lower() == 'true'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Opt-in: without the flag (or on SQLite) the revision is recorded but changes nothing.
+    # Deployments enabling it later can run downgrade/upgrade of this revision.
+    if not _partitioning_enabled():
+        return
+
+    connection = op.get_bind()
+    for table in ENTRY_PARTITION_KEYS:
+        if not is_partitioned(connection, table):
+            convert_to_partitioned(connection, table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    connection = op.get_bind()
+    if connection.dialect.name != 'postgresql':
+        return
+
+    for table in ENTRY_PARTITION_KEYS:
+        if is_partitioned(connection, table):
+            convert_to_heap(connection, table)
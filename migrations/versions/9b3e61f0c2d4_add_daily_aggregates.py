@@ -0,0 +1,72 @@
+"""Add daily_aggregates table
+
+Revision ID: 9b3e61f0c2d4
+Revises: 4c8d2e5b9a17
+Create Date: 2026-10-16 16:42:08.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e61f0c2d4'
+down_revision: Union[str, None] = '4c8d2e5b9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = [
+    'food_count', 'calories_in', 'exercise_count', 'exercise_minutes', 'calories_burned',
+    'work_count', 'productivity_sum', 'stress_sum', 'event_count', 'impact_sum',
+    'mood_count', 'mood_sum',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_aggregates',
+        sa.Column('daily_log_id', sa.Integer(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in COUNTERS],
+        sa.Column('mood_min', sa.Integer(), nullable=True),
+        sa.Column('mood_max', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['daily_log_id'], ['daily_logs.id'], ),
+        sa.PrimaryKeyConstraint('daily_log_id')
+    )
+
+    # Backfill from the existing entries; `python -m app.crud.aggregates` does the same later on
+    op.execute("""
+        INSERT INTO daily_aggregates (daily_log_id, food_count, calories_in, exercise_count,
+            exercise_minutes, calories_burned, work_count, productivity_sum, stress_sum,
+            event_count, impact_sum, mood_count, mood_sum, mood_min, mood_max)
+        SELECT l.id,
+            COALESCE(f.food_count, 0), COALESCE(f.calories_in, 0),
+            COALESCE(x.exercise_count, 0), COALESCE(x.exercise_minutes, 0), COALESCE(x.calories_burned, 0),
+            COALESCE(w.work_count, 0), COALESCE(w.productivity_sum, 0), COALESCE(w.stress_sum, 0),
+            COALESCE(e.event_count, 0), COALESCE(e.impact_sum, 0),
+            COALESCE(m.mood_count, 0), COALESCE(m.mood_sum, 0), m.mood_min, m.mood_max
+        FROM daily_logs l
+        LEFT JOIN (SELECT daily_log_id, COUNT(*) AS food_count, COALESCE(SUM(calories), 0) AS calories_in
+                   FROM food_entries GROUP BY daily_log_id) f ON f.daily_log_id = l.id
+        LEFT JOIN (SELECT daily_log_id, COUNT(*) AS exercise_count,
+                          COALESCE(SUM(duration_minutes), 0) AS exercise_minutes,
+                          COALESCE(SUM(calories_burned), 0) AS calories_burned
+                   FROM exercise_entries GROUP BY daily_log_id) x ON x.daily_log_id = l.id
+        LEFT JOIN (SELECT daily_log_id, COUNT(*) AS work_count,
+                          COALESCE(SUM(productivity_rating), 0) AS productivity_sum,
+                          COALESCE(SUM(stress_level), 0) AS stress_sum
+                   FROM work_entries GROUP BY daily_log_id) w ON w.daily_log_id = l.id
+        LEFT JOIN (SELECT daily_log_id, COUNT(*) AS event_count, COALESCE(SUM(impact_rating), 0) AS impact_sum
+                   FROM event_entries GROUP BY daily_log_id) e ON e.daily_log_id = l.id
+        LEFT JOIN (SELECT daily_log_id, COUNT(*) AS mood_count, COALESCE(SUM(mood_rating), 0) AS mood_sum,
+                          MIN(mood_rating) AS mood_min, MAX(mood_rating) AS mood_max
+                   FROM mood_entries GROUP BY daily_log_id) m ON m.daily_log_id = l.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_aggregates')
@@ -0,0 +1,41 @@
+"""Add expression index on daily logs' calendar day for keyset listing
+
+Revision ID: a7c4e2d9f150
+Revises: d6a3f0b8e291
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2d9f150'
+down_revision: Union[str, None] = 'd6a3f0b8e291'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Must match models.DailyLog.calendar_day exactly for the planner to use it
+    if op.get_bind().dialect.name == 'postgresql':
+        calendar_day = "coalesce(log_date, CAST(timezone('UTC', date) AS DATE))"
+    else:
+        calendar_day = "coalesce(log_date, date(date))"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_daily_logs_user_id_calendar_day', 'daily_logs', ['user_id', sa.text(calendar_day), 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_daily_logs_user_id_calendar_day', table_name='daily_logs',
+            postgresql_concurrently=True, if_exists=True
+        )
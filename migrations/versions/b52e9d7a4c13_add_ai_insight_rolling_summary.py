@@ -0,0 +1,28 @@
+"""Add rolling summary to AI insights
+
+Revision ID: b52e9d7a4c13
+Revises: 3f8a1c6e2b7d
+Create Date: 2026-10-16 21:17:44.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e9d7a4c13'
+down_revision: Union[str, None] = '3f8a1c6e2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_insights', sa.Column('rolling_summary', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_insights', 'rolling_summary')
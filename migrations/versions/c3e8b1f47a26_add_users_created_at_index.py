@@ -0,0 +1,35 @@
+"""Add (created_at, id) index for the users listing
+
+Revision ID: c3e8b1f47a26
+Revises: a7c4e2d9f150
+Create Date: 2026-10-18 11:40:05.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8b1f47a26'
+down_revision: Union[str, None] = 'a7c4e2d9f150'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at_id', 'users', ['created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_created_at_id', table_name='users',
+            postgresql_concurrently=True, if_exists=True
+        )
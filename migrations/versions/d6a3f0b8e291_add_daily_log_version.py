@@ -0,0 +1,28 @@
+"""Add version counter to daily logs
+
+Revision ID: d6a3f0b8e291
+Revises: b52e9d7a4c13
+Create Date: 2026-10-17 10:04:37.226184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a3f0b8e291'
+down_revision: Union[str, None] = 'b52e9d7a4c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('daily_logs', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('daily_logs', 'version')
@@ -0,0 +1,50 @@
+"""Add composite and foreign key indexes
+
+Revision ID: e1fa2935b3fb
+Revises: 563183d31363
+Create Date: 2026-10-16 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1fa2935b3fb'
+down_revision: Union[str, None] = '563183d31363'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) matching the filters and orderings the routers issue
+INDEXES = [
+    ('ix_daily_logs_user_id_date', 'daily_logs', ['user_id', sa.text('date DESC')]),
+    ('ix_food_entries_daily_log_id_timestamp', 'food_entries', ['daily_log_id', 'timestamp']),
+    ('ix_exercise_entries_daily_log_id_timestamp', 'exercise_entries', ['daily_log_id', 'timestamp']),
+    ('ix_work_entries_daily_log_id_start_time', 'work_entries', ['daily_log_id', 'start_time']),
+    ('ix_event_entries_daily_log_id_timestamp', 'event_entries', ['daily_log_id', 'timestamp']),
+    ('ix_mood_entries_daily_log_id_timestamp', 'mood_entries', ['daily_log_id', 'timestamp']),
+    ('ix_ai_insights_daily_log_id_created_at', 'ai_insights', ['daily_log_id', sa.text('created_at DESC')]),
+    ('ix_activity_recommendations_user_id_created_at', 'activity_recommendations', ['user_id', sa.text('created_at DESC')]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block; building the
+    # indexes online keeps the tables writable while this migration runs.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
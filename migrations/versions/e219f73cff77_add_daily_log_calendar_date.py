@@ -0,0 +1,71 @@
+"""Add daily_logs.log_date with unique (user_id, log_date)
+
+Revision ID: e219f73cff77
+Revises: e1fa2935b3fb
+Create Date: 2026-10-16 14:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e219f73cff77'
+down_revision: Union[str, None] = 'e1fa2935b3fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('daily_logs', sa.Column('log_date', sa.Date(), nullable=True))
+
+    # Backfill with the calendar day in the owner's profile timezone (UTC on SQLite
+    # or when the stored timezone name is unknown)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            UPDATE daily_logs
+            SET log_date = (daily_logs.date AT TIME ZONE COALESCE(
+                (SELECT p.timezone FROM profiles p
+                 WHERE p.user_id = daily_logs.user_id
+                   AND p.timezone IN (SELECT name FROM pg_timezone_names)),
+                'UTC'
+            ))::date
+            WHERE daily_logs.date IS NOT NULL
+        """)
+    else:
+        op.execute("UPDATE daily_logs SET log_date = date(daily_logs.date) WHERE daily_logs.date IS NOT NULL")
+
+    # The old duplicate check never matched, so users may have several logs per day.
+    # Keep the earliest on the calendar day and leave the rest undated rather than
+    # deleting data; NULLs do not collide in the unique index.
+    op.execute("""
+        UPDATE daily_logs SET log_date = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, log_date ORDER BY id) AS rn
+                FROM daily_logs
+                WHERE log_date IS NOT NULL
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_daily_logs_user_id_log_date', 'daily_logs', ['user_id', 'log_date'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_daily_logs_user_id_log_date', table_name='daily_logs',
+            postgresql_concurrently=True, if_exists=True
+        )
+    with op.batch_alter_table('daily_logs') as batch_op:
+        batch_op.drop_column('log_date')